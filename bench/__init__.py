@@ -0,0 +1,15 @@
+"""
+Performance benchmarks
+
+Headless workloads, each one a small hand-assembled ROM (see roms.py) that stresses a single part of the emulator.
+Run from the repository root:
+
+    python -m bench.suite [--frames N] [--repeat N] [--output results.json] [workload ...]
+"""
+import os
+import sys
+
+# Emulator modules import each other as top level modules (see pgbe.py), so their directory must be in the path
+_PGBE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pgbe")
+if _PGBE_PATH not in sys.path:
+    sys.path.insert(0, _PGBE_PATH)
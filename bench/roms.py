@@ -0,0 +1,170 @@
+"""
+Benchmark ROMs
+
+Each workload is a short program, assembled by hand, that loops forever doing one kind of work. The programs are kept
+here as annotated machine code and the ROM files in roms/ are generated from them:
+
+    python -m bench.roms
+
+Every ROM has the same layout: a RETI at the V-Blank vector, a timer interrupt handler that increments (HL), the
+program at the entry point (0x0100) and a data area (0x1000 - 0x2FFF) filled with a fixed byte pattern, used as the
+source of memory copies.
+"""
+import os
+
+
+ROMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "roms")
+
+ROM_SIZE = 0x8000  # 32 KB, no MBC
+DATA_ADDRESS = 0x1000
+DATA_SIZE = 0x2000
+
+HANDLERS = {
+    0x0040: "D9",  # V-Blank: RETI
+    0x0050: "34 D9",  # Timer: INC (HL) / RETI
+}
+
+PROGRAMS = {
+    # Register-only arithmetic, logic and a relative jump
+    "alu": """
+        F3          ; 0100: DI
+        3E 00       ; 0101: LD A,00
+        80          ; 0103: ADD A,B
+        A9          ; 0104: XOR C
+        04          ; 0105: INC B
+        0D          ; 0106: DEC C
+        CB 37       ; 0107: SWAP A
+        17          ; 0109: RLA
+        2F          ; 010A: CPL
+        18 F6       ; 010B: JR 0103
+    """,
+    # Copies 4 KB from the data area to internal RAM, over and over
+    "memory_copy": """
+        F3          ; 0100: DI
+        21 00 10    ; 0101: LD HL,1000
+        11 00 C0    ; 0104: LD DE,C000
+        01 00 10    ; 0107: LD BC,1000
+        2A          ; 010A: LD A,(HL+)
+        12          ; 010B: LD (DE),A
+        13          ; 010C: INC DE
+        0B          ; 010D: DEC BC
+        78          ; 010E: LD A,B
+        B1          ; 010F: OR C
+        20 F8       ; 0110: JR NZ,010A
+        18 ED       ; 0112: JR 0101
+    """,
+    # Same loop, but copying to the whole tile data area (8000 - 97FF), so every write updates the decoded tiles
+    "vram_upload": """
+        F3          ; 0100: DI
+        21 00 10    ; 0101: LD HL,1000
+        11 00 80    ; 0104: LD DE,8000
+        01 00 18    ; 0107: LD BC,1800
+        2A          ; 010A: LD A,(HL+)
+        12          ; 010B: LD (DE),A
+        13          ; 010C: INC DE
+        0B          ; 010D: DEC BC
+        78          ; 010E: LD A,B
+        B1          ; 010F: OR C
+        20 F8       ; 0110: JR NZ,010A
+        18 ED       ; 0112: JR 0101
+    """,
+    # Uploads 256 tiles and a tile map once, then halts until each V-Blank and scrolls the background, so nearly all
+    # the time goes to drawing full frames
+    "background_render": """
+        F3          ; 0100: DI
+        21 00 10    ; 0101: LD HL,1000
+        11 00 80    ; 0104: LD DE,8000
+        01 00 10    ; 0107: LD BC,1000
+        2A          ; 010A: LD A,(HL+)
+        12          ; 010B: LD (DE),A
+        13          ; 010C: INC DE
+        0B          ; 010D: DEC BC
+        78          ; 010E: LD A,B
+        B1          ; 010F: OR C
+        20 F8       ; 0110: JR NZ,010A
+        21 00 98    ; 0112: LD HL,9800
+        7D          ; 0115: LD A,L
+        22          ; 0116: LD (HL+),A
+        7C          ; 0117: LD A,H
+        FE 9C       ; 0118: CP 9C
+        20 F9       ; 011A: JR NZ,0115
+        3E E4       ; 011C: LD A,E4
+        E0 47       ; 011E: LDH (47),A   BGP
+        3E 01       ; 0120: LD A,01
+        E0 FF       ; 0122: LDH (FF),A   IE = V-Blank
+        FB          ; 0124: EI
+        76          ; 0125: HALT
+        F0 43       ; 0126: LDH A,(43)   SCX
+        3C          ; 0128: INC A
+        E0 43       ; 0129: LDH (43),A
+        F0 42       ; 012B: LDH A,(42)   SCY
+        3D          ; 012D: DEC A
+        E0 42       ; 012E: LDH (42),A
+        18 F3       ; 0130: JR 0125
+    """,
+    # Timer overflowing every 64 cycles (TAC = 262144 Hz, TMA = FC), plus V-Blank, while the main loop spins
+    "interrupts": """
+        F3          ; 0100: DI
+        21 00 C0    ; 0101: LD HL,C000
+        3E FC       ; 0104: LD A,FC
+        E0 06       ; 0106: LDH (06),A   TMA
+        E0 05       ; 0108: LDH (05),A   TIMA
+        3E 05       ; 010A: LD A,05
+        E0 07       ; 010C: LDH (07),A   TAC
+        3E 05       ; 010E: LD A,05
+        E0 FF       ; 0110: LDH (FF),A   IE = V-Blank + Timer
+        FB          ; 0112: EI
+        04          ; 0113: INC B
+        18 FD       ; 0114: JR 0113
+    """,
+}
+
+
+def _machine_code(listing: str):
+    """ :return: Bytes of an annotated listing (hex bytes, each line optionally followed by a ; comment) """
+    return bytes.fromhex(" ".join(line.split(";")[0] for line in listing.splitlines()))
+
+
+def assemble(name: str):
+    """
+    :param name: Workload name (key of PROGRAMS)
+    :return: ROM data
+    """
+    rom = bytearray(ROM_SIZE)
+    for address, listing in HANDLERS.items():
+        code = _machine_code(listing)
+        rom[address:address + len(code)] = code
+    code = _machine_code(PROGRAMS[name])
+    rom[0x0100:0x0100 + len(code)] = code
+    rom[DATA_ADDRESS:DATA_ADDRESS + DATA_SIZE] = bytes((i * 7 + (i >> 8)) & 0xFF for i in range(DATA_SIZE))
+
+    # Header: title, destination = non-Japanese (ROM only, 32 KB, no RAM are all 0) and header checksum
+    title = name.upper().encode("ascii")[:15]
+    rom[0x0134:0x0134 + len(title)] = title
+    rom[0x014A] = 0x01
+    checksum = 0
+    for value in rom[0x0134:0x014D]:
+        checksum = (checksum - value - 1) & 0xFF
+    rom[0x014D] = checksum
+    return bytes(rom)
+
+
+def rom_path(name: str):
+    """ :return: Path of the ROM file of the given workload """
+    return os.path.join(ROMS_PATH, name + ".gb")
+
+
+def load(name: str):
+    """
+    :param name: Workload name (key of PROGRAMS)
+    :return: ROM data, read from the file in roms/
+    """
+    with open(rom_path(name), "rb") as f:
+        return f.read()
+
+
+if __name__ == '__main__':
+    for program_name in PROGRAMS:
+        with open(rom_path(program_name), "wb") as rom_file:
+            rom_file.write(assemble(program_name))
+        print(rom_path(program_name))
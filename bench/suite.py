@@ -0,0 +1,122 @@
+"""
+Benchmark suite
+
+Runs each workload ROM headless and reports, as JSON, how fast it was emulated:
+    - frames_per_second, cycles_per_second: from the fastest of repeat runs of the given number of frames
+    - instructions_per_second: instructions executed in those frames (counted on a replay with the Profiler attached)
+      divided by the same time
+    - subsystems: seconds per frame spent in each part of the emulator during the fastest run (see GB.stats())
+
+Every run starts from the same save state, taken after some warm-up frames (so translated blocks and decoded tiles are
+already cached), so all the runs of a workload emulate exactly the same frames.
+
+    python -m bench.suite --frames 120 --output results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import bench  # Makes the emulator modules importable
+from bench import roms
+from gb import GB
+from profiler import Profiler
+
+
+WARM_UP_FRAMES = 10
+
+
+def prepare(cartridge: bytes):
+    """
+    :param cartridge: ROM data
+    :return: (headless GB with the cartridge loaded and warmed up, save state to start every run from)
+    """
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge)
+    gb.run_frames(WARM_UP_FRAMES)
+    return gb, gb.save_state()
+
+
+def fastest_run(gb, start_state: bytes, frames: int, repeat: int):
+    """
+    :return: (shortest time, in seconds, taken to run the given number of frames from the start state, GB.stats() of
+             that run)
+    """
+    best = None
+    for _ in range(repeat):
+        gb.load_state(start_state)
+        gb.metrics.reset()
+        start = time.perf_counter()
+        gb.run_frames(frames)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, gb.stats())
+    return best
+
+
+def instruction_count(gb, start_state: bytes, frames: int):
+    """ :return: Number of instructions executed in the given number of frames from the start state """
+    gb.load_state(start_state)
+    gb.cpu.profiler = Profiler(gb)
+    try:
+        gb.run_frames(frames)
+        return sum(entry[Profiler.COUNT] for entry in gb.cpu.profiler.opcodes.values())
+    finally:
+        gb.cpu.profiler = None
+
+
+def run_workload(name: str, frames: int, repeat: int = 3):
+    """
+    :param name: Workload name (see roms.PROGRAMS)
+    :param frames: Number of frames in each run
+    :param repeat: Number of timed runs (the fastest one is reported)
+    :return: Dictionary of results
+    """
+    gb, start_state = prepare(roms.load(name))
+    seconds, stats = fastest_run(gb, start_state, frames, repeat)
+    instructions = instruction_count(gb, start_state, frames)
+    return {
+        "frames": frames,
+        "seconds": seconds,
+        "frames_per_second": frames / seconds,
+        "cycles_per_second": stats["cycles"] / seconds,
+        "instructions": instructions,
+        "instructions_per_second": instructions / seconds,
+        "subsystems": {name: subsystem["seconds"] / frames for name, subsystem in stats["subsystems"].items()},
+    }
+
+
+def run_suite(names=None, frames: int = 60, repeat: int = 3):
+    """
+    :param names: Workloads to run (all of them if None)
+    :param frames: Number of frames in each run
+    :param repeat: Number of timed runs of each workload
+    :return: Dictionary with the environment and the results of each workload, ready to be dumped as JSON
+    """
+    names = list(roms.PROGRAMS) if not names else names
+    for name in names:
+        if name not in roms.PROGRAMS:
+            raise ValueError("Unknown workload: {}".format(name))
+    return {
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "platform": platform.platform(),
+        "workloads": {name: run_workload(name, frames, repeat) for name in names},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs the emulator benchmark workloads")
+    parser.add_argument("workloads", nargs="*", help="Workloads (default: all): " + ", ".join(roms.PROGRAMS))
+    parser.add_argument("--frames", type=int, default=60, help="Frames in each timed run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of each workload (the fastest is reported)")
+    parser.add_argument("--output", help="JSON file to write (default: standard output)")
+    arguments = parser.parse_args()
+
+    results = run_suite(arguments.workloads, arguments.frames, arguments.repeat)
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
@@ -21,10 +21,11 @@ if __name__ == '__main__':
     rom_file = sys.argv[1]
     debug = bool(int(sys.argv[2]))
     step = bool(int(sys.argv[3]))
+    scale = int(sys.argv[4]) if len(sys.argv) > 4 else 1
     f = open(rom_file, "rb")
     cartridge_data = f.read()
     f.close()
     # print_rom_data(cartridge_data)
 
-    gb = GB()
+    gb = GB(screen_scale=scale)
     gb.execute(cartridge_data, debug, step)
@@ -0,0 +1,144 @@
+"""
+Batch runner
+
+Runs many headless emulator instances (e.g. to take regression screenshots of a set of ROMs, or to play the same game
+with different inputs) spread across a pool of worker processes. Each Job is executed by a single worker from start to
+end, and instances share nothing, so throughput grows with the number of cores available.
+
+    jobs = [Job("tetris.gb", frames=600, inputs=[(300, "start", True), (305, "start", False)]) for _ in range(100)]
+    for result in run_batch(jobs):
+        print(result["name"], result["metrics"]["fps"])
+
+Rollouts work the other way around: many branches are explored from the state of a single running instance, which
+worker processes inherit when they are forked (so nothing is sent to them, and memory pages are shared until written).
+Each rollout then runs on its own GB.fork() of that instance.
+
+    def play(gb, index):
+        gb.joypad.press(("a", "b", "left", "right")[index % 4])
+        gb.run_frames(60)
+        return gb.memory.read_8bit(0xC0A0)
+
+    scores = run_rollouts(gb, play, 1000)
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gb import GB
+
+
+# Data returned by each job (see Job outputs)
+FRAME = "frame"  # Framebuffer after the last frame (160x144 RGB bytes)
+RAM = "ram"  # Internal RAM (0xC000 - 0xDFFF)
+VRAM = "vram"  # Video RAM (0x8000 - 0x9FFF)
+METRICS = "metrics"  # Cycles and frames executed, host time spent and frames per second
+
+
+class Job:
+    """ Work executed by a single emulator instance """
+
+    def __init__(self, cartridge, frames: int, inputs=(), outputs=(FRAME,), name=None):
+        """
+        :param cartridge: Game to execute, either the cartridge data itself or the path of the ROM file (which is then
+                          only read by the worker, instead of being sent to it)
+        :param frames: Number of frames to execute
+        :param inputs: Input script, as (frame, key, pressed) tuples: before executing the given frame (0 == first
+                       frame), the joypad key (e.g. "start", see Joypad) is pressed or released
+        :param outputs: Data to return after the last frame (FRAME, RAM, VRAM and/or METRICS)
+        :param name: Identifier copied to the result (defaults to the ROM path, if given)
+        """
+        self.cartridge = cartridge
+        self.frames = frames
+        self.inputs = sorted(inputs, key=lambda event: event[0])
+        self.outputs = tuple(outputs)
+        self.name = name if name is not None or not isinstance(cartridge, str) else cartridge
+
+
+def run_job(job: Job):
+    """
+    Executes a job in the current process.
+    :param job: Job to execute
+    :return: Dictionary with the job name, plus one entry for each output requested
+    """
+    cartridge_data = job.cartridge
+    if isinstance(cartridge_data, str):
+        with open(cartridge_data, "rb") as f:
+            cartridge_data = f.read()
+
+    start = time.perf_counter()
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data)
+    inputs = iter(job.inputs)
+    next_input = next(inputs, None)
+    for frame in range(job.frames):
+        while next_input is not None and next_input[0] <= frame:
+            _, key, pressed = next_input
+            if pressed:
+                gb.joypad.press(key)
+            else:
+                gb.joypad.release(key)
+            next_input = next(inputs, None)
+        gb.run_frames(1)
+    elapsed = time.perf_counter() - start
+
+    result = {"name": job.name}
+    for output in job.outputs:
+        if output == FRAME:
+            result[FRAME] = bytes(gb.gpu.framebuffer)
+        elif output == RAM:
+            result[RAM] = bytes(gb.memory.internal_ram)
+        elif output == VRAM:
+            result[VRAM] = bytes(gb.memory.vram)
+        elif output == METRICS:
+            result[METRICS] = {"cycles": gb.cpu.cycle_count, "frames": job.frames, "seconds": elapsed,
+                               "fps": job.frames / elapsed if elapsed > 0 else 0.0}
+        else:
+            raise ValueError("Unknown job output: {}".format(output))
+    return result
+
+
+def run_batch(jobs, processes: int = None, chunksize: int = 1):
+    """
+    Executes jobs in a pool of worker processes.
+    :param jobs: Iterable of Job
+    :param processes: Number of worker processes (one per core if None). With 1, jobs run in the current process.
+    :param chunksize: Number of jobs sent to a worker at a time; larger chunks reduce overhead when jobs are short
+    :return: List of results (see run_job()), in the same order as the jobs
+    """
+    if processes == 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(run_job, jobs, chunksize=chunksize))
+
+
+_rollout_source = None  # Instance being explored by run_rollouts(), inherited by the forked worker processes
+
+
+def _run_rollout(function, index: int):
+    """ Runs a single rollout in a worker process """
+    return function(_rollout_source.fork(), index)
+
+
+def run_rollouts(gb, function, count: int, processes: int = None, chunksize: int = 16):
+    """
+    Runs function(branch, index) for each index in range(count), where branch is a copy of gb in its current state.
+    Rollouts are spread across worker processes created with os.fork(), so this is only available on platforms that
+    support it (not Windows). gb itself is not modified.
+    :type gb: gb.GB
+    :param function: Picklable callable (e.g. a module level function) receiving the branch and the rollout index,
+                     returning a picklable result
+    :param count: Number of rollouts
+    :param processes: Number of worker processes (one per core if None). With 1, rollouts run in the current process.
+    :param chunksize: Number of rollouts sent to a worker at a time
+    :return: List with the result of each rollout, in index order
+    """
+    global _rollout_source
+    if processes == 1:
+        return [function(gb.fork(), index) for index in range(count)]
+    _rollout_source = gb
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+            return list(executor.map(_run_rollout, [function] * count, range(count), chunksize=chunksize))
+    finally:
+        _rollout_source = None
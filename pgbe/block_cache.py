@@ -0,0 +1,533 @@
+"""
+Block Cache
+
+Instead of fetching and dispatching one instruction at a time, straight-line runs of instructions (basic blocks) are
+decoded once and translated into a single Python function. A block ends at the first instruction that may change the
+Program Counter (jumps, calls, returns, restarts) or the interrupt/CPU state (EI, DI, RETI, HALT, STOP), so interrupts
+and GPU only need to be updated at block boundaries.
+
+The most common instructions (loads, 8-bit ALU, INC/DEC, stack, CB register operations, JR/JP) are inlined into the
+block source: registers are kept in local variables, loaded the first time they are used and stored back only before
+leaving the block, immediate operands become constants, and memory is accessed through the page table directly. PC is
+only updated where it is observed. Every other instruction calls its opcode function, with the registers stored before
+and loaded again after it. Memory write handlers must therefore not read CPU registers, which none of them do.
+
+Blocks are cached by their start address and, for the switchable cartridge bank area, by the cartridge bank currently
+mapped, so bank switches never require invalidation. Blocks located in RAM are invalidated when any of their bytes is
+written (e.g. routines copied to RAM/HRAM, self-modifying code). Other areas (VRAM, external RAM, echo RAM, OAM and
+boot ROM) are never cached: the CPU executes them one instruction at a time.
+
+See:
+- http://www.pastraiser.com/cpu/gameboy/gameboy_opcodes.html
+"""
+import re
+
+import op
+from register import INC_FLAGS, DEC_FLAGS, ADD_FLAGS, ADC_FLAGS, SUB_FLAGS, SBC_FLAGS, CP_FLAGS, AND_FLAGS, OR_FLAGS, \
+    XOR_FLAGS
+
+
+# Registers kept in local variables by translated blocks, in the order they are stored back
+REGISTERS = ("A", "F", "B", "C", "D", "E", "H", "L", "SP")
+# Page tables used by inlined memory accesses, loaded once per block (Memory never replaces these lists)
+PAGE_TABLES = ("read_pages", "write_pages")
+# Names available to every translated block
+BLOCK_GLOBALS = {"INC_FLAGS": INC_FLAGS, "DEC_FLAGS": DEC_FLAGS, "ADD_FLAGS": ADD_FLAGS, "ADC_FLAGS": ADC_FLAGS,
+                 "SUB_FLAGS": SUB_FLAGS, "SBC_FLAGS": SBC_FLAGS, "CP_FLAGS": CP_FLAGS, "AND_FLAGS": AND_FLAGS,
+                 "OR_FLAGS": OR_FLAGS, "XOR_FLAGS": XOR_FLAGS}
+
+# Registers and page tables used by a line of inlined code, and the register a line assigns (see _BlockSource.inline())
+_NAME = re.compile(r"\b(A|F|B|C|D|E|H|L|SP|read_pages|write_pages)\b")
+_ASSIGNMENT = re.compile(r"^(\w+) (=|&=|\|=|\^=|>>=) ")
+
+# 8-bit operand selected by the 3 lower bits of the opcode. 6 is the memory at address HL.
+_OPERANDS = ("B", "C", "D", "E", "H", "L", "read_pages[H][L]", "A")
+# 16-bit register pairs selected by bits 4-5 of the opcode
+_PAIRS = (("B", "C"), ("D", "E"), ("H", "L"), None)  # None is SP (or AF, for PUSH/POP)
+
+# Z flag of the result, for instructions that clear N and H. Like the opcode functions, which change one flag bit at a
+# time, they keep the unused lower bits of F (only POP AF can set them).
+_Z = "(F & 0x0F) | (0x80 if {0} == 0 else 0)"
+
+# 8-bit ALU operations, by bits 3-5 of the opcode: lines computing F and A from an operand expression (CP only sets F)
+_ALU = (
+    ("F = ADD_FLAGS[(A << 8) | {0}]", "A = (A + {0}) & 0xFF"),
+    ("carry = (F >> 4) & 1", "F = ADC_FLAGS[(carry << 16) | (A << 8) | {0}]", "A = (A + {0} + carry) & 0xFF"),
+    ("F = SUB_FLAGS[(A << 8) | {0}]", "A = (A - {0}) & 0xFF"),
+    ("carry = (F >> 4) & 1", "F = SBC_FLAGS[(carry << 16) | (A << 8) | {0}]", "A = (A - {0} - carry) & 0xFF"),
+    ("A &= {0}", "F = AND_FLAGS[A]"),
+    ("A ^= {0}", "F = XOR_FLAGS[A]"),
+    ("A |= {0}", "F = OR_FLAGS[A]"),
+    ("F = CP_FLAGS[(A << 8) | {0}]",),
+)
+
+# Rotates and shifts of a register (CB 00 - 3F), by bits 3-5 of the CB opcode
+_SHIFTS = (
+    ("{0} = (({0} << 1) | ({0} >> 7)) & 0xFF", "F = " + _Z + " | (({0} & 0x01) << 4)"),           # RLC
+    ("{0} = (({0} >> 1) | ({0} << 7)) & 0xFF", "F = " + _Z + " | (({0} >> 7) << 4)"),             # RRC
+    ("value = ({0} << 1) | ((F >> 4) & 1)", "{0} = value & 0xFF", "F = " + _Z + " | ((value >> 4) & 0x10)"),  # RL
+    ("carry = {0} & 0x01", "{0} = ({0} >> 1) | ((F & 0x10) << 3)", "F = " + _Z + " | (carry << 4)"),           # RR
+    ("value = {0} << 1", "{0} = value & 0xFF", "F = " + _Z + " | ((value >> 4) & 0x10)"),          # SLA
+    ("carry = {0} & 0x01", "{0} = ({0} >> 1) | ({0} & 0x80)", "F = " + _Z + " | (carry << 4)"),   # SRA
+    ("{0} = (({0} << 4) | ({0} >> 4)) & 0xFF", "F = " + _Z),                                      # SWAP
+    ("carry = {0} & 0x01", "{0} >>= 1", "F = " + _Z + " | (carry << 4)"),                          # SRL
+)
+
+# Conditional branches: condition under which they are taken, by bits 3-4 of the opcode (NZ, Z, NC, C)
+_CONDITIONS = ("not F & 0x80", "F & 0x80", "not F & 0x10", "F & 0x10")
+
+
+def _inline_instruction(opcode: int, operands: bytes):
+    """
+    :param opcode: Instruction that does not end a block (and is not the CB prefix)
+    :param operands: Immediate data following the opcode
+    :return: Python lines implementing the instruction on local registers, or None if it is not inlined
+    """
+    d8 = "0x{:02X}".format(operands[0]) if operands else None
+    low, high = (opcode & 0x07), (opcode >> 3) & 0x07
+    if opcode == 0x00:  # NOP
+        return []
+    if 0x40 <= opcode <= 0x7F:  # LD r,r' / LD r,(HL) / LD (HL),r (HALT ends blocks)
+        if high == 6:
+            return ["write_pages[H][L] = " + _OPERANDS[low]]
+        return [] if high == low else ["{} = {}".format(_OPERANDS[high], _OPERANDS[low])]
+    if opcode == 0x9F:  # SBC A,A - implemented apart by its opcode function, keeping the lower bits of F
+        return ["carry = (F >> 4) & 1", "A = -carry & 0xFF", "F = " + _Z.format("A") + " | 0x40 | (carry * 0x30)"]
+    if 0x80 <= opcode <= 0xBF:  # ALU A,r
+        if low == 6:
+            return ["operand = read_pages[H][L]"] + [line.format("operand") for line in _ALU[high]]
+        return [line.format(_OPERANDS[low]) for line in _ALU[high]]
+    if opcode >= 0xC0 and low == 6:  # ALU A,d8
+        return [line.format(d8) for line in _ALU[high]]
+
+    if opcode < 0x40:
+        pair = _PAIRS[opcode >> 4]
+        column = opcode & 0x0F
+        if low == 6:  # LD r,d8 / LD (HL),d8
+            return ["write_pages[H][L] = " + d8] if high == 6 else ["{} = {}".format(_OPERANDS[high], d8)]
+        if low in (4, 5):  # INC r / DEC r
+            flags = "INC_FLAGS" if low == 4 else "DEC_FLAGS"
+            sign = "+" if low == 4 else "-"
+            if high == 6:
+                return ["value = (read_pages[H][L] {} 1) & 0xFF".format(sign), "write_pages[H][L] = value",
+                        "F = (F & 0x10) | {}[value]".format(flags)]
+            register = _OPERANDS[high]
+            return ["{0} = ({0} {1} 1) & 0xFF".format(register, sign),
+                    "F = (F & 0x10) | {}[{}]".format(flags, register)]
+        if column == 0x01:  # LD rr,d16
+            if pair is None:
+                return ["SP = 0x{:02X}{:02X}".format(operands[1], operands[0])]
+            return ["{} = 0x{:02X}".format(pair[0], operands[1]), "{} = 0x{:02X}".format(pair[1], operands[0])]
+        if column in (0x03, 0x0B):  # INC rr / DEC rr
+            sign = "+" if column == 0x03 else "-"
+            if pair is None:
+                return ["SP = (SP {} 1) & 0xFFFF".format(sign)]
+            return ["value = ((({0} << 8) | {1}) {2} 1) & 0xFFFF".format(pair[0], pair[1], sign),
+                    "{} = value >> 8".format(pair[0]), "{} = value & 0xFF".format(pair[1])]
+        if column == 0x09:  # ADD HL,rr
+            value = "SP" if pair is None else "({} << 8) | {}".format(*pair)
+            return ["hl = (H << 8) | L", "value = " + value, "result = hl + value",
+                    "F = (F & 0x8F) | (0x20 if (hl & 0x0FFF) + (value & 0x0FFF) > 0x0FFF else 0) | "
+                    "(0x10 if result > 0xFFFF else 0)",
+                    "H = (result >> 8) & 0xFF", "L = result & 0xFF"]
+        if column in (0x02, 0x0A):  # LD (BC),A / LD (DE),A / LD (HL+),A / LD (HL-),A and the loads of A
+            address = "[H][L]" if pair is None or pair[0] == "H" else "[{}][{}]".format(*pair)
+            lines = ["write_pages{} = A".format(address) if column == 0x02 else "A = read_pages" + address]
+            if opcode >= 0x20:
+                sign = "+" if opcode < 0x30 else "-"
+                lines += ["value = (((H << 8) | L) {} 1) & 0xFFFF".format(sign), "H = value >> 8", "L = value & 0xFF"]
+            return lines
+        return {
+            0x07: ["A = ((A << 1) | (A >> 7)) & 0xFF", "F = " + _Z.format("A") + " | ((A & 0x01) << 4)"],  # RLCA
+            0x0F: ["A = ((A >> 1) | (A << 7)) & 0xFF", "F = " + _Z.format("A") + " | ((A >> 7) << 4)"],    # RRCA
+            0x17: [line.format("A") for line in _SHIFTS[2]],                                               # RLA
+            0x1F: [line.format("A") for line in _SHIFTS[3]],                                               # RRA
+            0x2F: ["A ^= 0xFF", "F |= 0x60"],                                                              # CPL
+            0x37: ["F = (F & 0x8F) | 0x10"],                                                               # SCF
+            0x3F: ["F = (F & 0x9F) ^ 0x10"],                                                               # CCF
+        }.get(opcode)
+
+    if opcode in (0xC1, 0xD1, 0xE1, 0xF1):  # POP rr (lsb first)
+        high_register, low_register = _PAIRS[(opcode >> 4) - 0x0C] or ("A", "F")
+        return ["{} = read_pages[SP >> 8][SP & 0xFF]".format(low_register), "SP = (SP + 1) & 0xFFFF",
+                "{} = read_pages[SP >> 8][SP & 0xFF]".format(high_register), "SP = (SP + 1) & 0xFFFF"]
+    if opcode in (0xC5, 0xD5, 0xE5, 0xF5):  # PUSH rr (lsb at the lower address, written first)
+        high_register, low_register = _PAIRS[(opcode >> 4) - 0x0C] or ("A", "F")
+        return ["SP = (SP - 2) & 0xFFFF", "write_pages[SP >> 8][SP & 0xFF] = " + low_register,
+                "value = (SP + 1) & 0xFFFF", "write_pages[value >> 8][value & 0xFF] = " + high_register]
+    if opcode in (0xE0, 0xF0):  # LDH (a8),A / LDH A,(a8)
+        return ["write_pages[0xFF][{}] = A".format(d8)] if opcode == 0xE0 else ["A = read_pages[0xFF][{}]".format(d8)]
+    if opcode in (0xE2, 0xF2):  # LD (C),A / LD A,(C)
+        return ["write_pages[0xFF][C] = A"] if opcode == 0xE2 else ["A = read_pages[0xFF][C]"]
+    if opcode in (0xEA, 0xFA):  # LD (a16),A / LD A,(a16)
+        address = "[0x{:02X}][{}]".format(operands[1], d8)
+        return ["write_pages{} = A".format(address)] if opcode == 0xEA else ["A = read_pages" + address]
+    if opcode == 0xF9:  # LD SP,HL
+        return ["SP = (H << 8) | L"]
+    return None
+
+
+def _inline_cb_instruction(cb_opcode: int):
+    """
+    :param cb_opcode: Opcode following the CB prefix
+    :return: Python lines implementing the instruction on local registers, or None if it is not inlined ((HL) operands)
+    """
+    low, bit = (cb_opcode & 0x07), (cb_opcode >> 3) & 0x07
+    if low == 6:
+        return None
+    register = _OPERANDS[low]
+    if cb_opcode < 0x40:
+        return [line.format(register) for line in _SHIFTS[bit]]
+    if cb_opcode < 0x80:  # BIT
+        return ["F = (F & 0x1F) | (0x20 if {} & 0x{:02X} else 0xA0)".format(register, 1 << bit)]
+    if cb_opcode < 0xC0:  # RES
+        return ["{} &= 0x{:02X}".format(register, ~(1 << bit) & 0xFF)]
+    return ["{} |= 0x{:02X}".format(register, 1 << bit)]  # SET
+
+
+def _inline_branch(opcode: int, next_address: int, operands: bytes):
+    """
+    :param opcode: Instruction that ends a block
+    :param next_address: Address of the instruction after it
+    :param operands: Immediate data following the opcode
+    :return: (condition under which the branch is taken or None if it always is, target address, cycles when taken,
+             cycles when not taken), or None if the instruction is not inlined
+    """
+    if opcode == 0x18 or (opcode & 0xE7) == 0x20:  # JR r8 / JR cc,r8
+        offset = operands[0] - 0x100 if operands[0] & 0x80 else operands[0]
+        target = (next_address + offset) & 0xFFFF
+        return (None if opcode == 0x18 else _CONDITIONS[(opcode >> 3) & 0x03]), target, 12, 8
+    if opcode == 0xC3 or (opcode & 0xE7) == 0xC2:  # JP a16 / JP cc,a16
+        target = (operands[1] << 8) | operands[0]
+        return (None if opcode == 0xC3 else _CONDITIONS[(opcode >> 3) & 0x03]), target, 16, 12
+    return None
+
+
+
+class Block:
+    """ Translated basic block """
+
+    __slots__ = ("start", "end", "function", "last_opcode", "instructions")
+
+    def __init__(self, start: int, end: int, function, last_opcode: int, instructions: int):
+        """
+        :param start: Address of the first instruction
+        :param end: Address right after the last instruction
+        :param function: Callable receiving the gb instance, returns the number of cycles spent
+        :param last_opcode: Opcode of the last instruction (the one that ended the block)
+        :param instructions: Number of instructions in the block
+        """
+        self.start = start
+        self.end = end
+        self.function = function
+        self.last_opcode = last_opcode
+        self.instructions = instructions
+
+
+class _BlockSource:
+    """ Source code of a block being translated, tracking which registers are held in local variables """
+
+    def __init__(self):
+        self.lines = ["def block(gb):", "    register = gb.cpu.register"]
+        self.namespace = dict(BLOCK_GLOBALS)
+        self.loaded = set()  # Registers and page tables currently held in local variables
+        self.modified = set()  # Local registers not stored back yet
+
+    def add(self, line: str):
+        """ Appends a line to the function body """
+        self.lines.append("    " + line)
+
+    def inline(self, lines):
+        """ Appends the lines of an inlined instruction, loading the local variables they use first """
+        for line in lines:
+            assignment = _ASSIGNMENT.match(line)
+            target = assignment.group(1) if assignment and assignment.group(1) in REGISTERS else None
+            # A plain assignment only writes its target, augmented ones (and subscripts, ifs...) also read it
+            used = line[assignment.end():] if target is not None and assignment.group(2) == "=" else line
+            for name in _NAME.findall(used):
+                if name not in self.loaded:
+                    self.loaded.add(name)
+                    if name in PAGE_TABLES:
+                        self.add("{0} = gb.memory._{0}".format(name))
+                    else:
+                        self.add("{0} = register.{0}".format(name))
+            self.add(line)
+            if target is not None:
+                self.loaded.add(target)
+                self.modified.add(target)
+
+    def store(self):
+        """ Stores the modified local registers back """
+        for name in REGISTERS:
+            if name in self.modified:
+                self.add("register.{0} = {0}".format(name))
+        self.modified.clear()
+
+    def leave(self, pc: int):
+        """ Stores the local registers and sets PC, as the rest of the emulator expects to see them """
+        self.store()
+        self.add("register.PC = 0x{:04X}".format(pc))
+
+    def call(self, function, name: str, pc: int):
+        """ Prepares to call an opcode function, which reads its operands from PC and may use any register """
+        self.namespace[name] = function
+        self.leave(pc)
+        self.loaded.difference_update(REGISTERS)
+
+    def branch(self, cycles: int, next_address: int, condition, target: int, taken_cycles: int, not_taken_cycles: int):
+        """ Ends the block with an inlined jump (see _inline_branch()) """
+        if condition is None:
+            self.leave(target)
+            self.add("return {}".format(cycles + taken_cycles))
+            return
+        self.inline(["taken = " + condition])
+        self.store()
+        self.add("if taken:")
+        self.add("    register.PC = 0x{:04X}".format(target))
+        self.add("    return {}".format(cycles + taken_cycles))
+        self.add("register.PC = 0x{:04X}".format(next_address))
+        self.add("return {}".format(cycles + not_taken_cycles))
+
+    def compile(self, pc: int):
+        """ :return: Function executing the block """
+        source = "\n".join(self.lines) + "\n"
+        exec(compile(source, "<block 0x{:04X}>".format(pc), "exec"), self.namespace)
+        return self.namespace["block"]
+
+
+class BlockCache:
+    """ Basic block translation cache """
+
+    # Maximum number of instructions in a block. Keeps the GPU and interrupts from being updated too late.
+    MAX_BLOCK_INSTRUCTIONS = 16
+
+    # Instructions that end a block, either because they may change PC or because interrupts/CPU state must be updated
+    # right after them. Unused opcodes are included, since the CPU should never be executing them.
+    BLOCK_END_OPCODES = frozenset([
+        0x10, 0x18, 0x20, 0x28, 0x30, 0x38, 0x76,                                      # STOP, JR, HALT
+        0xC0, 0xC2, 0xC3, 0xC4, 0xC7, 0xC8, 0xC9, 0xCA, 0xCC, 0xCD, 0xCF,              # RET, JP, CALL, RST
+        0xD0, 0xD2, 0xD4, 0xD7, 0xD8, 0xD9, 0xDA, 0xDC, 0xDF, 0xE7, 0xE9, 0xEF, 0xF7, 0xFF,
+        0xF3, 0xFB,                                                                    # DI, EI
+        0xD3, 0xDB, 0xDD, 0xE3, 0xE4, 0xEB, 0xEC, 0xED, 0xF4, 0xFC, 0xFD               # Unused
+    ])
+
+    # Length in bytes of each instruction (opcode + immediate data)
+    INSTRUCTION_LENGTH = [
+        1, 3, 1, 1, 1, 1, 2, 1, 3, 1, 1, 1, 1, 1, 2, 1,  # 0x
+        2, 3, 1, 1, 1, 1, 2, 1, 2, 1, 1, 1, 1, 1, 2, 1,  # 1x
+        2, 3, 1, 1, 1, 1, 2, 1, 2, 1, 1, 1, 1, 1, 2, 1,  # 2x
+        2, 3, 1, 1, 1, 1, 2, 1, 2, 1, 1, 1, 1, 1, 2, 1,  # 3x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 4x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 5x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 6x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 7x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 8x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # 9x
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # Ax
+        1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,  # Bx
+        1, 1, 3, 3, 3, 1, 2, 1, 1, 1, 3, 2, 3, 3, 2, 1,  # Cx
+        1, 1, 3, 1, 3, 1, 2, 1, 1, 1, 3, 1, 3, 1, 2, 1,  # Dx
+        2, 1, 1, 1, 1, 1, 2, 1, 2, 1, 3, 1, 1, 1, 2, 1,  # Ex
+        2, 1, 1, 1, 1, 1, 2, 1, 2, 1, 3, 1, 1, 1, 2, 1   # Fx
+    ]
+
+    # Cycles spent by each instruction, as returned by its op function. Not used for instructions that end a block,
+    # since their cycles depend on whether the branch is taken or not.
+    INSTRUCTION_CYCLES = [
+        4, 12,  8,  8,  4,  4,  8,  4, 20,  8,  8,  8,  4,  4,  8,  4,  # 0x
+        4, 12,  8,  8,  4,  4,  8,  4, 12,  8,  8,  8,  4,  4,  8,  4,  # 1x
+        8, 12,  8,  8,  4,  4,  8,  4,  8,  8,  8,  8,  4,  4,  8,  4,  # 2x
+        8, 12,  8,  8, 12, 12, 12,  4,  8,  8,  8,  8,  4,  4,  8,  4,  # 3x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # 4x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # 5x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # 6x
+        8,  8,  8,  8,  8,  8,  4,  8,  4,  4,  4,  4,  4,  4,  8,  4,  # 7x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # 8x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # 9x
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # Ax
+        4,  4,  4,  4,  4,  4,  8,  4,  4,  4,  4,  4,  4,  4,  8,  4,  # Bx
+        8, 12, 12, 16, 12, 16,  8, 16,  8, 16, 12,  4, 12, 24,  8, 16,  # Cx
+        8, 12, 12,  0, 12, 16,  8, 16,  8, 16, 12,  0, 12,  0,  8, 16,  # Dx
+       12, 12,  8,  0,  0, 16,  8, 16, 16,  4, 16,  0,  0,  0,  8, 16,  # Ex
+       12, 12,  8,  4,  0, 16,  8, 16, 12,  8, 16,  4,  0,  0,  8, 16   # Fx
+    ]
+
+    def __init__(self, gb):
+        """
+        :type gb: gb.GB
+        """
+        # Communication with other components
+        self.gb = gb
+
+        # State initialization
+        self._blocks = {}        # key (see get()) -> Block
+        self._ram_pages = {}     # RAM page -> list of blocks with at least one byte in that page
+        self._code_bytes = bytearray(0x10000)  # Number of cached blocks containing each RAM address (at most 48)
+
+    def get(self, pc: int):
+        """
+        Retrieves the block starting at the given address, translating it if needed.
+        :param pc: Address of the first instruction
+        :return: Block, or None if the address is in an area that cannot be cached
+        """
+        if pc < 0x4000:    # 0x0000 - 0x3FFF: Cartridge bank 0
+            if pc <= 0x00FF and self.gb.memory.boot_rom_loaded:
+                return None
+            key = pc
+        elif pc < 0x8000:  # 0x4000 - 0x7FFF: Cartridge bank N
+            key = (self.gb.memory.mbc.cartridge_bank << 16) | pc
+        elif 0xC000 <= pc <= 0xDFFF or 0xFF80 <= pc <= 0xFFFE:  # Internal RAM and High RAM
+            key = pc
+        else:
+            return None
+
+        block = self._blocks.get(key)
+        if block is None:
+            block = self._translate(pc)
+            self._blocks[key] = block
+            if pc >= 0x8000:
+                self._watch_ram_block(block)
+        return block
+
+    def clear(self):
+        """ Removes every block from the cache """
+        for page in list(self._ram_pages):
+            self._unwatch_page(page)
+        self._blocks.clear()
+        self._ram_pages.clear()
+        self._code_bytes = bytearray(0x10000)
+
+    def share_rom_blocks(self, other):
+        """
+        Adds the ROM blocks already translated by another instance running the same cartridge. Blocks receive the gb
+        instance as a parameter, so they can be shared.
+        :type other: BlockCache
+        """
+        for key, block in other._blocks.items():
+            if block.start < 0x8000:
+                self._blocks.setdefault(key, block)
+
+    def clear_ram(self):
+        """ Removes every block located in RAM (e.g. after RAM contents are replaced without going through writes) """
+        blocks = {block.start: block for page_blocks in self._ram_pages.values() for block in page_blocks}
+        for block in blocks.values():
+            self._invalidate(block)
+
+    def _translate(self, pc: int):
+        """
+        Decodes a basic block starting at the given address and compiles it into a single function.
+        :param pc: Address of the first instruction
+        :return: Translated block
+        """
+        translation = _BlockSource()
+        read_8bit = self.gb.memory.read_8bit
+        region_end = self._region_end(pc)
+        address = pc
+        cycles = 0
+        opcode = None
+        instructions = 0
+        while instructions < self.MAX_BLOCK_INSTRUCTIONS and address < region_end:
+            opcode = read_8bit(address)
+            instructions += 1
+            length = self.INSTRUCTION_LENGTH[opcode]
+            operands = bytes(read_8bit((address + offset) & 0xFFFF) for offset in range(1, length))
+            next_address = (address + length) & 0xFFFF
+            if opcode in self.BLOCK_END_OPCODES:
+                branch = _inline_branch(opcode, next_address, operands)
+                if branch is None:
+                    translation.call(op._instruction_dict[opcode], "code_{:02x}".format(opcode), address + 1)
+                    translation.add("return {} + code_{:02x}(gb)".format(cycles, opcode))
+                else:
+                    translation.branch(cycles, next_address, *branch)
+                address += length
+                break
+            elif opcode == 0xCB:  # PREFIX CB - inlined, or the extra function is called directly
+                cb_opcode = operands[0]
+                lines = _inline_cb_instruction(cb_opcode)
+                if lines is None:
+                    name = "code_cb_{:02x}".format(cb_opcode)
+                    translation.call(op._instruction_cb_dict[cb_opcode], name, next_address)
+                    translation.add("{}(gb)".format(name))
+                else:
+                    translation.inline(lines)
+                cycles += 4 + (16 if (cb_opcode & 0x07) == 0x06 else 8)  # (HL) operations take longer
+            else:
+                lines = _inline_instruction(opcode, operands)
+                if lines is None:
+                    name = "code_{:02x}".format(opcode)
+                    translation.call(op._instruction_dict[opcode], name, address + 1)
+                    translation.add("{}(gb)".format(name))
+                else:
+                    translation.inline(lines)
+                cycles += self.INSTRUCTION_CYCLES[opcode]
+            address += length
+        else:
+            # Block ended without a branch, so the next instruction simply follows the last one
+            translation.leave(address & 0xFFFF)
+            translation.add("return {}".format(cycles))
+
+        return Block(pc, min(address, 0x10000), translation.compile(pc), opcode, instructions)
+
+    @staticmethod
+    def _region_end(pc: int):
+        """
+        :return: Address where the memory area containing pc ends. Blocks never cross it, since a different cartridge
+                 bank or memory area may be mapped after it.
+        """
+        if pc < 0x4000:
+            return 0x4000
+        elif pc < 0x8000:
+            return 0x8000
+        elif pc < 0xE000:
+            return 0xE000
+        return 0xFFFF
+
+    # RAM blocks invalidation
+
+    def _watch_ram_block(self, block: Block):
+        """ Registers a block located in RAM, so writing to any of its bytes invalidates it """
+        for address in range(block.start, block.end):
+            self._code_bytes[address] += 1
+        for page in range(block.start >> 8, ((block.end - 1) >> 8) + 1):
+            if page not in self._ram_pages:
+                self._ram_pages[page] = []
+                self._watch_page(page)
+            self._ram_pages[page].append(block)
+
+    def _watch_page(self, page: int):
+        memory = self.gb.memory
+        memory.watch_writes(page, self._ram_written)
+        if 0xC0 <= page <= 0xDD:  # Internal RAM can also be written through its echo
+            memory.watch_writes(page + 0x20, self._ram_written)
+
+    def _unwatch_page(self, page: int):
+        memory = self.gb.memory
+        memory.unwatch_writes(page)
+        if 0xC0 <= page <= 0xDD:
+            memory.unwatch_writes(page + 0x20)
+
+    def _ram_written(self, address: int):
+        """
+        Called by memory before a watched RAM page is written.
+        :param address: Address being written
+        """
+        if 0xE000 <= address <= 0xFDFF:  # Internal RAM echo
+            address -= 0x2000
+        if not self._code_bytes[address]:
+            return  # Not code (e.g. stack or variables in the same page)
+
+        for block in list(self._ram_pages.get(address >> 8, ())):
+            if block.start <= address < block.end:
+                self._invalidate(block)
+
+    def _invalidate(self, block: Block):
+        """ Removes a RAM block from the cache """
+        del self._blocks[block.start]
+        for address in range(block.start, block.end):
+            self._code_bytes[address] -= 1
+        for page in range(block.start >> 8, ((block.end - 1) >> 8) + 1):
+            blocks = self._ram_pages[page]
+            blocks.remove(block)
+            if not blocks:
+                del self._ram_pages[page]
+                self._unwatch_page(page)
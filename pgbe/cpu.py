@@ -4,11 +4,12 @@ CPU
 Main processing class, responsible for executing every instruction, checking interrupts, timing, etc.
 """
 from register import Register
+from block_cache import BlockCache
+from scheduler import Scheduler
 import op
-from log import Log
 
 
-from datetime import datetime
+from time import perf_counter_ns
 
 
 class CPU:
@@ -17,62 +18,115 @@ class CPU:
     # The GameBoy CPU runs at 4194304hz, i.e. 4194304 cycles per second
     CLOCK_HZ = 4194304
 
-    # The special Divider Register (DIV, 0xFF04) must be incremented 16384 times per second, i.e. every 256 CPU cycles
-    DIV_ADDRESS = 0xFF04
-
     def __init__(self, gb):
         """
         :type gb: gb.GB
         """
         # Logger
-        self.logger = Log()
+        self.logger = gb.logger  # Shared by all components, so debug mode is switched in a single place
 
         # Communication with other components
         self.gb = gb
 
         # Components exclusive to CPU
-        self.register = Register()
+        self.register = Register(self.logger)
+        self.block_cache = BlockCache(gb)  # Set to None to execute one instruction at a time
+        self.profiler = None  # Set to a profiler.Profiler to record statistics of every instruction executed
 
         # State initialization
         self.halted = False  # for OP 76 (HALT)
         self.stopped = False  # for OP 10 (STOP)
+        self.cycle_count = 0  # Total number of cycles executed since power on
 
     def execute(self):
         """
-        Execution main loop
+        Execution main loop. Runs until a full frame has been completed by the GPU.
         """
+        start = perf_counter_ns()
+        gpu = self.gb.gpu
+        frame_count = gpu.frame_count
+        step = self.step_function()
+        while gpu.frame_count == frame_count:
+            step()
+        elapsed = perf_counter_ns() - start
+        self.gb.metrics.main_loop_done(elapsed)
         if self.gb.debug_mode:
-            start = datetime.now()
-        full_update_cycle_completed = False
-        while not full_update_cycle_completed:
-            opcode: int = None
-            cycles_spent = 0
-            if not self.halted and not self.stopped:
-                opcode = self.read_next_byte_from_cartridge()
-
-                if self.gb.debug_mode:
-                    plus1 = "{:02X}".format(self.gb.memory.read_8bit(self.register.PC))
-                    plus2 = "{:02X}".format(self.gb.memory.read_8bit(self.register.PC+1))
-                    self.logger.debug("Executing 0x%04X: %02X  [ %s , %s ]",self.register.PC-1,opcode,plus1,plus2)
-                cycles_spent += op.execute(self.gb, opcode)
-            cycles_spent += self.gb.interrupts.update(opcode)
-            full_update_cycle_completed = self.gb.gpu.update(cycles_spent)
+            print("total:", elapsed / 1e6, "\tFPS:", 1e9 / elapsed)
+
+    def step_function(self):
+        """
+        :return: Method the main loops must call to run the CPU: a profiler step if one is attached, a single step in
+                 debug mode (debug info is printed after each instruction, so blocks cannot be used), or a block step
+        """
+        if self.profiler is not None:
+            return self.profiler.step
+        return self.step if self.gb.debug_mode else self.step_block
+
+    def step(self):
+        """
+        Executes a single instruction, then updates interrupts and runs the scheduled events (e.g. GPU mode changes)
+        that are due. A halted/stopped CPU does not execute anything, but the system clock keeps running (see
+        _wait_for_event()).
+        :return: Number of cycles spent
+        """
+        if not self.halted and not self.stopped:
+            opcode: int = self.read_next_byte_from_cartridge()
 
             if self.gb.debug_mode:
-                self.gb.debug()
-                if self.gb.step_mode:
-                    input()
-
-            # TODO: redo
-            # if cycles_spent >= 256:
-            #     current_div = self.memory.read_8bit(self.DIV_ADDRESS)
-            #     new_div = (current_div + (cycles_spent/256)) & 0xFF  # TODO: what if value > FF?
-            #     self.memory.write_8bit(self.DIV_ADDRESS,new_div)
-            #     cycles_spent = cycles_spent % 256
+                plus1 = "{:02X}".format(self.gb.memory.read_8bit(self.register.PC))
+                plus2 = "{:02X}".format(self.gb.memory.read_8bit(self.register.PC+1))
+                self.logger.debug("Executing 0x%04X: %02X  [ %s , %s ]",self.register.PC-1,opcode,plus1,plus2)
+            cycles_spent = op.execute(self.gb, opcode)
+        else:
+            cycles_spent = self._wait_for_event()
+        if self.gb.interrupts.attention:
+            cycles_spent += self.gb.metrics.time(self.gb.metrics.INTERRUPTS, self.gb.interrupts.update)
+        self.cycle_count += cycles_spent
+        if self.cycle_count >= self.gb.scheduler.next_event_cycle:
+            self.gb.scheduler.run_due(self.cycle_count)
+
         if self.gb.debug_mode:
-            end = datetime.now()
-            delta = self.delta(start, end)
-            print("total:", delta, "\tFPS:",1000.0/delta)
+            self.gb.debug()
+            if self.gb.step_mode:
+                input()
+        return cycles_spent
+
+    def step_block(self):
+        """
+        Executes a whole basic block (see BlockCache), then updates interrupts and runs the scheduled events that are
+        due. If the current address cannot be cached, or the CPU is halted/stopped, a single step is executed instead.
+        :return: Number of cycles spent
+        """
+        if self.halted or self.stopped or self.block_cache is None:
+            return self.step()
+        block = self.block_cache.get(self.register.PC)
+        if block is None:
+            return self.step()
+        cycles_spent = block.function(self.gb)
+        if self.gb.interrupts.attention:
+            cycles_spent += self.gb.metrics.time(self.gb.metrics.INTERRUPTS, self.gb.interrupts.update)
+        self.cycle_count += cycles_spent
+        if self.cycle_count >= self.gb.scheduler.next_event_cycle:
+            self.gb.scheduler.run_due(self.cycle_count)
+        return cycles_spent
+
+    def _wait_for_event(self):
+        """
+        Called instead of executing an instruction while the CPU is halted/stopped. HALT ends as soon as an enabled
+        interrupt is requested (even if IME is off, in which case the interrupt is not serviced and execution just
+        resumes). Interrupts are only requested by scheduled events, so until one is pending nothing can change: the
+        clock jumps straight to the next event instead of spinning 4 cycles at a time.
+        STOP ends when a key is pressed (Joypad.press() clears the stopped flag), so until then a stopped CPU just lets
+        time pass.
+        :return: Number of cycles spent
+        """
+        if self.halted and self.gb.interrupts.pending:
+            self.halted = False
+            return 4
+        next_event_cycle = self.gb.scheduler.next_event_cycle
+        if next_event_cycle == Scheduler.NEVER:
+            return 4  # Nothing scheduled (e.g. no cartridge loaded yet)
+        return max(4, next_event_cycle - self.cycle_count)
 
     def read_next_byte_from_cartridge(self):
         """
@@ -83,10 +137,6 @@ class CPU:
         self.register.PC += 1
         return data
 
-    def delta(self, a, b):
-        diff = b-a
-        return (diff.seconds * 1000.0) + (diff.microseconds / 1000.0)
-
     def debug(self):
         """
         Prints debug info to console.
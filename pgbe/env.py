@@ -0,0 +1,276 @@
+"""
+Reinforcement learning environments
+
+Env wraps a headless GB with the reset()/step() interface used by Gymnasium (without depending on it):
+
+    env = Env("tetris.gb", frame_skip=4, reward_function=lambda gb: gb.memory.read_8bit(0xC0A0))
+    observation, info = env.reset()
+    while True:
+        observation, reward, terminated, truncated, info = env.step(agent.act(observation))
+        ...
+
+Each step holds the keys of the chosen action for frame_skip frames. Only the last of those frames is drawn, since
+the others are never observed. Observations are NumPy arrays that share memory with the emulator (the framebuffer or
+the internal RAM), so they are updated in place by the next step and must be copied if they are kept.
+
+VectorEnv runs several Envs in worker processes and steps them in parallel. Their observations are written to a
+single shared memory block, so the main process gets them as one array without any copy or pickling.
+
+Running this module measures the steps per second of both:
+
+    python env.py tetris.gb [frame_skip] [workers]
+"""
+import multiprocessing
+import sys
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy
+
+from gb import GB
+
+
+SCREEN = "screen"  # Observation: (144, 160, 3) RGB framebuffer
+RAM = "ram"  # Observation: (8192,) internal RAM (0xC000 - 0xDFFF)
+
+# No key, each key alone and the most common combinations
+DEFAULT_ACTIONS = ((), ("a",), ("b",), ("start",), ("select",), ("up",), ("down",), ("left",), ("right",),
+                   ("right", "a"), ("right", "b"), ("left", "a"), ("left", "b"))
+
+
+class Env:
+    """ Single headless emulator instance with a step-based interface """
+
+    def __init__(self, cartridge, frame_skip: int = 4, observation=SCREEN, actions=DEFAULT_ACTIONS,
+                 reward_function=None, done_function=None, max_steps: int = None, start_frames: int = 0):
+        """
+        :param cartridge: Game to execute, either the cartridge data itself or the path of the ROM file
+        :param frame_skip: Number of frames executed by each step
+        :param observation: SCREEN, RAM or a sequence of addresses whose values are observed
+        :param actions: Sequence of actions, each one being the joypad keys held during the step (see Joypad.KEYS)
+        :param reward_function: Called with the GB instance after each step, returns the reward (0.0 if None)
+        :param done_function: Called with the GB instance after each step, returns if the episode ended
+        :param max_steps: Number of steps after which the episode is truncated (never if None)
+        :param start_frames: Frames executed after power on, before the state that reset() goes back to
+        """
+        if frame_skip < 1:
+            raise ValueError("Frame skip must be at least 1: {}".format(frame_skip))
+        if isinstance(cartridge, str):
+            with open(cartridge, "rb") as f:
+                cartridge = f.read()
+
+        self.gb = GB(headless=True)
+        self.gb.load_cartridge(cartridge)
+        self.gb.run_frames(start_frames)
+        self._initial_state = self.gb.save_state()
+
+        self.frame_skip = frame_skip
+        self.actions = tuple(tuple(self.gb.joypad.key_bit(key) for key in action) for action in actions)
+        self.reward_function = reward_function
+        self.done_function = done_function
+        self.max_steps = max_steps
+        self.steps = 0  # Steps since the last reset
+
+        if isinstance(observation, str):
+            if observation == SCREEN:
+                gpu = self.gb.gpu
+                self.observation = numpy.frombuffer(gpu.framebuffer, dtype=numpy.uint8).reshape(
+                    gpu.SCREEN_HEIGHT, gpu.SCREEN_WIDTH, gpu.RGB_SIZE)
+            elif observation == RAM:
+                self.observation = numpy.frombuffer(self.gb.memory.internal_ram, dtype=numpy.uint8)
+            else:
+                raise ValueError("Unknown observation: {}".format(observation))
+            self._observed_addresses = None
+        else:
+            self._observed_addresses = tuple(observation)
+            self.observation = numpy.zeros(len(self._observed_addresses), dtype=numpy.uint8)
+
+    @property
+    def action_count(self):
+        """ :return: Number of possible actions (valid actions are 0 to action_count-1) """
+        return len(self.actions)
+
+    def _observe(self):
+        """ :return: Observation, updated with the current state """
+        if self._observed_addresses is not None:
+            read_8bit = self.gb.memory.read_8bit
+            self.observation[:] = [read_8bit(address) for address in self._observed_addresses]
+        return self.observation
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode, going back to the initial state.
+        :param seed: Unused, the emulator is deterministic (accepted for compatibility with Gymnasium)
+        :return: (observation, info)
+        """
+        self.gb.load_state(self._initial_state)
+        self.steps = 0
+        return self._observe(), {}
+
+    def step(self, action: int):
+        """
+        Holds the keys of the given action while frame_skip frames are executed.
+        :param action: Index of the action in actions
+        :return: (observation, reward, terminated, truncated, info)
+        """
+        joypad = self.gb.joypad
+        keys = self.actions[action]
+        for key in range(8):
+            if key in keys:
+                joypad.press(key)
+            else:
+                joypad.release(key)
+
+        gpu = self.gb.gpu
+        gpu.render_enabled = False
+        self.gb.run_frames(self.frame_skip - 1)
+        gpu.render_enabled = True
+        self.gb.run_frames(1)
+        self.steps += 1
+
+        gb = self.gb
+        reward = self.reward_function(gb) if self.reward_function is not None else 0.0
+        terminated = bool(self.done_function(gb)) if self.done_function is not None else False
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return self._observe(), reward, terminated, truncated, {"steps": self.steps}
+
+
+def _vector_env_worker(connection, memory_name: str, index: int, env_args: tuple, env_kwargs: dict):
+    """
+    Runs an Env in a worker process of a VectorEnv, executing the commands received through the connection.
+    Observations are copied to the given slot of the shared memory block.
+    """
+    shared_memory = SharedMemory(name=memory_name)
+    try:
+        env = Env(*env_args, **env_kwargs)
+        observations = numpy.ndarray((index + 1,) + env.observation.shape, dtype=numpy.uint8, buffer=shared_memory.buf)
+        connection.send(env.observation.shape)
+        while True:
+            command, action = connection.recv()
+            if command == "step":
+                observation, reward, terminated, truncated, info = env.step(action)
+                if terminated or truncated:  # Start a new episode, as Gymnasium vector environments do
+                    observation, _ = env.reset()
+                observations[index] = observation
+                connection.send((reward, terminated, truncated, info))
+            elif command == "reset":
+                observation, info = env.reset()
+                observations[index] = observation
+                connection.send(info)
+            else:
+                break
+        del observations  # Releases the exported buffer, so the shared memory can be closed
+    finally:
+        shared_memory.close()
+        connection.close()
+
+
+class VectorEnv:
+    """ Several Envs, each one in its own worker process, stepped together """
+
+    def __init__(self, count: int, *env_args, **env_kwargs):
+        """
+        :param count: Number of environments (and worker processes)
+        :param env_args: Arguments for each Env
+        :param env_kwargs: Keyword arguments for each Env (functions must be picklable, e.g. module level functions)
+        """
+        probe = Env(*env_args, **env_kwargs)  # Observation shape and actions, without waiting for the workers
+        self.action_count = probe.action_count
+        shape = probe.observation.shape
+        del probe
+
+        self._shared_memory = SharedMemory(create=True, size=count * int(numpy.prod(shape)))
+        self.observations = numpy.ndarray((count,) + shape, dtype=numpy.uint8, buffer=self._shared_memory.buf)
+        self._connections = []
+        self._processes = []
+        for index in range(count):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_vector_env_worker, daemon=True,
+                                              args=(worker_connection, self._shared_memory.name, index, env_args,
+                                                    env_kwargs))
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        for connection in self._connections:
+            connection.recv()  # Worker ready
+
+    @property
+    def count(self):
+        """ :return: Number of environments """
+        return len(self._connections)
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode in every environment.
+        :param seed: Unused, the emulator is deterministic
+        :return: (observations, infos), observations being an array with one observation per environment
+        """
+        for connection in self._connections:
+            connection.send(("reset", None))
+        infos = [connection.recv() for connection in self._connections]
+        return self.observations, infos
+
+    def step(self, actions):
+        """
+        Steps every environment in parallel. Environments whose episode ended are reset automatically.
+        :param actions: Sequence with the action of each environment
+        :return: (observations, rewards, terminated, truncated, infos), each with one entry per environment
+        """
+        for connection, action in zip(self._connections, actions):
+            connection.send(("step", int(action)))
+        results = [connection.recv() for connection in self._connections]
+        rewards, terminated, truncated, infos = zip(*results)
+        return (self.observations, numpy.array(rewards, dtype=numpy.float64), numpy.array(terminated),
+                numpy.array(truncated), list(infos))
+
+    def close(self):
+        """ Stops the worker processes and releases the shared memory """
+        if self._shared_memory is None:
+            return
+        for connection in self._connections:
+            connection.send(("close", None))
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        del self.observations
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def steps_per_second(env, steps: int = 1000):
+    """
+    Measures step throughput with random actions.
+    :param env: Env or VectorEnv (each step of a VectorEnv counts as one step per environment)
+    :param steps: Number of steps
+    :return: Steps per second
+    """
+    random = numpy.random.default_rng(0)
+    vector = isinstance(env, VectorEnv)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        if vector:
+            env.step(random.integers(env.action_count, size=env.count))
+        else:
+            env.step(int(random.integers(env.action_count)))
+    elapsed = time.perf_counter() - start
+    return steps * (env.count if vector else 1) / elapsed
+
+
+if __name__ == '__main__':
+    rom_file = sys.argv[1]
+    frame_skip = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else multiprocessing.cpu_count()
+
+    print("Env:       {:.1f} steps/s".format(steps_per_second(Env(rom_file, frame_skip=frame_skip), steps=200)))
+    with VectorEnv(workers, rom_file, frame_skip=frame_skip) as vector_env:
+        print("VectorEnv: {:.1f} steps/s ({} workers)".format(steps_per_second(vector_env, steps=200), workers))
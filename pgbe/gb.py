@@ -1,26 +1,62 @@
 """
 Responsible for instancing all necessary objects, so all GB components can communicate with one another.
 """
+from time import perf_counter_ns
+
 from cpu import CPU
 from memory import Memory
 from interrupts import Interrupts
 from gpu import GPU
-from screen import Screen
+from timer import Timer
+from joypad import Joypad
 from log import Log
+from scheduler import Scheduler
+from metrics import Metrics
+import state
+from rewind import Rewinder
+from profiler import Profiler
 
 
 class GB:
     """ GB components instantiation """
 
-    def __init__(self):
-        self.logger = Log()
+    def __init__(self, headless: bool = False, screen_scale: int = 1, screen=None, renderer=None,
+                 log_file: str = Log.LOG_FILE):
+        """
+        The screen is only created when execute() needs it, so creating an instance never opens a window nor imports
+        pyglet (e.g. in tests, or when only run_frames()/run_cycles() are used).
+        :param headless: If True no screen is ever created, so the emulator can run on machines without a display. It
+                         must then be driven by run_frames() or run_cycles().
+        :param screen_scale: Initial integer scaling of the default Screen window
+        :param screen: Callable receiving this instance and returning the front end run by execute(), which must
+                       provide run() and update(frame) like Screen does. If None, a pyglet Screen window is created.
+        :param renderer: Callable receiving this instance and returning its GPU (e.g. functools.partial(GPU,
+                         use_numpy=False)). If None, a GPU with the default settings is created.
+        :param log_file: File the debug mode messages are written to. Instances in debug mode at the same time should
+                         use different files, or their messages are mixed in the same one.
+        """
+        self.logger = Log(path=log_file)
 
         # Create components
+        self.scheduler = Scheduler()
         self.cpu = CPU(self)
         self.memory = Memory(self)
         self.interrupts = Interrupts(self)
-        self.screen = Screen(self)
-        self.gpu = GPU(self)
+        self.timer = Timer(self)
+        self.joypad = Joypad(self)
+        self.gpu = GPU(self) if renderer is None else renderer(self)
+        self._renderer_factory = renderer  # Kept so fork() creates the same kind of GPU
+        self.headless = headless
+        self.screen = None  # Created by execute(), see _create_screen()
+        self._screen_factory = screen
+        self._screen_scale = screen_scale
+        self.metrics = Metrics(self)  # Host time spent in each subsystem, see stats()
+        self.scheduler.metrics = self.metrics
+
+        # Receives the framebuffer every time a full frame is ready to be shown. None means frames are discarded.
+        self.frame_sink = None
+        # Captures a state every frame, so the game can be rewound (see Rewinder). None means rewind is disabled.
+        self.rewinder = None
 
         self.debug_mode = False
         self.step_mode = False
@@ -32,21 +68,119 @@ class GB:
         :param debug: If will run in debug mode or not
         :param step: If it will stop after executing each loop or not. Requires debug==True.
         """
-        self.print_cartridge_info(cartridge_data)
-        self.gpu.prepare()
-
+        if self.screen is None:
+            self.screen = self._create_screen()
         self.step_mode = step
         self.debug_mode = debug
         self.logger.setDebugMode(self.debug_mode)
 
         self.logger.info("Debug: %s\tStep: %s",self.debug_mode,self.step_mode)
+        self.load_cartridge(cartridge_data)
+
+        # The emulator screen will assume control of the main thread, so the emulator main loop must be triggered by the
+        # Screen itself, as a scheduled method call.
+        self.frame_sink = self.screen.update
+        if self.rewinder is None:
+            self.rewinder = Rewinder(self)  # Rewinding is always available while playing (see Screen.REWIND_KEY)
+        self.screen.run()
+
+    def _create_screen(self):
+        """ :return: New front end, as selected in the constructor """
+        if self.headless:
+            raise ValueError("A headless instance has no screen, use run_frames() or run_cycles() instead of execute()")
+        if self._screen_factory is not None:
+            return self._screen_factory(self)
+        from screen import Screen  # Creating a pyglet window requires a display, so only import it when needed
+        return Screen(self, scale=self._screen_scale)
+
+    def load_cartridge(self, cartridge_data: bytes):
+        """
+        Prepares all components to start executing the given game. Must be called before run_frames()/run_cycles().
+        :param cartridge_data: game to execute
+        """
+        self.print_cartridge_info(cartridge_data)
+        self.gpu.prepare()
+
         self.memory.load_cartridge(cartridge_data)
         if self.memory.boot_rom is None:
             self.cpu.register.skip_boot_rom()
 
-        # Instantiates the emulator screen. It will assume control of the main thread, so the emulator main loop must be
-        # triggered by the Screen itself, as a scheduled method call.
-        self.screen.run()
+    def run_frames(self, frames: int, frame_sink=None):
+        """
+        Headless main loop: executes the given number of frames as fast as possible, without any timer or window.
+        :param frames: Number of full frames to execute
+        :param frame_sink: Callable that receives the framebuffer each time a frame is ready, in place of
+                           Screen.update(). If None, frames are discarded.
+        """
+        self.frame_sink = frame_sink
+        for _ in range(frames):
+            self.cpu.execute()
+
+    def run_cycles(self, cycles: int, frame_sink=None):
+        """
+        Headless main loop: executes instructions as fast as possible until the given number of CPU cycles is spent.
+        The last instruction (or block of instructions) may end a few cycles after the requested amount, or, if the CPU
+        is halted, at the next scheduled event.
+        :param cycles: Number of CPU cycles to execute
+        :param frame_sink: Callable that receives the framebuffer each time a frame is ready, in place of
+                           Screen.update(). If None, frames are discarded.
+        :return: Number of CPU cycles actually executed
+        """
+        self.frame_sink = frame_sink
+        start_ns = perf_counter_ns()
+        start = self.cpu.cycle_count
+        end = start + cycles
+        step = self.cpu.step_function()
+        while self.cpu.cycle_count < end:
+            step()
+        self.metrics.main_loop_done(perf_counter_ns() - start_ns)
+        return self.cpu.cycle_count - start
+
+    def stats(self):
+        """
+        Where host time went since the emulator was created, or since metrics.reset() was last called (see Metrics).
+        To also append them to a file every N frames, see metrics.write_every().
+        :return: Dictionary with frames, cycles, seconds, fps and the time, calls and fraction of each subsystem
+        """
+        return self.metrics.snapshot()
+
+    def save_state(self, framebuffer: bool = True):
+        """
+        Captures the whole machine state (see state.py). The cartridge is not included.
+        :param framebuffer: If the framebuffer is included
+        :return: State as bytes, which can be passed to load_state()
+        """
+        return state.save_state(self, framebuffer)
+
+    def load_state(self, data: bytes, framebuffer: bool = True):
+        """
+        Restores a state returned by save_state(). The same cartridge must already be loaded.
+        :param data: State as bytes
+        :param framebuffer: If the state includes the framebuffer (as given to save_state())
+        """
+        state.load_state(self, data, framebuffer)
+
+    def fork(self):
+        """
+        Creates an independent copy of the emulator, in its current state, in this process (e.g. to explore different
+        inputs from the same point). The copy is always headless, and keeps the renderer, log file, block cache and
+        profiler settings (with a new, empty Profiler). Immutable data is shared instead of copied: cartridge, boot ROM,
+        decoded tiles and translated ROM blocks; everything else comes from a save state.
+        For copies in other processes, see batch.run_rollouts().
+        :return: New GB instance
+        """
+        clone = GB(headless=True, renderer=self._renderer_factory, log_file=self.logger.path)
+        if self.cpu.block_cache is None:
+            clone.cpu.block_cache = None
+        if self.cpu.profiler is not None:
+            clone.cpu.profiler = Profiler(clone)
+        clone.memory.share_cartridge(self.memory)
+        clone.load_state(self.save_state())
+        clone.memory.share_decoded_tiles(self.memory)
+        clone.gpu.share_decoded_tiles(self.gpu)
+        if self.cpu.block_cache is not None and clone.cpu.block_cache is not None:
+            clone.cpu.block_cache.share_rom_blocks(self.cpu.block_cache)
+        return clone
 
     def print_cartridge_info(self, cartridge_data: bytes):
         """
@@ -8,7 +8,10 @@ See:
 - http://imrannazar.com/GameBoy-Emulation-in-JavaScript:-GPU-Timings
 - http://imrannazar.com/GameBoy-Emulation-in-JavaScript:-Graphics
 """
-from log import Log
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the GPU falls back to rendering pixel by pixel
+    numpy = None
 
 
 class GPU:
@@ -24,86 +27,130 @@ class GPU:
     TILE_SET_ADDRESS = {0: 0x8800,
                         1: 0x8000}  # Memory address where each tile set begins
     UPDATE_HZ = 70224  # (Modes 2, 3 and 0 * 144 lines) + (Mode 1 * 10 loops)
+    MODE_2_CYCLES = 80
+    MODE_3_CYCLES = 172
+    MODE_0_CYCLES = 204
+    MODE_1_LINE_CYCLES = 456  # takes 4560 cpu cycles, but divided as 10 gpu loops
+    EVENT = "gpu"  # Name of the scheduler event for the end of the current mode
 
     # Used when LCD is disabled. To avoid confusion, we will display a blue screen.
     FRAME_LINE_LCD_DISABLED = [0, 0, 255] * SCREEN_WIDTH
     FRAME_LINE_BACKGROUND_DISABLED = [255, 255, 255] * SCREEN_WIDTH
 
-    def __init__(self, gb):
+    def __init__(self, gb, use_numpy: bool = numpy is not None):
         """
         :type gb: gb.GB
+        :param use_numpy: Render lines with NumPy array operations instead of pixel by pixel (requires NumPy)
         """
         # Logger
-        self.logger = Log()
+        self.logger = gb.logger  # Shared by all components, so debug mode is switched in a single place
 
         # Communication with other components
         self.gb = gb
 
+        # Registers (0xFF40 - 0xFF47), decoded as soon as they are written (see update_gpu_register())
+        self.lcd_control = LCD_CONTROL()
+        self.lcd_status = LCD_STATUS()
+        self.scroll_y = SCROLL_Y()
+        self.scroll_x = SCROLL_X()
+        self.lcd_y_coordinate = LCD_Y_COORDINATE()
+        self.background_palette = BACKGROUND_PALETTE()
+        self._registers = {register.ADDRESS: register for register in (
+            self.lcd_control, self.lcd_status, self.scroll_y, self.scroll_x, self.lcd_y_coordinate,
+            self.background_palette)}
+
         # State initialization
-        self.cpu_cycles = 0  # Used as a unit of measurement for gpu timing
-        self.framebuffer = [0, 0, 0] * (self.SCREEN_WIDTH * self.SCREEN_HEIGHT)  # Data being prepared to show on UI
+        self.frame_count = 0  # Number of full GPU update cycles completed (i.e. frames ready to be shown on screen)
+        self.use_numpy = use_numpy
+        self.render_enabled = True  # If False, lines are not drawn and the framebuffer keeps its contents (frame skip)
+        # Data being prepared to show on UI: R, G and B bytes of each pixel, line by line from the top left. It is a
+        # single contiguous buffer, so consumers (screen, recorders, tests) can read it through the buffer protocol.
+        self.framebuffer = bytearray(self.SCREEN_WIDTH * self.SCREEN_HEIGHT * self.RGB_SIZE)
+        self.frame = memoryview(self.framebuffer).toreadonly()  # What is handed to gb.frame_sink, without any copy
+        if use_numpy:
+            # (line, column, RGB) view of the framebuffer, shares its memory
+            self.framebuffer_array = numpy.frombuffer(self.framebuffer, dtype=numpy.uint8).reshape(
+                self.SCREEN_HEIGHT, self.SCREEN_WIDTH, self.RGB_SIZE)
+            self._tiles = numpy.zeros((384, 8, 8), dtype=numpy.uint8)  # Value (0-3) of every pixel of every VRAM tile
+            self._tiles_version = -1  # memory.tile_data_version when _tiles was last decoded
+            self._tile_maps = numpy.frombuffer(self.gb.memory.vram, dtype=numpy.uint8,
+                                               count=0x800, offset=0x1800).reshape(2, 32, 32)  # View, not a copy
+            # Tile number (from the tile map) -> position in _tiles, for each tile set (see memory.get_tile())
+            tile_numbers = numpy.arange(256)
+            self._tile_indexes = [numpy.where(tile_numbers < 128, tile_numbers + 256, tile_numbers), tile_numbers]
+            self._line_columns = numpy.arange(self.SCREEN_WIDTH)
 
     def prepare(self):
         """ Init code that cannot be executed on __init__ because not everything is initialized yet """
-        LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 2)
-
-    def update(self, cpu_cycles_spent: int):
+        self.gb.memory.write_8bit(self.lcd_y_coordinate.ADDRESS, 0)  # Mode 2 below is the start of line 0
+        self.lcd_status.set_lcd_controller_mode(self.gb.memory, 2)
+        self.gb.scheduler.schedule(self.EVENT, self.gb.cpu.cycle_count + self.MODE_2_CYCLES, self._oam_search_completed)
+
+    # Display update progress according to LCD controller mode (0, 1, 2 or 3):
+    # Mode 2  ...2_____2_____2_____2_____... one cycle ...2______________________________... mode 1 ...2_____...
+    # Mode 3  ..._33____33____33____33___... for each  ..._33____________________________... lasts  ..._33___...
+    # Mode 0  ...___000___000___000___000...  of the   ...___000_________________________... for 10 ...___000...
+    # Mode 1  ...________________________... 144 lines ...______1111111111111111111111111... loops  ...______...
+    #
+    # The duration of each mode is fixed, so instead of checking the mode after every instruction, the end of the
+    # current mode is scheduled as an event (see Scheduler), and each of the methods below starts the next mode and
+    # schedules its end. They receive the cycle the event was scheduled for, so the next one is not delayed by
+    # instructions that end a few cycles after a deadline.
+    #
+    # See:
+    # - http://imrannazar.com/GameBoy-Emulation-in-JavaScript:-GPU-Timings
+    # - http://gbdev.gg8.se/files/docs/mirrors/pandocs.html#videodisplay
+
+    def _oam_search_completed(self, cycle: int):
         """
-        Executed after each instruction. Update the status of gpu and makes the required changes.
-
-        Display update progress according to LCD controller mode (0, 1, 2 or 3):
-        Mode 2  ...2_____2_____2_____2_____... one cycle ...2______________________________... mode 1 ...2_____...
-        Mode 3  ..._33____33____33____33___... for each  ..._33____________________________... lasts  ..._33___...
-        Mode 0  ...___000___000___000___000...  of the   ...___000_________________________... for 10 ...___000...
-        Mode 1  ...________________________... 144 lines ...______1111111111111111111111111... loops  ...______...
+        End of mode 2: the LCD controller was reading from OAM memory.
+        The CPU <cannot> access OAM memory (FE00h-FE9Fh) during this period.
+        """
+        self.lcd_status.set_lcd_controller_mode(self.gb.memory, 3)
+        self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_3_CYCLES, self._pixel_transfer_completed)
 
-        See:
-        - http://imrannazar.com/GameBoy-Emulation-in-JavaScript:-GPU-Timings
-        - http://gbdev.gg8.se/files/docs/mirrors/pandocs.html#videodisplay
+    def _pixel_transfer_completed(self, cycle: int):
+        """
+        End of mode 3: the LCD controller was reading from both OAM and VRAM.
+        The CPU <cannot> access OAM and VRAM during this period.
+        """
+        if self.render_enabled:
+            self.gb.metrics.time(self.gb.metrics.RENDER, self.copy_current_display_line_to_framebuffer)
+        self.lcd_status.set_lcd_controller_mode(self.gb.memory, 0)
+        self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_0_CYCLES, self._h_blank_completed)
 
-        :param cpu_cycles_spent: Number of cycles executed during last CPU update.
+    def _h_blank_completed(self, cycle: int):
+        """
+        End of mode 0 (H-Blank): the controller was moving to the beginning of the next display line.
+        The CPU can access both the VRAM (8000h-9FFFh) and OAM (FE00h-FE9Fh).
+        """
+        next_line = self.lcd_y_coordinate.go_to_next_line(self.gb.memory)
+        if next_line == 144:  # Last screen line (144 to 153 only happen during V-Blank state)
+            self.gb.interrupts.set_v_blank_requested_flag(True)
+            if self.gb.frame_sink is not None:
+                # Draw framebuffer to screen (or hand it to headless sink)
+                self.gb.metrics.time(self.gb.metrics.PRESENT, self.gb.frame_sink, self.frame)
+            self.lcd_status.set_lcd_controller_mode(self.gb.memory, 1)
+            self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_1_LINE_CYCLES, self._v_blank_line_completed)
+            if self.gb.rewinder is not None:
+                # Only once the next mode is scheduled, so it is part of the state
+                self.gb.metrics.time(self.gb.metrics.REWIND, self.gb.rewinder.capture)
+        else:
+            self.lcd_status.set_lcd_controller_mode(self.gb.memory, 2)
+            self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_2_CYCLES, self._oam_search_completed)
 
-        :return If the full GPU update cycle has finished executing (i.e. a frame is ready to be shown on screen)
+    def _v_blank_line_completed(self, cycle: int):
+        """
+        End of one of the 10 lines of mode 1 (V-Blank): the controller finished drawing the frame and is moving back to
+        the display's top-left. The CPU can access both the display RAM (8000h-9FFFh) and OAM (FE00h-FE9Fh).
         """
-        full_update_cycle_completed = False
-        self.cpu_cycles += cpu_cycles_spent
-
-        mode = LCD_STATUS.lcd_controller_mode
-        if mode == 2:
-            # The LCD controller is reading from OAM memory.
-            # The CPU <cannot> access OAM memory (FE00h-FE9Fh) during this period.
-            if self.cpu_cycles >= 80:
-                LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 3)
-                self.cpu_cycles -= 80
-        elif mode == 3:
-            # The LCD controller is reading from both OAM and VRAM.
-            # The CPU <cannot> access OAM and VRAM during this period.
-            if self.cpu_cycles >= 172:
-                self.copy_current_display_line_to_framebuffer()
-                LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 0)
-                self.cpu_cycles -= 172
-        elif mode == 0:
-            # H-Blank: the controller is moving to the beginning of the next display line.
-            # The CPU can access both the VRAM (8000h-9FFFh) and OAM (FE00h-FE9Fh).
-            if self.cpu_cycles >= 204:
-                next_line = LCD_Y_COORDINATE.go_to_next_line(self.gb.memory)
-                if next_line == 144:  # Last screen line (144 to 153 only happen during V-Blank state)
-                    self.gb.screen.update(self.framebuffer)  # Draw framebuffer to screen
-                    LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 1)
-                else:
-                    LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 2)
-                self.cpu_cycles -= 204
-        elif mode == 1:
-            # V-Blank: the controller finished drawing the frame and is now moving back to the display's top-left.
-            # The CPU can access both the display RAM (8000h-9FFFh) and OAM (FE00h-FE9Fh).
-            if self.cpu_cycles >= 456:  # takes 4560 cpu cycles, but divided as 10 gpu loops
-                next_line = LCD_Y_COORDINATE.go_to_next_line(self.gb.memory)
-                if next_line == 0:  # First line, so restart drawing cycle
-                    LCD_STATUS.set_lcd_controller_mode(self.gb.memory, 2)
-                    full_update_cycle_completed = True
-                self.cpu_cycles -= 456
-
-        return full_update_cycle_completed
+        next_line = self.lcd_y_coordinate.go_to_next_line(self.gb.memory)
+        if next_line == 0:  # First line, so restart drawing cycle
+            self.lcd_status.set_lcd_controller_mode(self.gb.memory, 2)
+            self.frame_count += 1
+            self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_2_CYCLES, self._oam_search_completed)
+        else:
+            self.gb.scheduler.schedule(self.EVENT, cycle + self.MODE_1_LINE_CYCLES, self._v_blank_line_completed)
 
     def copy_current_display_line_to_framebuffer(self):
         """
@@ -120,30 +167,35 @@ class GPU:
         - https://realboyemulator.files.wordpress.com/2013/01/gbcpuman.pdf
         - http://www.codeslinger.co.uk/pages/projects/gameboy/graphics.html
         """
-        current_display_line = LCD_Y_COORDINATE.value
+        if self.use_numpy:
+            self._copy_current_display_line_to_framebuffer_numpy()
+            return
+
+        current_display_line = self.lcd_y_coordinate.value
+        lcd_control = self.lcd_control
         pos = current_display_line * self.RGB_LINE_SIZE
-        if not LCD_CONTROL.lcd_display_enabled:
+        if not lcd_control.lcd_display_enabled:
             # LCD is disabled, so to avoid confusion we will display a blue screen
             self.framebuffer[pos:pos + self.RGB_LINE_SIZE] = self.FRAME_LINE_LCD_DISABLED
         else:
-            if not LCD_CONTROL.display_background:
+            if not lcd_control.display_background:
                 # If background drawing is disabled, it must be draw as white
                 self.framebuffer[pos:pos + self.RGB_LINE_SIZE] = self.FRAME_LINE_BACKGROUND_DISABLED
             else:
-                y_background = SCROLL_Y.value + current_display_line
+                y_background = self.scroll_y.value + current_display_line
                 y_tile_map = y_background // 8  # Each tile is 8 pixels tall (// = return int)
                 if y_tile_map >= 32:
                     y_tile_map -= 32  # To wrap the background on screen
                 tile_line = y_background % 8  # Which line of the tile we need to draw
 
-                tile_map_row = self.gb.memory.get_map(LCD_CONTROL.background_tile_map)[y_tile_map]  # unsigned int
+                tile_map_row = self.gb.memory.get_map(lcd_control.background_tile_map)[y_tile_map]  # unsigned int
 
-                x_tile_map = SCROLL_X.value // 8
-                x_offset = SCROLL_X.value % 8
+                x_tile_map = self.scroll_x.value // 8
+                x_offset = self.scroll_x.value % 8
                 pixel_count = 0
                 while pixel_count < self.SCREEN_WIDTH:
                     tile_number = tile_map_row[x_tile_map]
-                    tile_line_data = self.gb.memory.get_tile(LCD_CONTROL.tile_set_selected, tile_number)[tile_line]
+                    tile_line_data = self.gb.memory.get_tile(lcd_control.tile_set_selected, tile_number)[tile_line]
                     if x_offset > 0:
                         tile_line_data = tile_line_data[x_offset:]
                         x_offset = 0
@@ -156,24 +208,73 @@ class GPU:
                     if x_tile_map == 32:
                         x_tile_map = 0
 
-    @staticmethod
-    def update_gpu_register(address: int, value: int):
+    def render_frame(self):
+        """
+        Draws every display line with the current registers and VRAM (e.g. after loading a state without framebuffer).
+        Register changes made while the original frame was drawn (e.g. scrolling a part of the screen) are not
+        reproduced, since only their final values are known.
+        """
+        current_line = self.lcd_y_coordinate.value
+        for line in range(self.SCREEN_HEIGHT):
+            self.lcd_y_coordinate.update(line)
+            self.copy_current_display_line_to_framebuffer()
+        self.lcd_y_coordinate.update(current_line)
+
+    def _copy_current_display_line_to_framebuffer_numpy(self):
+        """
+        Same as copy_current_display_line_to_framebuffer(), but the whole line is built at once: the tile map row is
+        converted to tile line pixels with a gather over the decoded tiles, scrolled, and then mapped to RGB colors.
+        """
+        current_display_line = self.lcd_y_coordinate.value
+        lcd_control = self.lcd_control
+        if not lcd_control.lcd_display_enabled:
+            self.framebuffer_array[current_display_line] = (0, 0, 255)  # LCD is disabled, display a blue screen
+        elif not lcd_control.display_background:
+            self.framebuffer_array[current_display_line] = (255, 255, 255)  # Background disabled, drawn as white
+        else:
+            if self._tiles_version != self.gb.memory.tile_data_version:
+                self._decode_tiles_numpy()
+
+            # Background wraps around after 256 pixels
+            y_background = (self.scroll_y.value + current_display_line) & 0xFF
+            tile_map_row = self._tile_maps[lcd_control.background_tile_map, y_background // 8]
+            tile_indexes = self._tile_indexes[lcd_control.tile_set_selected][tile_map_row]
+            background_line = self._tiles[tile_indexes, y_background % 8].reshape(256)  # 32 tiles * 8 pixels
+            pixels = background_line[(self._line_columns + self.scroll_x.value) & 0xFF]
+            self.framebuffer_array[current_display_line] = self.background_palette.color_array[pixels]
+
+    def _decode_tiles_numpy(self):
+        """
+        Decodes all 384 VRAM tiles at once. Each tile line is 2 bytes: the first has bit 0 of each pixel value and the
+        second has bit 1, most significant bit being the leftmost pixel.
+        """
+        tile_data = numpy.frombuffer(self.gb.memory.vram, dtype=numpy.uint8, count=0x1800).reshape(384, 8, 2)
+        bits = numpy.unpackbits(tile_data, axis=2)  # (384, 8, 16): 8 bits of the first byte, then 8 of the second
+        self._tiles = bits[:, :, :8] | (bits[:, :, 8:] << 1)
+        self._tiles_version = self.gb.memory.tile_data_version
+
+    def share_decoded_tiles(self, other):
+        """
+        Reuses the tiles decoded by another instance (if they are up to date), which must have the same VRAM contents.
+        Decoding always creates a new array, so both instances can keep the same one.
+        :type other: GPU
+        """
+        if self.use_numpy and other.use_numpy and other._tiles_version == other.gb.memory.tile_data_version:
+            self._tiles = other._tiles
+            self._tiles_version = self.gb.memory.tile_data_version
+
+    def update_gpu_register(self, address: int, value: int):
         """ Improve performance by updating internal data structures as soon as memory is changed """
-        if address == LCD_CONTROL.ADDRESS:
-            LCD_CONTROL.update(value)
-        elif address == LCD_STATUS.ADDRESS:
-            LCD_STATUS.update(value)
-        elif address == SCROLL_Y.ADDRESS:
-            SCROLL_Y.update(value)
-        elif address == SCROLL_X.ADDRESS:
-            SCROLL_X.update(value)
-        elif address == LCD_Y_COORDINATE.ADDRESS:
-            LCD_Y_COORDINATE.update(value)
-        elif address == BACKGROUND_PALETTE.ADDRESS:
-            BACKGROUND_PALETTE.update(value)
+        register = self._registers.get(address)
+        if register is not None:
+            register.update(value)
 
-    @staticmethod
-    def _apply_palette_transformation(base_color: int):
+    def load_registers(self):
+        """ Decodes every register again from memory (e.g. after memory contents were restored without writes) """
+        for address, register in self._registers.items():
+            register.update(self.gb.memory.read_8bit(address))
+
+    def _apply_palette_transformation(self, base_color: int):
         """
         Converts the default color value from a pixel into the correct one based on the palette being applied.
         Bit 7-6 - Shade for Color Number 3
@@ -183,15 +284,16 @@ class GPU:
         The four possible gray shades are: 0=White, 1=Light gray, 2=Dark gray, 3=Black
         :return:  Tuple with correct color based on palette
         """
-        return BACKGROUND_PALETTE.color[base_color]
+        return self.background_palette.color[base_color]
 
     def debug(self):
         """
         Prints debug info to console.
         """
-        current_lcd_line = LCD_Y_COORDINATE.value
-        mode = LCD_STATUS.lcd_controller_mode
-        self.logger.debug("Mode: %i\tLY(FF44): %i\tCycles: %i",mode,current_lcd_line,self.cpu_cycles)
+        current_lcd_line = self.lcd_y_coordinate.value
+        mode = self.lcd_status.lcd_controller_mode
+        next_mode_cycle = self.gb.scheduler.cycle_of(self.EVENT)
+        self.logger.debug("Mode: %i\tLY(FF44): %i\tNext mode at cycle: %s",mode,current_lcd_line,next_mode_cycle)
 
 
 # noinspection PyPep8Naming
@@ -200,26 +302,29 @@ class LCD_CONTROL:
 
     ADDRESS = 0xFF40
 
-    lcd_display_enabled = False  # 7
-    window_tile_map = 0  # 6
-    display_window = False  # 5
-    tile_set_selected = 0  # 4
-    background_tile_map = 0  # 3
-    sprite_size = 0  # 2
-    display_sprites = False  # 1
-    display_background = False  # 0
+    __slots__ = ("lcd_display_enabled", "window_tile_map", "display_window", "tile_set_selected",
+                 "background_tile_map", "sprite_size", "display_sprites", "display_background")
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.lcd_display_enabled = False  # 7
+        self.window_tile_map = 0  # 6
+        self.display_window = False  # 5
+        self.tile_set_selected = 0  # 4
+        self.background_tile_map = 0  # 3
+        self.sprite_size = 0  # 2
+        self.display_sprites = False  # 1
+        self.display_background = False  # 0
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
-        LCD_CONTROL.lcd_display_enabled = LCD_CONTROL._lcd_display_enabled(new_register_value)
-        LCD_CONTROL.window_tile_map = LCD_CONTROL._window_tile_map(new_register_value)
-        LCD_CONTROL.display_window = LCD_CONTROL._display_window(new_register_value)
-        LCD_CONTROL.tile_set_selected = LCD_CONTROL._tile_set_selected(new_register_value)
-        LCD_CONTROL.background_tile_map = LCD_CONTROL._background_tile_map(new_register_value)
-        LCD_CONTROL.sprite_size = LCD_CONTROL._sprite_size(new_register_value)
-        LCD_CONTROL.display_sprites = LCD_CONTROL._display_sprites(new_register_value)
-        LCD_CONTROL.display_background = LCD_CONTROL._display_background(new_register_value)
+        self.lcd_display_enabled = self._lcd_display_enabled(new_register_value)
+        self.window_tile_map = self._window_tile_map(new_register_value)
+        self.display_window = self._display_window(new_register_value)
+        self.tile_set_selected = self._tile_set_selected(new_register_value)
+        self.background_tile_map = self._background_tile_map(new_register_value)
+        self.sprite_size = self._sprite_size(new_register_value)
+        self.display_sprites = self._display_sprites(new_register_value)
+        self.display_background = self._display_background(new_register_value)
 
     @staticmethod
     def _lcd_display_enabled(lcd_control_byte: int):
@@ -268,24 +373,25 @@ class LCD_STATUS:
 
     ADDRESS = 0xFF41
 
-    lcd_controller_mode = 0
+    __slots__ = ("lcd_controller_mode",)
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.lcd_controller_mode = 0
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
-        LCD_STATUS.lcd_controller_mode = LCD_STATUS._lcd_controller_mode(new_register_value)
+        self.lcd_controller_mode = self._lcd_controller_mode(new_register_value)
 
     @staticmethod
     def _lcd_controller_mode(lcd_stat_byte: int):
         """ :return Current state of the LCD controller. Goes from 0 to 3. """
         return lcd_stat_byte & 0b00000011
 
-    @staticmethod
-    def set_lcd_controller_mode(memory, new_mode: int):
+    def set_lcd_controller_mode(self, memory, new_mode: int):
         """ Simulate display processing mode change """
-        lcd_stat_byte = memory.read_8bit(LCD_STATUS.ADDRESS)
+        lcd_stat_byte = memory.read_8bit(self.ADDRESS)
         new_lcd_stat_byte = (lcd_stat_byte & 0b11111100) | new_mode
-        memory.write_8bit(LCD_STATUS.ADDRESS, new_lcd_stat_byte)  # Memory will call the update() method
+        memory.write_8bit(self.ADDRESS, new_lcd_stat_byte)  # Memory will call the update() method
 
 
 # noinspection PyPep8Naming
@@ -294,12 +400,14 @@ class SCROLL_Y:
 
     ADDRESS = 0xFF42
 
-    value = 0
+    __slots__ = ("value",)
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.value = 0
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
-        SCROLL_Y.value = new_register_value
+        self.value = new_register_value
 
 
 # noinspection PyPep8Naming
@@ -308,12 +416,14 @@ class SCROLL_X:
 
     ADDRESS = 0xFF43
 
-    value = 0
+    __slots__ = ("value",)
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.value = 0
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
-        SCROLL_X.value = new_register_value
+        self.value = new_register_value
 
 
 # noinspection PyPep8Naming
@@ -322,25 +432,26 @@ class LCD_Y_COORDINATE:
 
     ADDRESS = 0xFF44
 
-    value = 0
+    __slots__ = ("value",)
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.value = 0
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
-        LCD_Y_COORDINATE.value = new_register_value
+        self.value = new_register_value
 
-    @staticmethod
-    def go_to_next_line(memory):
+    def go_to_next_line(self, memory):
         """
         Simulate display processing line change.
         :return Number of the next line that will start processing now
         """
-        current_line = LCD_Y_COORDINATE.value
+        current_line = self.value
         if current_line == 153:
             new_line = 0
         else:
             new_line = current_line + 1
-        memory.write_8bit(LCD_Y_COORDINATE.ADDRESS,new_line)
+        memory.write_8bit(self.ADDRESS,new_line)
         return new_line
 
 
@@ -355,14 +466,26 @@ class BACKGROUND_PALETTE:
                        2: [96, 96, 96],
                        3: [0, 0, 0]}  # colors displayed by the GameBoy
 
-    color = [_DISPLAY_COLORS[0],
-             _DISPLAY_COLORS[1],
-             _DISPLAY_COLORS[2],
-             _DISPLAY_COLORS[3]]
+    __slots__ = ("color", "color_array")
 
-    @staticmethod
-    def update(new_register_value: int):
+    def __init__(self):
+        self.color = [self._DISPLAY_COLORS[0],
+                      self._DISPLAY_COLORS[1],
+                      self._DISPLAY_COLORS[2],
+                      self._DISPLAY_COLORS[3]]
+        self.color_array = self._to_array(self.color)
+
+    def update(self, new_register_value: int):
         """ Update internal values according to new register value set """
         for i in range(4):
             correct_color = (new_register_value >> (i * 2)) & 0b00000011
-            BACKGROUND_PALETTE.color[i] = BACKGROUND_PALETTE._DISPLAY_COLORS[correct_color]
+            self.color[i] = self._DISPLAY_COLORS[correct_color]
+        self.color_array = self._to_array(self.color)
+
+    @staticmethod
+    def _to_array(color: list):
+        """
+        :return: Colors as a (4, RGB) NumPy array, indexed by the NumPy renderer, or None without NumPy. Built only when
+                 the register is written, instead of on every display line.
+        """
+        return numpy.array(color, dtype=numpy.uint8) if numpy is not None else None
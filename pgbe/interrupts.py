@@ -15,7 +15,6 @@ See:
 - https://realboyemulator.wordpress.com/2013/01/18/emulating-the-core-2/
 - https://realboyemulator.wordpress.com/2013/07/01/interrupt-processing-a-real-world-example/
 """
-from log import Log
 
 
 class Interrupts:
@@ -29,81 +28,95 @@ class Interrupts:
     TIMER_HANDLER = 0x0050
     SERIAL_HANDLER = 0x0058
     JOYPAD_HANDLER = 0x0060
-    
+
+    # Interrupts pending (IF & IE & 0x1F) -> handler of the one with the highest priority, i.e. the lowest bit set
+    # (V-Blank == bit 0, LCD STAT == bit 1, Timer == bit 2, Serial == bit 3, Joypad == bit 4)
+    HANDLER_BY_PENDING_FLAGS = tuple(
+        handlers[(pending & -pending).bit_length() - 1] if pending else None
+        for handlers in [(V_BLANK_HANDLER, LCD_STAT_HANDLER, TIMER_HANDLER, SERIAL_HANDLER, JOYPAD_HANDLER)]
+        for pending in range(32))
+
     def __init__(self, gb):
         """
         :type gb: gb.GB
         """
         # Logger
-        self.logger = Log()
+        self.logger = gb.logger  # Shared by all components, so debug mode is switched in a single place
 
         # Communication with other components
         self.gb = gb
 
         # State initialization
         self.IME = False
-        self.enable_IME_after_next_instruction = False
-        self.disable_IME_after_next_instruction = False
-
-    def update(self, opcode_executed: int):
+        self.IF = 0x00  # Copy of the Interrupt Request register (0xFF0F), kept in sync by Memory
+        self.IE = 0x00  # Copy of the Interrupt Enable register (0xFFFF), kept in sync by Memory
+        self.pending = 0  # IF & IE & 0x1F: interrupts that are both requested and enabled (they also end HALT)
+        self.enable_IME_countdown = 0  # Instructions until IME is set (see EI)
+        self.disable_IME_countdown = 0  # Instructions until IME is reset (see DI)
+        # Non-zero when update() has something to do. This is all the CPU checks after each instruction.
+        self.attention = 0
+
+    def _update_attention(self):
+        """ Must be called whenever anything update() depends on changes """
+        self.attention = (self.enable_IME_countdown or self.disable_IME_countdown or
+                          (self.pending if self.IME else 0))
+
+    def write_requests(self, value: int):
+        """ Called by Memory when the Interrupt Request register (0xFF0F) is written """
+        self.IF = value
+        self.pending = value & self.IE & 0x1F
+        self._update_attention()
+
+    def write_enabled(self, value: int):
+        """ Called by Memory when the Interrupt Enable register (0xFFFF) is written """
+        self.IE = value
+        self.pending = self.IF & value & 0x1F
+        self._update_attention()
+
+    def enable_after_next_instruction(self):
+        """ EI: IME is set after the instruction that follows EI is executed """
+        self.enable_IME_countdown = 2  # Counting the update() right after EI itself
+        self._update_attention()
+
+    def disable_after_next_instruction(self):
+        """ DI: IME is reset after the instruction that follows DI is executed """
+        self.disable_IME_countdown = 2  # Counting the update() right after DI itself
+        self._update_attention()
+
+    def enable(self):
+        """ RETI: IME is set right away, since RETI itself is the instruction following the implicit EI """
+        self.IME = True
+        self.enable_IME_countdown = 0
+        self._update_attention()
+
+    def update(self):
         """
-        Executed after each instruction. Update the status of interrupts and makes the required changes when an
-        interrupt must be fired.
+        Executed after each instruction in which attention is non-zero. Update the status of interrupts and makes the
+        required changes when an interrupt must be fired.
 
-        :param opcode_executed: Used to update IME flag
         :return Number of cycles spent
         """
         cycles_spent = 0
-        if self.enable_IME_after_next_instruction or opcode_executed == 0xD9:  # RETI - Same as EI,RET
-            self.enable_IME_after_next_instruction = False
-            self.IME = True
-        if self.disable_IME_after_next_instruction:
-            self.disable_IME_after_next_instruction = False
-            self.IME = False
-        
-        if self.IME:
-            if self.v_blank_requested() and self.v_blank_enabled():
-                self.IME = False  # Disable interrupts
-                self.set_v_blank_requested_flag(False)  # Interrupt request is being handled, so disable flag
-                self._push_current_address_to_stack()
-                self.gb.cpu.register.PC = self.V_BLANK_HANDLER
-                self.gb.cpu.halted = False
-                cycles_spent = 5
-            elif self.lcd_stat_requested() and self.lcd_stat_enabled():
-                self.IME = False  # Disable interrupts
-                self.set_lcd_stat_requested_flag(False)  # Interrupt request is being handled, so disable flag
-                self._push_current_address_to_stack()
-                self.gb.cpu.register.PC = self.LCD_STAT_HANDLER
-                self.gb.cpu.halted = False
-                cycles_spent = 5
-            elif self.timer_requested() and self.timer_enabled():
-                self.IME = False  # Disable interrupts
-                self.set_timer_requested_flag(False)  # Interrupt request is being handled, so disable flag
-                self._push_current_address_to_stack()
-                self.gb.cpu.register.PC = self.TIMER_HANDLER
-                self.gb.cpu.halted = False
-                cycles_spent = 5
-            elif self.serial_requested() and self.serial_enabled():
-                self.IME = False  # Disable interrupts
-                self.set_serial_requested_flag(False)  # Interrupt request is being handled, so disable flag
-                self._push_current_address_to_stack()
-                self.gb.cpu.register.PC = self.SERIAL_HANDLER
-                self.gb.cpu.halted = False
-                cycles_spent = 5
-            elif self.joypad_requested() and self.joypad_enabled():
-                self.IME = False  # Disable interrupts
-                self.set_joypad_requested_flag(False)  # Interrupt request is being handled, so disable flag
-                self._push_current_address_to_stack()
-                self.gb.cpu.register.PC = self.JOYPAD_HANDLER
-                self.gb.cpu.halted = False
-                cycles_spent = 5
-
-        # Prepare for next update cycle
-        if opcode_executed == 0xFB:  # EI - Enable interrupts after next instruction is executed
-            self.enable_IME_after_next_instruction = True
-        if opcode_executed == 0xF3:  # DI - Disable interrupts after next instruction is executed
-            self.disable_IME_after_next_instruction = True
-
+        if self.enable_IME_countdown:
+            self.enable_IME_countdown -= 1
+            if not self.enable_IME_countdown:
+                self.IME = True
+        if self.disable_IME_countdown:
+            self.disable_IME_countdown -= 1
+            if not self.disable_IME_countdown:
+                self.IME = False
+
+        pending = self.pending
+        if self.IME and pending:
+            self.IME = False  # Disable interrupts
+            # Interrupt request is being handled, so disable its flag (Memory updates IF and pending)
+            self.gb.memory.write_8bit(self.REQUESTS_FLAG_ADDRESS, self.IF & ~(pending & -pending))
+            self._push_current_address_to_stack()
+            self.gb.cpu.register.PC = self.HANDLER_BY_PENDING_FLAGS[pending]
+            self.gb.cpu.halted = False
+            cycles_spent = 5
+
+        self._update_attention()
         return cycles_spent
 
     # Get Flags
@@ -111,12 +124,11 @@ class Interrupts:
     def _get_flag(self, address: int, bit_position: int):
         """
         Get specified flag bit.
-        :param address: Address to read from memory
+        :param address: Address of the register (its cached value is used, memory is not read)
         :param bit_position: Flag to return
         """
-        interrupt_flag_byte = self.gb.memory.read_8bit(address)
-        mask = 1 << bit_position
-        return (interrupt_flag_byte & mask) >> bit_position
+        interrupt_flag_byte = self.IF if address == self.REQUESTS_FLAG_ADDRESS else self.IE
+        return (interrupt_flag_byte >> bit_position) & 1
 
     def v_blank_requested(self):
         """ Get V-Blank interrupt requested flag """
@@ -226,8 +238,8 @@ class Interrupts:
         """
         Prints debug info to console.
         """
-        requests_byte = "{:08b}".format(self.gb.memory.read_8bit(self.REQUESTS_FLAG_ADDRESS))
-        enabled_byte = "{:08b}".format(self.gb.memory.read_8bit(self.ENABLED_FLAG_ADDRESS))
+        requests_byte = "{:08b}".format(self.IF)
+        enabled_byte = "{:08b}".format(self.IE)
         self.logger.debug("IEM: %s\tRequests(IF@FF0F): %s\tEnabled(IE@FFFF): %s\tEnable_next: %s\tDisable_next: %s",
-                          self.IME,requests_byte,enabled_byte,self.enable_IME_after_next_instruction,
-                          self.disable_IME_after_next_instruction)
+                          self.IME,requests_byte,enabled_byte,self.enable_IME_countdown,
+                          self.disable_IME_countdown)
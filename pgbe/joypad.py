@@ -0,0 +1,87 @@
+"""
+Joypad
+
+    FF00 - P1/JOYP - Joypad
+        Bit 5 - P15 Select Button Keys      (0=Select)
+        Bit 4 - P14 Select Direction Keys   (0=Select)
+        Bit 3 - P13 Input Down  or Start    (0=Pressed) (Read Only)
+        Bit 2 - P12 Input Up    or Select   (0=Pressed) (Read Only)
+        Bit 1 - P11 Input Left  or Button B (0=Pressed) (Read Only)
+        Bit 0 - P10 Input Right or Button A (0=Pressed) (Read Only)
+
+The game selects which group of keys it wants to read by writing bits 4-5, then reads their state from bits 0-3.
+Pressing a key requests the Joypad interrupt and ends STOP mode.
+
+See:
+- http://gbdev.gg8.se/files/docs/mirrors/pandocs.html#joypadinput
+"""
+
+
+class Joypad:
+    """ GB Joypad """
+
+    ADDRESS = 0xFF00
+
+    # Bit of each key in pressed: directions in the low nibble, buttons in the high nibble
+    RIGHT = 0
+    LEFT = 1
+    UP = 2
+    DOWN = 3
+    A = 4
+    B = 5
+    SELECT = 6
+    START = 7
+
+    KEYS = {"right": RIGHT, "left": LEFT, "up": UP, "down": DOWN, "a": A, "b": B, "select": SELECT, "start": START}
+
+    def __init__(self, gb):
+        """
+        :type gb: gb.GB
+        """
+        # Communication with other components
+        self.gb = gb
+
+        # State initialization
+        self.pressed = 0  # Bit set for each key currently pressed
+
+    @classmethod
+    def key_bit(cls, key):
+        """
+        :param key: Key constant (e.g. Joypad.A) or name (e.g. "a", case insensitive)
+        :return: Key constant
+        """
+        if isinstance(key, str):
+            try:
+                return cls.KEYS[key.lower()]
+            except KeyError:
+                raise ValueError("Unknown joypad key: {}".format(key)) from None
+        return key
+
+    def press(self, key):
+        """
+        :param key: Key constant (e.g. Joypad.A) or name (e.g. "a")
+        """
+        bit = 1 << self.key_bit(key)
+        if not self.pressed & bit:
+            self.pressed |= bit
+            self.gb.interrupts.set_joypad_requested_flag(True)
+            self.gb.cpu.stopped = False
+
+    def release(self, key):
+        """
+        :param key: Key constant (e.g. Joypad.A) or name (e.g. "a")
+        """
+        self.pressed &= ~(1 << self.key_bit(key))
+
+    def read(self, select: int):
+        """
+        Called by Memory when FF00 is read.
+        :param select: Last value written to FF00 (only bits 4-5 matter)
+        :return: FF00 value, with the state of the selected keys
+        """
+        keys = 0
+        if not select & 0x10:
+            keys |= self.pressed & 0x0F
+        if not select & 0x20:
+            keys |= self.pressed >> 4
+        return 0xC0 | (select & 0x30) | (~keys & 0x0F)
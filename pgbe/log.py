@@ -1,35 +1,70 @@
 import logging
+import os
 
 
 class Log:
+    """
+    Logging shared by the emulator components.
 
-    logger = None
-    debugModeActive = False
+    While debug mode is off, debug() and info() are replaced by a method that does nothing, so calls made from the
+    instruction hot path cost a single no-op call. Call sites must pass values as %-style arguments instead of
+    formatting the message themselves, so no string is built unless the message is really logged.
 
-    def __init__(self, debugModeActive: bool = None):
-        if self.logger is None:
-            self.logger = logging.getLogger("pgbe")
-            # log_handler = logging.NullHandler()
-            log_handler = logging.FileHandler("pgbe.log", mode="w")
-            formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-            log_handler.setFormatter(formatter)
-            self.logger.addHandler(log_handler)
-            self.logger.setLevel(logging.DEBUG)
-            # self.logger.setLevel(logging.ERROR)
+    Each instance can log to its own file. Instances logging to the same file share its handler, so the file is only
+    opened (and truncated) once and records are not written over each other.
+    """
 
-        if debugModeActive is not None:
-            self.debugModeActive = debugModeActive
+    LOG_FILE = "pgbe.log"
+    _handlers = {}  # Absolute path -> logging.FileHandler of that file, shared by every instance logging to it
+
+    def __init__(self, debugModeActive: bool = False, path: str = LOG_FILE):
+        """
+        :param debugModeActive: If messages are logged
+        :param path: File the messages are written to
+        """
+        self.path = path
+        self._logger = None  # logging.Logger, only created (and the log file opened) when debug mode is enabled
+        self.debugModeActive = False
+        self.setDebugMode(debugModeActive)
+
+    def _get_logger(self):
+        """
+        :return: Logger of this instance, creating it with its file handler the first time. Loggers are not registered
+                 in the logging module, so each emulator instance keeps its own.
+        """
+        if self._logger is None:
+            logger = logging.Logger("pgbe", logging.DEBUG)
+            logger.addHandler(self._get_handler(self.path))
+            self._logger = logger
+        return self._logger
+
+    @classmethod
+    def _get_handler(cls, path: str):
+        """ :return: Handler writing to the given file, created the first time the file is used in this process """
+        path = os.path.abspath(path)
+        log_handler = cls._handlers.get(path)
+        if log_handler is None:
+            log_handler = logging.FileHandler(path, mode="w", delay=True)  # Opened on the first record
+            log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+            cls._handlers[path] = log_handler
+        return log_handler
+
+    @property
+    def logger(self):
+        """ :return: Underlying logging.Logger """
+        return self._get_logger()
 
     def setDebugMode(self, debugModeActive: bool):
         self.debugModeActive = debugModeActive
+        if debugModeActive:
+            logger = self._get_logger()
+            self.debug = logger.debug
+            self.info = logger.info
+        else:
+            self.debug = self._disabled
+            self.info = self._disabled
 
-    def debug(self,  msg, *args, **kwargs):
-        if self.debugModeActive:
-            if len(args) > 0 and len(kwargs) > 0:
-                self.logger.debug(msg, args, kwargs)
-            else:
-                self.logger.debug(msg)
-
-    def info(self, msg, *args, **kwargs):
-        if self.debugModeActive:
-            self.logger.info(msg, args, kwargs)
+    @staticmethod
+    def _disabled(msg, *args, **kwargs):
+        """ Used in place of debug()/info() while debug mode is off """
+        pass
@@ -56,142 +56,272 @@ See:
 - https://stackoverflow.com/questions/21639597/z80-register-endianness
 """
 import array
-from log import Log
 
 
 class Memory:
     """ Memory """
 
+    # Size of each page in the page table. Each page is selected by the most significant byte of the address.
+    PAGE_SIZE = 0x100
+
+    # Number of tiles in VRAM, considering both tile sets
+    TILE_COUNT = 384
+
+    # What disabled external RAM reads as, mapped to each of its pages
+    _DISABLED_EXTERNAL_RAM_PAGE = memoryview(bytes(PAGE_SIZE))  # TODO: Is 0x00 the correct behavior?
+
+    # Pixel values (bits 0 and 1) of a tile line for each possible value of the lower and upper bytes of that line
+    _TILE_LINE_LOW = [[(byte >> (7 - i)) & 0b00000001 for i in range(8)] for byte in range(0x100)]
+    _TILE_LINE_HIGH = [[((byte >> (7 - i)) & 0b00000001) << 1 for i in range(8)] for byte in range(0x100)]
+
     def __init__(self, gb):
         """
         :type gb: gb.GB
         """
         # Logger
-        self.logger = Log()
+        self.logger = gb.logger  # Shared by all components, so debug mode is switched in a single place
 
         # Communication with other components
         self.gb = gb
 
         # State initialization
-        self.tile_set_1_only = None  # These will be initialized
-        self.tile_set_shared = None  # below, this is just to
-        self.tile_set_0_only = None  # have them declared in
-        self.tile_maps = None        # the __init__ method
-
         # Cartridge bank 0, so nothing to initialize:  0x3FFF - 0x0000
         # Cartridge bank N, so nothing to initialize:  0x7FFF - 0x4000
-        self._generate_tile_set_memory()  # VRAM sets: 0x97FF - 0x8000
-        self._generate_tile_map_memory()  # VRAM maps: 0x9FFF - 0x9800
+        self.vram = bytearray(0x9FFF - 0x8000 + 1)  # VRAM sets: 0x97FF - 0x8000 / VRAM maps: 0x9FFF - 0x9800
+        self._tile_cache = None  # Decoded tiles, see _generate_tile_cache()
+        self._dirty_tiles = None
+        self.tile_data_version = 0  # Incremented on every tile set write, so other decoders know when to refresh
+        self.tile_maps = None
+        self._generate_tile_cache()
+        self._generate_tile_map_memory()
         self.external_ram = self._generate_memory_map((0xBFFF - 0xA000 + 1) * 4)  # Maximum RAM size, with 4 banks
         self.internal_ram = self._generate_memory_map( 0xDFFF - 0xC000 + 1)
         # Internal RAM echo, so nothing to initialize: 0xFDFF - 0xE000
-        self.oam          = self._generate_memory_map( 0xFE9F - 0xFE00 + 1)
-        # Empty, so nothing to initialize:             0xFEFF - 0xFEA0
-        self.io           = self._generate_memory_map( 0xFF7F - 0xFF00 + 1)
-        self.hram         = self._generate_memory_map( 0xFFFE - 0xFF80 + 1)
-        self.ie = 0x00  # Single address, no array:    0xFFFF
-
-        self.cartridge: bytes = None
+        self._oam_page    = self._generate_memory_map( 0xFEFF - 0xFE00 + 1)  # OAM + empty area, which is always 0
+        self._high_page   = self._generate_memory_map( 0xFFFF - 0xFF00 + 1)  # I/O + HRAM + IE
+        self.oam  = memoryview(self._oam_page)[0x00:0xA0]   # 0xFE9F - 0xFE00
+        # Empty, so nothing to initialize:               0xFEFF - 0xFEA0
+        self.io   = memoryview(self._high_page)[0x00:0x80]  # 0xFF7F - 0xFF00
+        self.hram = memoryview(self._high_page)[0x80:0xFF]  # 0xFFFE - 0xFF80
+        # IE is the last byte of the high page, see the "ie" property: 0xFFFF
+
+        self._cartridge: bytes = None
         self.boot_rom: bytes = None
-        self.boot_rom_loaded = False
+        self._boot_rom_loaded = False
 
         self.mbc: MBC = None
 
-    def _generate_tile_set_memory(self):
+        # Page table: one entry per most significant address byte, indexed by the least significant byte. If the page is
+        # directly mapped to a buffer the entry is a memoryview of the PAGE_SIZE bytes it maps to, otherwise it is the
+        # page handler, which calls the methods responsible for that area (e.g. when a write has side effects, like MBC
+        # registers and I/O). Either way, every access is a single index operation.
+        self._page_handlers = [PageHandler(page << 8) for page in range(0x100)]
+        self._read_pages = list(self._page_handlers)
+        self._write_pages = list(self._page_handlers)
+        self._generate_page_table()
+
+    def _generate_tile_cache(self):
         """
         GameBoy VRAM memory stores 2 tile sets. Each tile set contains 255 tiles (8x8 images). However, the GameBoy does
-        not have enough memory for two full sets, so they share half (128) their tiles. This method generates the data
-        structure to handle this.
-        """
-        self.tile_set_1_only = [self._generate_blank_tile() for _ in range(128)]  # 8000-87FF
-        self.tile_set_shared = [self._generate_blank_tile() for _ in range(128)]  # 8800-8FFF
-        self.tile_set_0_only = [self._generate_blank_tile() for _ in range(128)]  # 9000-97FF
+        not have enough memory for two full sets, so they share half (128) their tiles, for a total of 384 tiles:
+            8000-87FF: tiles   0-127, only in tile set 1
+            8800-8FFF: tiles 128-255, shared by both tile sets
+            9000-97FF: tiles 256-383, only in tile set 0
 
-    @staticmethod
-    def _generate_blank_tile():
-        """ Creates an empty matrix, representing one tile (8x8 pixels) """
-        return [[0]*8 for _ in range(8)]
+        Tiles are stored in VRAM exactly as the GameBoy does (2 bytes per tile line), but the GPU needs the value of
+        each pixel. Decoding is done lazily: writing to a tile only marks it as dirty, and it is decoded again the next
+        time it is requested by get_tile().
+        """
+        self._tile_cache = [None] * self.TILE_COUNT
+        self._dirty_tiles = bytearray(b"\x01" * self.TILE_COUNT)
+        self.tile_data_version += 1
 
     def _generate_tile_map_memory(self):
         """
         GameBoy VRAM memory stores 2 tile maps. Each tile map contains 32x32 tile IDs, and differently from the tile
-        sets, there is enough memory for two separate maps. This method generates the data structure to handle this.
+        sets, there is enough memory for two separate maps. This method generates views of each map line, so the tile
+        IDs can be read from VRAM without any copy.
         """
+        vram = memoryview(self.vram)
         self.tile_maps = [
-            [[0]*32 for _ in range(32)],  # Tile 0 comes first, uses memory 9800-9BFF
-            [[0]*32 for _ in range(32)]   # Tile 1 comes later, uses memory 9C00-9FFF
+            [vram[0x1800 + (line * 32):0x1800 + (line * 32) + 32] for line in range(32)],  # Uses memory 9800-9BFF
+            [vram[0x1C00 + (line * 32):0x1C00 + (line * 32) + 32] for line in range(32)]   # Uses memory 9C00-9FFF
         ]
 
+    def _generate_page_table(self):
+        """
+        Fills the page table with the initial mapping of every memory area. Areas that depend on the cartridge/MBC
+        state are mapped again whenever that state changes (see the _map_* methods).
+        """
+        handlers = self._page_handlers
+        for page in range(0x00, 0x80):  # 0x0000 - 0x7FFF: Cartridge ROM, writes go to the MBC
+            handlers[page].read = self._read_cartridge
+        for page in range(0x00, 0x20):
+            handlers[page].write = self._write_mbc_external_ram_status
+        for page in range(0x20, 0x40):
+            handlers[page].write = self._write_mbc_cartridge_bank
+        for page in range(0x40, 0x60):
+            handlers[page].write = self._write_mbc_ram_bank
+        for page in range(0x60, 0x80):
+            handlers[page].write = self._write_mbc_banking_mode
+
+        vram = memoryview(self.vram)
+        for page in range(0x80, 0x98):  # 0x8000 - 0x97FF: VRAM tile sets, writes must invalidate decoded tiles
+            self._map_page(page, vram, (page - 0x80) * self.PAGE_SIZE, writable=False)
+            handlers[page].write = self._write_tile_set
+        for page in range(0x98, 0xA0):  # 0x9800 - 0x9FFF: VRAM tile maps
+            self._map_page(page, vram, (page - 0x80) * self.PAGE_SIZE)
+
+        for page in range(0xA0, 0xC0):  # 0xA000 - 0xBFFF: External RAM, only accessible while enabled
+            self._read_pages[page] = self._DISABLED_EXTERNAL_RAM_PAGE
+            handlers[page].write = self._write_disabled_external_ram
+
+        internal_ram = memoryview(self.internal_ram)
+        for page in range(0xC0, 0xE0):  # 0xC000 - 0xDFFF: Internal RAM
+            self._map_page(page, internal_ram, (page - 0xC0) * self.PAGE_SIZE)
+        for page in range(0xE0, 0xFE):  # 0xE000 - 0xFDFF: Internal RAM Echo
+            self._map_page(page, internal_ram, (page - 0xE0) * self.PAGE_SIZE)
+
+        self._read_pages[0xFE] = memoryview(self._oam_page)  # 0xFE00 - 0xFEFF: OAM + Empty area
+        handlers[0xFE].write = self._write_oam
+
+        handlers[0xFF].read = self._read_high_page  # 0xFF00 - 0xFFFF: I/O + HRAM + IE
+        handlers[0xFF].write = self._write_high_page
+
+    def _map_page(self, page: int, buffer, offset: int, writable: bool = True):
+        """
+        Maps a page directly to a buffer, so reads (and writes, if writable) become a single index access.
+        :param page: Most significant byte of the addresses being mapped
+        :param buffer: memoryview of the buffer where data is located
+        :param offset: Position in the buffer where the page begins
+        :param writable: If writes can go directly to the buffer or must still go through the page handler
+        """
+        view = buffer[offset:offset + self.PAGE_SIZE]
+        self._read_pages[page] = view
+        if writable:
+            self._write_pages[page] = view
+
+    def _unmap_page(self, page: int):
+        """ Removes direct mapping from a page, so its handler is used instead """
+        self._read_pages[page] = self._page_handlers[page]
+        self._write_pages[page] = self._page_handlers[page]
+
+    def _map_cartridge(self):
+        """ Maps cartridge bank 0 (and boot ROM, if loaded) and the cartridge bank currently selected by the MBC """
+        if self._cartridge is None:
+            return
+        cartridge = memoryview(self._cartridge)
+        for page in range(0x00, 0x40):  # 0x0000 - 0x3FFF: Cartridge bank 0
+            self._map_page(page, cartridge, page * self.PAGE_SIZE, writable=False)
+        if self._boot_rom_loaded:  # 0x0000 - 0x00FF: Boot ROM
+            self._map_page(0x00, memoryview(self.boot_rom), 0x0000, writable=False)
+        self._map_cartridge_bank()
+
+    def _map_cartridge_bank(self):
+        """ Maps the cartridge bank currently selected by the MBC to 0x4000 - 0x7FFF """
+        if self._cartridge is None or self.mbc is None:
+            return
+        cartridge = memoryview(self._cartridge)
+        bank_offset = self.mbc.cartridge_bank_offset()
+        for page in range(0x40, 0x80):
+            self._map_page(page, cartridge, bank_offset + (page - 0x40) * self.PAGE_SIZE, writable=False)
+
+    def _map_external_ram(self):
+        """ Maps the external RAM bank currently selected by the MBC to 0xA000 - 0xBFFF, if it is enabled """
+        external_ram = memoryview(self.external_ram)
+        bank_offset = self.mbc.external_ram_bank_offset()
+        for page in range(0xA0, 0xC0):
+            if self.mbc.external_ram_is_enabled:
+                self._map_page(page, external_ram, bank_offset + (page - 0xA0) * self.PAGE_SIZE)
+            else:
+                self._unmap_page(page)
+                self._read_pages[page] = self._DISABLED_EXTERNAL_RAM_PAGE
+
+    def watch_writes(self, page: int, callback):
+        """
+        Calls callback(address) before every write to the given page, until unwatch_writes() is called.
+        :param page: Most significant byte of the addresses to watch
+        :param callback: Callable receiving the address being written
+        """
+        self._write_pages[page] = WatchedPage(self._write_pages[page], callback, page << 8)
+
+    def unwatch_writes(self, page: int):
+        """ Stops calling the callback registered by watch_writes() for the given page """
+        self._write_pages[page] = self._write_pages[page].target
+
+    @property
+    def cartridge(self):
+        """ Cartridge data as bytes """
+        return self._cartridge
+
+    @cartridge.setter
+    def cartridge(self, cartridge_data: bytes):
+        self._cartridge = cartridge_data
+        self._map_cartridge()
+
+    @property
+    def boot_rom_loaded(self):
+        """ If the boot ROM is currently mapped to 0x0000 - 0x00FF """
+        return self._boot_rom_loaded
+
+    @boot_rom_loaded.setter
+    def boot_rom_loaded(self, loaded: bool):
+        self._boot_rom_loaded = loaded
+        self._map_cartridge()
+
+    @property
+    def ie(self):
+        """ 0xFFFF: Interrupts Enable Register (IE) """
+        return self._high_page[0xFF]
+
+    @ie.setter
+    def ie(self, value: int):
+        self._high_page[0xFF] = value
+        self.gb.interrupts.write_enabled(value)
+
     def load_cartridge(self, cartridge_data: bytes):
         """
         Stores reference to cartridge data, to be accessed later. Also instantiates the MBC specified in cartridge.
         :param cartridge_data: Cartridge data as bytes
         """
-        self.cartridge = cartridge_data
-        mbc_type = self.cartridge[0x0147]
+        mbc_type = cartridge_data[0x0147]
         self.mbc = MBC(mbc_type)
+        self.cartridge = cartridge_data
+        self._map_external_ram()
 
         self.load_boot_rom()
         self.boot_rom_loaded = (self.boot_rom is not None)
 
+    def share_cartridge(self, other):
+        """
+        Uses the cartridge (and boot ROM) already loaded by another instance, without copying or reading them again.
+        MBC state and memory contents are not copied, see GB.fork().
+        :type other: Memory
+        """
+        self.mbc = MBC(other.cartridge[0x0147])
+        self.boot_rom = other.boot_rom
+        self.cartridge = other.cartridge
+
+    def share_decoded_tiles(self, other):
+        """
+        Reuses the tiles decoded by another instance, which must have the same VRAM contents. Decoded tiles are never
+        modified, only replaced, so both instances can keep the same ones.
+        :type other: Memory
+        """
+        self._tile_cache = list(other._tile_cache)
+        self._dirty_tiles = bytearray(other._dirty_tiles)
+
     def _read(self, address: int):
         """
         Read a byte from a location mapped in memory, wherever it is.
         :param address: Address to read
         :return: Value at specified address
         """
-        if address <= 0x3FFF:    # 0x0000 - 0x3FFF: Cartridge bank 0
-            if 0x0000 <= address <= 0x00FF and self.boot_rom_loaded:
-                return self.boot_rom[address]
-            return self.cartridge[address]
-
-        elif address <= 0x7FFF:  # 0x4000 - 0x7FFF: Cartridge bank N
-            return self.cartridge[self.mbc.cartridge_bank_offset() + (address-0x4000)]
-
-        elif address <= 0x9FFF:  # 0x8000 - 0x9FFF: Video RAM
-            if address <= 0x97FF:  # Tile sets memory
-                return self._read_tile_set(address)
-            else:  # Tile maps memory
-                return self._read_tile_map(address)
-
-        elif address <= 0xBFFF:  # 0xA000 - 0xBFFF: External RAM
-            if self.mbc.external_ram_is_enabled:
-                return self.external_ram[self.mbc.external_ram_bank_offset() + (address-0xA000)]
-            else:
-                return 0x00  # TODO: Is this the correct behavior?
-
-        elif address <= 0xDFFF:  # 0xC000 - 0xDFFF: Internal RAM
-            return self.internal_ram[address - 0xC000]
-
-        elif address <= 0xFDFF:  # 0xE000 - 0xFDFF: Internal RAM Echo
-            return self.internal_ram[address - 0xE000]
-
-        elif address <= 0xFE9F:  # 0xFE00 - 0xFE9F: Object Attribute Memory (OAM)
-            return self.oam[address - 0xFE00]
-
-        elif address <= 0xFEFF:  # 0xFEA0 - 0xFEFF: Empty area
-            return 0x00
-
-        elif address <= 0xFF7F:  # 0xFF00 - 0xFF7F: I/O Memory
-            return self.io[address - 0xFF00]
+        return self._read_pages[address >> 8][address & 0xFF]
 
-        elif address <= 0xFFFE:  # 0xFF80 - 0xFFFE: High RAM
-            return self.hram[address - 0xFF80]
-
-        elif address == 0xFFFF:  # 0xFFFF: Interrupts Enable Register (IE)
-            return self.ie
-
-    def _read_tile_set(self, address: int):
-        tile_line, tile_line_byte_to_read = self._find_tile_set(address)
-
-        byte = 0x00
-        for pixel_value in tile_line:  # pixel_value is 0-3, and we want the binary value from the desired position
-            byte = (byte << 1) | ((pixel_value >> tile_line_byte_to_read) & 0b00000001)
-        return byte
-
-    def _read_tile_map(self, address: int):
-        tile_map_line, tile_map_pos_number = self._find_tile_map(address)
-        return tile_map_line[tile_map_pos_number]
+    def _read_cartridge(self, address: int):
+        """ Cartridge ROM not mapped by an MBC yet, so read it as if there was no MBC """
+        return self._cartridge[address]
 
     def _write(self, address: int, value: int):
         """
@@ -199,97 +329,92 @@ class Memory:
         :param address: Address where data will be written
         :param value:   Data to write
         """
-        if address <= 0x1FFF:    # 0x0000 - 0x1FFF: MBC - Enable/Disable external RAM
-            self.mbc.change_external_ram_status(value)
-
-        if address <= 0x3FFF:    # 0x2000 - 0x3FFF: MBC - Change cartridge bank mapped to N
-            self.mbc.change_cartridge_bank(value)
-
-        if address <= 0x5FFF:    # 0x4000 - 0x5FFF: MBC - Change external RAM bank mapped
-            self.mbc.change_ram_bank(value)
-
-        if address <= 0x7FFF:    # 0x6000 - 0x7FFF: MBC - Change ROM/RAM Mode
-            self.mbc.change_banking_mode(value)
-
-        if address <= 0x9FFF:    # 0x8000 - 0x9FFF: Video RAM
-            if address <= 0x97FF:  # Tile sets memory
-                return self._write_tile_set(address, value)
-            else:  # Tile maps memory
-                return self._write_tile_map(address, value)
-
-        elif address <= 0xBFFF:  # 0xA000 - 0xBFFF: External RAM
-            if self.mbc.external_ram_is_enabled:
-                self.external_ram[address - 0xA000] = value
-
-        elif address <= 0xDFFF:  # 0xC000 - 0xDFFF: Internal RAM
-            self.internal_ram[address - 0xC000] = value
-
-        elif address <= 0xFDFF:  # 0xE000 - 0xFDFF: Internal RAM Echo
-            self.internal_ram[address - 0xE000] = value
-
-        elif address <= 0xFE9F:  # 0xFE00 - 0xFE9F: Object Attribute Memory (OAM)
-            self.oam[address - 0xFE00] = value
-
-        elif address <= 0xFEFF:  # 0xFEA0 - 0xFEFF: Empty area is empty, so nothing to do
+        self._write_pages[address >> 8][address & 0xFF] = value
+
+    # noinspection PyUnusedLocal
+    def _write_mbc_external_ram_status(self, address: int, value: int):
+        """ 0x0000 - 0x1FFF: MBC - Enable/Disable external RAM """
+        self.mbc.change_external_ram_status(value)
+        self._map_external_ram()
+
+    # noinspection PyUnusedLocal
+    def _write_mbc_cartridge_bank(self, address: int, value: int):
+        """ 0x2000 - 0x3FFF: MBC - Change cartridge bank mapped to N """
+        self.mbc.change_cartridge_bank(value)
+        self._map_cartridge_bank()
+
+    # noinspection PyUnusedLocal
+    def _write_mbc_ram_bank(self, address: int, value: int):
+        """ 0x4000 - 0x5FFF: MBC - Change external RAM bank mapped """
+        self.mbc.change_ram_bank(value)
+        self._map_cartridge_bank()
+        self._map_external_ram()
+
+    # noinspection PyUnusedLocal
+    def _write_mbc_banking_mode(self, address: int, value: int):
+        """ 0x6000 - 0x7FFF: MBC - Change ROM/RAM Mode """
+        self.mbc.change_banking_mode(value)
+        self._map_cartridge_bank()
+        self._map_external_ram()
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def _write_disabled_external_ram(address: int, value: int):
+        """ 0xA000 - 0xBFFF: External RAM is disabled, so writes are ignored """
+        return
+
+    def _write_oam(self, address: int, value: int):
+        """ 0xFE00 - 0xFEFF: Object Attribute Memory (OAM) + Empty area, which is always empty """
+        if address <= 0xFE9F:
+            self._oam_page[address - 0xFE00] = value
+
+    def _read_high_page(self, address: int):
+        """ 0xFF00 - 0xFFFF: I/O Memory, High RAM and Interrupts Enable Register (IE) """
+        if address == 0xFF00:
+            return self.gb.joypad.read(self._high_page[0x00])  # Only the key group selection bits are stored
+        if address == 0xFF04:
+            return self.gb.timer.read_div()  # DIV and TIMA are only calculated when read, see Timer
+        if address == 0xFF05:
+            return self.gb.timer.read_tima()
+        return self._high_page[address - 0xFF00]
+
+    def _write_high_page(self, address: int, value: int):
+        """ 0xFF00 - 0xFFFF: I/O Memory, High RAM and Interrupts Enable Register (IE) """
+        self._high_page[address - 0xFF00] = value
+        if address >= 0xFF80:  # High RAM, no side effects
+            if address == 0xFFFF:
+                self.gb.interrupts.write_enabled(value)  # Interrupts keeps a copy of IF and IE
             return
-
-        elif address <= 0xFF7F:  # 0xFF00 - 0xFF7F: I/O Memory
-            self.io[address - 0xFF00] = value
-            if 0xFF40 <= address <= 0xFF47:
-                self.gb.gpu.update_gpu_register(address, value)
-            elif address == 0xFF50 and value == 1:
-                self.boot_rom_loaded = False  # Once the boot rom is unmapped it cannot be mapped again, so no "= True"
-
-        elif address <= 0xFFFE:  # 0xFF80 - 0xFFFE: High RAM
-            self.hram[address - 0xFF80] = value
-
-        elif address == 0xFFFF:  # 0xFFFF: Interrupts Enable Register (IE)
-            self.ie = value
+        if 0xFF40 <= address <= 0xFF47:
+            self.gb.gpu.update_gpu_register(address, value)
+        elif address == 0xFF0F:
+            self.gb.interrupts.write_requests(value)
+        elif 0xFF04 <= address <= 0xFF07:
+            self.gb.timer.write(address, value)
+        elif address == 0xFF50 and value == 1:
+            self.boot_rom_loaded = False  # Once the boot rom is unmapped it cannot be mapped again, so no "= True"
 
     def _write_tile_set(self, address: int, value: int):
-        tile_line, tile_line_byte_to_change = self._find_tile_set(address)
-
-        # For each value in the tile line, retrieve the byte that will not be modified, and sum with the byte received
-        for i in range(8):
-            bit_to_keep = (tile_line[i] >> int(not tile_line_byte_to_change)) & 0b00000001
-            bit_to_change = (value >> (7-i)) & 0b00000001
-            new_value = (bit_to_keep << int(not tile_line_byte_to_change)) | (bit_to_change << tile_line_byte_to_change)
-            tile_line[i] = new_value  # Edit the existing list, not replace it, so shared tiles keep working
-
-    def _write_tile_map(self, address: int, value: int):
-        tile_map_line, tile_map_pos_number = self._find_tile_map(address)
-        tile_map_line[tile_map_pos_number] = value
-
-    def _find_tile_set(self, address: int):
+        """ 0x8000 - 0x97FF: VRAM tile sets """
         v_address = address - 0x8000
-        tile_number = v_address // 16  # length of each tile (8 lines * 2 bytes each = 16 bytes)
-        if tile_number < 128:
-            tile_number_fixed = tile_number
-            tile_set = self.tile_set_1_only
-        elif tile_number < 256:
-            tile_number_fixed = tile_number - 128
-            tile_set = self.tile_set_shared
-        else:
-            tile_number_fixed = tile_number - 256
-            tile_set = self.tile_set_0_only
-        tile_byte_number = v_address - (tile_number * 16)  # Will get a value 0-15, since each GameBoy tile has 8 lines,
-        tile_line_number = tile_byte_number // 2           # each made from 2 bytes. We are storing the tile line final
-        tile_line_byte_to_change = tile_byte_number % 2    # value instead, so we need to convert it back to 2 bytes.
-
-        tile_line = tile_set[tile_number_fixed][tile_line_number]
-        return tile_line, tile_line_byte_to_change
-
-    def _find_tile_map(self, address: int):
-        v_address = address - 0x9800
-        tile_map_number = v_address // 32
-        if tile_map_number < 32:
-            tile_map_number_fixed = tile_map_number
-            tile_map = self.tile_maps[0]
-        else:
-            tile_map_number_fixed = tile_map_number - 32
-            tile_map = self.tile_maps[1]
-        tile_map_pos_number = v_address - (tile_map_number * 32)
-        return tile_map[tile_map_number_fixed], tile_map_pos_number
+        self.vram[v_address] = value
+        self._dirty_tiles[v_address >> 4] = 1  # length of each tile (8 lines * 2 bytes each = 16 bytes)
+        self.tile_data_version += 1
+
+    def _decode_tile(self, tile_index: int):
+        """
+        Converts the 16 bytes of a tile stored in VRAM into a matrix with the value (0-3) of each of its 8x8 pixels. For
+        each line, the first byte has bit 0 of each pixel value and the second byte has bit 1.
+        :param tile_index: Tile position in VRAM (0-383)
+        :return: Decoded tile
+        """
+        vram = self.vram
+        low = self._TILE_LINE_LOW
+        high = self._TILE_LINE_HIGH
+        tile = []
+        for address in range(tile_index * 16, (tile_index * 16) + 16, 2):
+            tile.append([bit_0 | bit_1 for bit_0, bit_1 in zip(low[vram[address]], high[vram[address + 1]])])
+        return tile
 
     @staticmethod
     def _generate_memory_map(size: int):
@@ -298,24 +423,26 @@ class Memory:
         See: https://docs.python.org/3/library/array.html
         :return:
         """
-        byte_array = array.array('B')  # 'B' == "unsigned char" in C / "int" in Python, minimum size is 1 byte
-        byte_array.extend((0x00,) * size)
-        return byte_array
+        return array.array('B', bytes(size))  # 'B' == "unsigned char" in C / "int" in Python, minimum size is 1 byte
 
     def get_map(self, map_number: int):
         """ Helper method to retrieve a tile map """
         return self.tile_maps[map_number]
 
     def get_tile(self, tile_set_number: int, tile_number: int):
-        """ Helper method to retrieve a tile from a set """
-        if tile_number < 128:
-            if tile_set_number == 0:
-                return self.tile_set_0_only[tile_number]
-            else:
-                return self.tile_set_1_only[tile_number]
+        """
+        Helper method to retrieve a tile from a set. The returned tile must not be modified (it is shared with the
+        cache).
+        """
+        if tile_number < 128 and tile_set_number == 0:
+            tile_index = tile_number + 256
         else:
-            # It's in the shared area; 'tile_number' is unsigned so we do not need to worry about that
-            return self.tile_set_shared[tile_number-128]
+            # Tile set 1 or shared area; 'tile_number' is unsigned so we do not need to worry about that
+            tile_index = tile_number
+        if self._dirty_tiles[tile_index]:
+            self._tile_cache[tile_index] = self._decode_tile(tile_index)
+            self._dirty_tiles[tile_index] = 0
+        return self._tile_cache[tile_index]
 
     def load_boot_rom(self):
         """
@@ -395,7 +522,30 @@ class Memory:
         :param address: Memory address to read data from
         :return: 8-bit value at the given memory address
         """
-        return self._read(address)
+        return self._read_pages[address >> 8][address & 0xFF]
+
+    def snapshot(self, start: int = 0x0000, end: int = 0x10000):
+        """
+        Copies an address range as the CPU would read it, byte by byte, but in bulk: pages mapped to a buffer are copied
+        as a whole, and only I/O registers calculated on read (P1, DIV, TIMA) are read individually.
+        :param start: First address
+        :param end: Address after the last one (the default range is the whole 64KB address space)
+        :return: bytes with the value of each address
+        """
+        parts = []
+        for page in range(start >> 8, (end + self.PAGE_SIZE - 1) >> 8):
+            entry = self._read_pages[page]
+            if page == 0xFF:
+                data = bytearray(self._high_page)
+                for address in (0xFF00, 0xFF04, 0xFF05):
+                    data[address - 0xFF00] = self._read_high_page(address)
+            elif isinstance(entry, memoryview) and len(entry) == self.PAGE_SIZE:
+                data = entry
+            else:  # Page handler (or a partial page, at the end of a short cartridge)
+                data = bytes(entry[offset] for offset in range(self.PAGE_SIZE))
+            parts.append(data)
+        offset = start & 0xFF
+        return b"".join(parts)[offset:offset + end - start]
 
     def read_16bit(self, address: int):
         """
@@ -445,6 +595,46 @@ class Memory:
         self.logger.debug(custom_dict)
 
 
+class PageHandler:
+    """ Page table entry for a page that is not directly mapped to a buffer """
+
+    __slots__ = ("address", "read", "write")
+
+    def __init__(self, address: int):
+        """
+        :param address: First address of the page
+        """
+        self.address = address
+        self.read = None   # Called with (address), returns the value at address
+        self.write = None  # Called with (address, value)
+
+    def __getitem__(self, offset: int):
+        return self.read(self.address | offset)
+
+    def __setitem__(self, offset: int, value: int):
+        self.write(self.address | offset, value)
+
+
+class WatchedPage:
+    """ Page table entry that notifies a callback before forwarding writes to the original entry """
+
+    __slots__ = ("target", "callback", "address")
+
+    def __init__(self, target, callback, address: int):
+        """
+        :param target: Original page table entry
+        :param callback: Callable receiving the address being written
+        :param address: First address of the page
+        """
+        self.target = target
+        self.callback = callback
+        self.address = address
+
+    def __setitem__(self, offset: int, value: int):
+        self.callback(self.address | offset)
+        self.target[offset] = value
+
+
 class MBC:
     """ Memory Bank Controller """
 
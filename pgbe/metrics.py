@@ -0,0 +1,129 @@
+"""
+Runtime metrics
+
+Accumulates how much host time the emulator spends in each subsystem, so it is possible to see where a game spends its
+frame budget. Measurements are taken at coarse grained points only (once per main loop call, scheduled event, interrupt
+update, rendered line and presented frame), never per instruction, so they are always on:
+
+    - busy: time spent inside the emulation main loop (CPU.execute() or GB.run_cycles()), i.e. excluding the time the
+      Screen waits between frames
+    - one entry for each scheduled event name: GPU mode changes ("gpu") and timer overflows ("timer")
+    - interrupts: Interrupts.update()
+    - render: drawing lines to the framebuffer
+    - present: handing complete frames to the frame sink (e.g. uploading them to the Screen texture)
+    - rewind: capturing rewind states
+
+Rendering, presenting and rewind captures all happen inside GPU events, and everything happens inside the main loop.
+snapshot() reports exclusive times: its "gpu" entry excludes them, and "cpu", the time left after every other subsystem
+is subtracted from busy, is the time spent executing instructions (including memory accesses).
+
+Snapshots can also be appended to a file, as JSON lines, every N frames (see write_every()).
+"""
+import json
+from time import perf_counter_ns
+
+
+class Metrics:
+    """ Time and call counters of each subsystem """
+
+    BUSY = "busy"
+    CPU = "cpu"
+    GPU = "gpu"  # Same as GPU.EVENT
+    INTERRUPTS = "interrupts"
+    RENDER = "render"
+    PRESENT = "present"
+    REWIND = "rewind"
+
+    NESTED_IN_GPU = (RENDER, PRESENT, REWIND)
+
+    def __init__(self, gb):
+        """
+        :type gb: gb.GB
+        """
+        # Communication with other components
+        self.gb = gb
+
+        # State initialization
+        self.output_path = None  # File where snapshots are appended, see write_every()
+        self.output_interval = 0
+        self._next_output_frame = 0
+        self._entries = {}  # Subsystem -> [host ns, calls]
+        self._start_frame_count = gb.gpu.frame_count
+        self._start_cycle_count = gb.cpu.cycle_count
+
+    def reset(self):
+        """ Discards everything accumulated so far """
+        self._entries = {}
+        self._start_frame_count = self.gb.gpu.frame_count
+        self._start_cycle_count = self.gb.cpu.cycle_count
+        self._next_output_frame = self._start_frame_count + self.output_interval
+
+    def add(self, name: str, ns: int):
+        """
+        Accounts one call to a subsystem.
+        :param name: Subsystem
+        :param ns: Host time spent, in nanoseconds
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            self._entries[name] = [ns, 1]
+        else:
+            entry[0] += ns
+            entry[1] += 1
+
+    def time(self, name: str, function, *args):
+        """
+        Calls function(*args), accounting the time spent to the given subsystem.
+        :return: Value returned by the function
+        """
+        start = perf_counter_ns()
+        result = function(*args)
+        self.add(name, perf_counter_ns() - start)
+        return result
+
+    def main_loop_done(self, ns: int):
+        """
+        Called by the CPU at the end of each main loop call.
+        :param ns: Host time spent in the main loop, in nanoseconds
+        """
+        self.add(self.BUSY, ns)
+        if self.output_interval and self.gb.gpu.frame_count >= self._next_output_frame:
+            self._next_output_frame = self.gb.gpu.frame_count + self.output_interval
+            with open(self.output_path, "a") as output:
+                output.write(json.dumps(self.snapshot()) + "\n")
+
+    def write_every(self, path: str, frames: int):
+        """
+        Appends a snapshot to the given file, as a JSON line, every time the given number of frames is completed.
+        :param path: File path (None stops writing)
+        :param frames: Number of frames between snapshots
+        """
+        if path is not None and frames < 1:
+            raise ValueError("Metrics output interval must be at least 1 frame: {}".format(frames))
+        self.output_path = path
+        self.output_interval = frames if path is not None else 0
+        self._next_output_frame = self.gb.gpu.frame_count + self.output_interval
+
+    def snapshot(self):
+        """
+        :return: Dictionary with the frames and CPU cycles executed since the last reset, the busy time (seconds) and
+                 frames per busy second, and for each subsystem its exclusive time (seconds), number of calls and
+                 fraction of the busy time. The calls of "cpu" are main loop calls.
+        """
+        entries = {name: list(entry) for name, entry in self._entries.items()}
+        busy_ns, main_loop_calls = entries.pop(self.BUSY, [0, 0])
+        gpu = entries.get(self.GPU)
+        if gpu is not None:
+            gpu[0] -= sum(entries[name][0] for name in self.NESTED_IN_GPU if name in entries)
+        entries[self.CPU] = [busy_ns - sum(entry[0] for entry in entries.values()), main_loop_calls]
+
+        frames = self.gb.gpu.frame_count - self._start_frame_count
+        busy = busy_ns / 1e9
+        return {
+            "frames": frames,
+            "cycles": self.gb.cpu.cycle_count - self._start_cycle_count,
+            "seconds": busy,
+            "fps": frames / busy if busy > 0 else 0.0,
+            "subsystems": {name: {"seconds": ns / 1e9, "calls": calls, "fraction": ns / busy_ns if busy_ns else 0.0}
+                           for name, (ns, calls) in sorted(entries.items())},
+        }
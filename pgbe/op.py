@@ -19,6 +19,8 @@ The GameBoy uses Little-endian, i.e. least significant byte first. Therefore, in
 values have to be converted to Big-endian first.
 """
 import util
+from register import FLAG_C, INC_FLAGS, DEC_FLAGS, ADD_FLAGS, ADC_FLAGS, SUB_FLAGS, SBC_FLAGS, CP_FLAGS, \
+    AND_FLAGS, OR_FLAGS, XOR_FLAGS
 
 
 def execute(gb, opcode: int):
@@ -32,6 +34,18 @@ def execute(gb, opcode: int):
     return _instruction_dict[opcode](gb)
 
 
+def mnemonic(opcode: int, cb_prefixed: bool = False):
+    """
+    Assembly name of an instruction, taken from the docstring of the function that implements it.
+
+    :param opcode: Instruction opcode
+    :param cb_prefixed: If the opcode comes after a CB prefix
+    :return: Mnemonic (e.g. "LD A,d8")
+    """
+    function = (_instruction_cb_dict if cb_prefixed else _instruction_dict)[opcode]
+    return function.__doc__.split(" - ")[0].strip()
+
+
 def get_big_endian_value(msb: int, lsb: int):
     """
     Joins the two bytes received from the cartridge into a single, big-endian value.
@@ -85,19 +99,17 @@ def code_03(gb):
 
 def code_04(gb):
     """ INC B - B=B+1 """
-    gb.cpu.register.set_b((gb.cpu.register.B + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.B == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.B & 0x0F) == 0)
+    register = gb.cpu.register
+    register.B = (register.B + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.B]
     return 4
 
 
 def code_05(gb):
     """ DEC B - B=B-1 """
-    gb.cpu.register.set_b((gb.cpu.register.B - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.B == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.B & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.B = (register.B - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.B]
     return 4
 
 
@@ -153,19 +165,17 @@ def code_0b(gb):
 
 def code_0c(gb):
     """ INC C - C=C+1 """
-    gb.cpu.register.set_c((gb.cpu.register.C + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.C == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.C & 0x0F) == 0)
+    register = gb.cpu.register
+    register.C = (register.C + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.C]
     return 4
 
 
 def code_0d(gb):
     """ DEC C - C=C-1 """
-    gb.cpu.register.set_c((gb.cpu.register.C - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.C == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.C & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.C = (register.C - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.C]
     return 4
 
 
@@ -221,19 +231,17 @@ def code_13(gb):
 
 def code_14(gb):
     """ INC D - D=D+1 """
-    gb.cpu.register.set_d((gb.cpu.register.D + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.D == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.D & 0x0F) == 0)
+    register = gb.cpu.register
+    register.D = (register.D + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.D]
     return 4
 
 
 def code_15(gb):
     """ DEC D - D=D-1 """
-    gb.cpu.register.set_d((gb.cpu.register.D - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.D == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.D & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.D = (register.D - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.D]
     return 4
 
 
@@ -288,19 +296,17 @@ def code_1b(gb):
 
 def code_1c(gb):
     """ INC E - E=E+1 """
-    gb.cpu.register.set_e((gb.cpu.register.E + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.E == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.E & 0x0F) == 0)
+    register = gb.cpu.register
+    register.E = (register.E + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.E]
     return 4
 
 
 def code_1d(gb):
     """ DEC E - E=E-1 """
-    gb.cpu.register.set_e((gb.cpu.register.E - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.E == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.E & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.E = (register.E - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.E]
     return 4
 
 
@@ -357,19 +363,17 @@ def code_23(gb):
 
 def code_24(gb):
     """ INC H - H=H+1 """
-    gb.cpu.register.set_h((gb.cpu.register.H + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.H == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.H & 0x0F) == 0)
+    register = gb.cpu.register
+    register.H = (register.H + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.H]
     return 4
 
 
 def code_25(gb):
     """ DEC H - H=H-1 """
-    gb.cpu.register.set_h((gb.cpu.register.H - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.H == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.H & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.H = (register.H - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.H]
     return 4
 
 
@@ -440,19 +444,17 @@ def code_2b(gb):
 
 def code_2c(gb):
     """ INC L - L=L+1 """
-    gb.cpu.register.set_l((gb.cpu.register.L + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.L == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.L & 0x0F) == 0)
+    register = gb.cpu.register
+    register.L = (register.L + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.L]
     return 4
 
 
 def code_2d(gb):
     """ DEC L - L=L-1 """
-    gb.cpu.register.set_l((gb.cpu.register.L - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.L == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.L & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.L = (register.L - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.L]
     return 4
 
 
@@ -506,23 +508,21 @@ def code_33(gb):
 
 def code_34(gb):
     """ INC (HL) - (value at address HL)=(value at address HL)+1 """
-    current_value = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    new_value = (current_value + 1) & 0xFF
-    gb.memory.write_8bit(gb.cpu.register.get_hl(), new_value)
-    gb.cpu.register.set_z_flag(new_value == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((new_value & 0x0F) == 0)
+    register = gb.cpu.register
+    address = register.get_hl()
+    new_value = (gb.memory.read_8bit(address) + 1) & 0xFF
+    gb.memory.write_8bit(address, new_value)
+    register.F = (register.F & FLAG_C) | INC_FLAGS[new_value]
     return 12
 
 
 def code_35(gb):
     """ DEC (HL) - (value at address HL)=(value at address HL)-1 """
-    current_value = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    new_value = (current_value - 1) & 0xFF
-    gb.memory.write_8bit(gb.cpu.register.get_hl(), new_value)
-    gb.cpu.register.set_z_flag(new_value == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((new_value & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    address = register.get_hl()
+    new_value = (gb.memory.read_8bit(address) - 1) & 0xFF
+    gb.memory.write_8bit(address, new_value)
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[new_value]
     return 12
 
 
@@ -576,19 +576,17 @@ def code_3b(gb):
 
 def code_3c(gb):
     """ INC A - A=A+1 """
-    gb.cpu.register.set_a((gb.cpu.register.A + 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag((gb.cpu.register.A & 0x0F) == 0)
+    register = gb.cpu.register
+    register.A = (register.A + 1) & 0xFF
+    register.F = (register.F & FLAG_C) | INC_FLAGS[register.A]
     return 4
 
 
 def code_3d(gb):
     """ DEC A - A=A-1 """
-    gb.cpu.register.set_a((gb.cpu.register.A - 1) & 0xFF)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.A & 0x0F) == 0x0F)
+    register = gb.cpu.register
+    register.A = (register.A - 1) & 0xFF
+    register.F = (register.F & FLAG_C) | DEC_FLAGS[register.A]
     return 4
 
 
@@ -1001,361 +999,269 @@ def code_7f(gb):
 # OPCODES 8x
 def code_80(gb):
     """ ADD A,B - A=A+B """
-    result = gb.cpu.register.A + gb.cpu.register.B
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.B & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.B]
+    register.A = (register.A + register.B) & 0xFF
     return 4
 
 
 def code_81(gb):
     """ ADD A,C - A=A+C """
-    result = gb.cpu.register.A + gb.cpu.register.C
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.C & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.C]
+    register.A = (register.A + register.C) & 0xFF
     return 4
 
 
 def code_82(gb):
     """ ADD A,D - A=A+D """
-    result = gb.cpu.register.A + gb.cpu.register.D
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.D & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.D]
+    register.A = (register.A + register.D) & 0xFF
     return 4
 
 
 def code_83(gb):
     """ ADD A,E - A=A+E """
-    result = gb.cpu.register.A + gb.cpu.register.E
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.E & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.E]
+    register.A = (register.A + register.E) & 0xFF
     return 4
 
 
 def code_84(gb):
     """ ADD A,H - A=A+H """
-    result = gb.cpu.register.A + gb.cpu.register.H
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.H & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.H]
+    register.A = (register.A + register.H) & 0xFF
     return 4
 
 
 def code_85(gb):
     """ ADD A,L - A=A+L """
-    result = gb.cpu.register.A + gb.cpu.register.L
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.L & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.L]
+    register.A = (register.A + register.L) & 0xFF
     return 4
 
 
 def code_86(gb):
     """ ADD A,(HL) - A=A+(value at address HL) """
-    mem_hl = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    result = gb.cpu.register.A + mem_hl
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (mem_hl & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.F = ADD_FLAGS[(register.A << 8) | value]
+    register.A = (register.A + value) & 0xFF
     return 8
 
 
 def code_87(gb):
     """ ADD A,A - A=A+A """
-    result = gb.cpu.register.A + gb.cpu.register.A
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.A & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    register.F = ADD_FLAGS[(register.A << 8) | register.A]
+    register.A = (register.A + register.A) & 0xFF
     return 4
 
 
 def code_88(gb):
     """ ADC A,B - A=A+B+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.B + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.B & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.B]
+    register.A = (register.A + register.B + carry) & 0xFF
     return 4
 
 
 def code_89(gb):
     """ ADC A,C - A=A+C+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.C + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.C & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.C]
+    register.A = (register.A + register.C + carry) & 0xFF
     return 4
 
 
 def code_8a(gb):
     """ ADC A,D - A=A+D+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.D + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.D & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.D]
+    register.A = (register.A + register.D + carry) & 0xFF
     return 4
 
 
 def code_8b(gb):
     """ ADC A,E - A=A+E+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.E + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.E & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.E]
+    register.A = (register.A + register.E + carry) & 0xFF
     return 4
 
 
 def code_8c(gb):
     """ ADC A,H - A=A+H+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.H + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.H & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.H]
+    register.A = (register.A + register.H + carry) & 0xFF
     return 4
 
 
 def code_8d(gb):
     """ ADC A,L - A=A+L+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.L + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.L & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.L]
+    register.A = (register.A + register.L + carry) & 0xFF
     return 4
 
 
 def code_8e(gb):
     """ ADC A,(HL) - A=A+(value at address HL)+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    mem_hl = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    result = gb.cpu.register.A + mem_hl + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (mem_hl & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | value]
+    register.A = (register.A + value + carry) & 0xFF
     return 8
 
 
 def code_8f(gb):
     """ ADC A,A - A=A+A+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + gb.cpu.register.A + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (gb.cpu.register.A & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | register.A]
+    register.A = (register.A + register.A + carry) & 0xFF
     return 4
 
 
 # OPCODES 9x
 def code_90(gb):
     """ SUB A,B - A=A-B """
-    result = (gb.cpu.register.A - gb.cpu.register.B) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.B & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.B > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.B]
+    register.A = (register.A - register.B) & 0xFF
     return 4
 
 
 def code_91(gb):
     """ SUB A,C - A=A-C """
-    result = (gb.cpu.register.A - gb.cpu.register.C) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.C & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.C > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.C]
+    register.A = (register.A - register.C) & 0xFF
     return 4
 
 
 def code_92(gb):
     """ SUB A,D - A=A-D """
-    result = (gb.cpu.register.A - gb.cpu.register.D) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.D & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.D > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.D]
+    register.A = (register.A - register.D) & 0xFF
     return 4
 
 
 def code_93(gb):
     """ SUB A,E - A=A-E """
-    result = (gb.cpu.register.A - gb.cpu.register.E) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.E & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.E > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.E]
+    register.A = (register.A - register.E) & 0xFF
     return 4
 
 
 def code_94(gb):
     """ SUB A,H - A=A-H """
-    result = (gb.cpu.register.A - gb.cpu.register.H) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.H & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.H > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.H]
+    register.A = (register.A - register.H) & 0xFF
     return 4
 
 
 def code_95(gb):
     """ SUB A,L - A=A-L """
-    result = (gb.cpu.register.A - gb.cpu.register.L) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.L & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.L > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.L]
+    register.A = (register.A - register.L) & 0xFF
     return 4
 
 
 def code_96(gb):
     """ SUB A,(HL) - A=A-(value at address HL) """
-    mem_hl = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    result = (gb.cpu.register.A - mem_hl) & 0xFF  # '& 0xFF' = convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((mem_hl & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(mem_hl > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.F = SUB_FLAGS[(register.A << 8) | value]
+    register.A = (register.A - value) & 0xFF
     return 8
 
 
 def code_97(gb):
     """ SUB A,A - A=A-A """
-    gb.cpu.register.set_z_flag(True)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
-    gb.cpu.register.set_a(0x00)  # A-A, therefore result is zero, always
+    register = gb.cpu.register
+    register.F = SUB_FLAGS[(register.A << 8) | register.A]
+    register.A = (register.A - register.A) & 0xFF
     return 4
 
 
 def code_98(gb):
     """ SBC A,B - A=A-B-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.B + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.B]
+    register.A = (register.A - register.B - carry) & 0xFF
     return 4
 
 
 def code_99(gb):
     """ SBC A,C - A=A-C-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.C + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.C]
+    register.A = (register.A - register.C - carry) & 0xFF
     return 4
 
 
 def code_9a(gb):
     """ SBC A,D - A=A-D-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.D + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.D]
+    register.A = (register.A - register.D - carry) & 0xFF
     return 4
 
 
 def code_9b(gb):
     """ SBC A,E - A=A-E-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.E + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.E]
+    register.A = (register.A - register.E - carry) & 0xFF
     return 4
 
 
 def code_9c(gb):
     """ SBC A,H - A=A-H-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.H + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.H]
+    register.A = (register.A - register.H - carry) & 0xFF
     return 4
 
 
 def code_9d(gb):
     """ SBC A,L - A=A-L-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    value = gb.cpu.register.L + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | register.L]
+    register.A = (register.A - register.L - carry) & 0xFF
     return 4
 
 
 def code_9e(gb):
     """ SBC A,(HL) - A=A-(value at address HL)-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    mem_hl = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    value = mem_hl + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | value]
+    register.A = (register.A - value - carry) & 0xFF
     return 8
 
 
@@ -1374,315 +1280,254 @@ def code_9f(gb):
 # OPCODES Ax
 def code_a0(gb):
     """ AND B - A=Logical AND A with B """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.B)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.B
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a1(gb):
     """ AND C - A=Logical AND A with C """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.C)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.C
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a2(gb):
     """ AND D - A=Logical AND A with D """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.D)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.D
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a3(gb):
     """ AND E - A=Logical AND A with E """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.E)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.E
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a4(gb):
     """ AND H - A=Logical AND A with H """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.H)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.H
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a5(gb):
     """ AND L - A=Logical AND A with L """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.L)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.L
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a6(gb):
     """ AND (HL) - A=Logical AND A with (value at address HL) """
-    gb.cpu.register.set_a(gb.cpu.register.A & gb.memory.read_8bit(gb.cpu.register.get_hl()))
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.A &= value
+    register.F = AND_FLAGS[register.A]
     return 8
 
 
 def code_a7(gb):
     """ AND A - A=Logical AND A with A (why?) """
-    # gb.cpu.register.set_a(gb.cpu.register.A & gb.cpu.register.A -- result is A=A, therefore useless
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A &= register.A
+    register.F = AND_FLAGS[register.A]
     return 4
 
 
 def code_a8(gb):
     """ XOR B - A=Logical XOR A with B """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.B)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.B
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_a9(gb):
     """ XOR C - A=Logical XOR A with C """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.C)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.C
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_aa(gb):
     """ XOR D - A=Logical XOR A with D """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.D)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.D
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_ab(gb):
     """ XOR E - A=Logical XOR A with E """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.E)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.E
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_ac(gb):
     """ XOR H - A=Logical XOR A with H """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.H)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.H
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_ad(gb):
     """ XOR L - A=Logical XOR A with L """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.cpu.register.L)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.L
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 def code_ae(gb):
     """ XOR (HL) - A=Logical XOR A with (value at address HL) """
-    gb.cpu.register.set_a(gb.cpu.register.A ^ gb.memory.read_8bit(gb.cpu.register.get_hl()))
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.A ^= value
+    register.F = XOR_FLAGS[register.A]
     return 8
 
 
 def code_af(gb):
     """ XOR A - A=Logical XOR A with A """
-    gb.cpu.register.set_a(0)
-    gb.cpu.register.set_z_flag(True)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A ^= register.A
+    register.F = XOR_FLAGS[register.A]
     return 4
 
 
 # OPCODES Bx
 def code_b0(gb):
     """ OR B - A=Logical OR A with B """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.B)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.B
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b1(gb):
     """ OR C - A=Logical OR A with C """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.C)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.C
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b2(gb):
     """ OR D - A=Logical OR A with D """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.D)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.D
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b3(gb):
     """ OR E - A=Logical OR A with E """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.E)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.E
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b4(gb):
     """ OR H - A=Logical OR A with H """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.H)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.H
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b5(gb):
     """ OR L - A=Logical OR A with L """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.L)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.L
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b6(gb):
     """ OR (HL) - A=Logical OR A with (value at address HL) """
-    gb.cpu.register.set_a(gb.cpu.register.A | gb.memory.read_8bit(gb.cpu.register.get_hl()))
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.A |= value
+    register.F = OR_FLAGS[register.A]
     return 8
 
 
 def code_b7(gb):
     """ OR L - A=Logical OR A with A (why?) """
-    # gb.cpu.register.set_a(gb.cpu.register.A | gb.cpu.register.A -- result is A=A, therefore useless
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.A |= register.A
+    register.F = OR_FLAGS[register.A]
     return 4
 
 
 def code_b8(gb):
     """ CP A,B - same as SUB A,B but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.B)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.B & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.B > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.B]
     return 4
 
 
 def code_b9(gb):
     """ CP A,C - same as SUB A,C but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.C)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.C & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.C > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.C]
     return 4
 
 
 def code_ba(gb):
     """ CP A,D - same as SUB A,D but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.D)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.D & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.D > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.D]
     return 4
 
 
 def code_bb(gb):
     """ CP A,E - same as SUB A,E but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.E)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.E & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.E > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.E]
     return 4
 
 
 def code_bc(gb):
     """ CP A,H - same as SUB A,H but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.H)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.H & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.H > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.H]
     return 4
 
 
 def code_bd(gb):
     """ CP A,L - same as SUB A,L but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == gb.cpu.register.L)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((gb.cpu.register.L & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(gb.cpu.register.L > gb.cpu.register.A)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.L]
     return 4
 
 
 def code_be(gb):
     """ CP A,(HL) - same as SUB A,(HL) but throw the result away, only set flags """
-    mem_hl = gb.memory.read_8bit(gb.cpu.register.get_hl())
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == mem_hl)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((mem_hl & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(mem_hl > gb.cpu.register.A)
+    register = gb.cpu.register
+    value = gb.memory.read_8bit(register.get_hl())
+    register.F = CP_FLAGS[(register.A << 8) | value]
     return 8
 
 
 def code_bf(gb):
     """ CP A,A - same as SUB A,A but throw the result away, only set flags """
-    gb.cpu.register.set_z_flag(True)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    register.F = CP_FLAGS[(register.A << 8) | register.A]
     return 4
 
 
@@ -1746,13 +1591,10 @@ def code_c5(gb):
 
 def code_c6(gb):
     """ ADD A,d8 - A=A+d8 """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    result = gb.cpu.register.A + d8
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (d8 & 0x0F)) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.F = ADD_FLAGS[(register.A << 8) | value]
+    register.A = (register.A + value) & 0xFF
     return 8
 
 
@@ -1826,14 +1668,11 @@ def code_cd(gb):
 
 def code_ce(gb):
     """ ADC A,d8 - A=A+d8+carry_flag (yes, '+carry_flag' is just +1 or +0) """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    carry_flag = gb.cpu.register.get_c_flag()
-    result = gb.cpu.register.A + d8 + carry_flag
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(((gb.cpu.register.A & 0x0F) + (d8 & 0x0F) + carry_flag) > 0x0F)
-    gb.cpu.register.set_c_flag(result > 0xFF)
-    gb.cpu.register.set_a(result & 0xFF)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    carry = (register.F & FLAG_C) >> 4
+    register.F = ADC_FLAGS[(carry << 16) | (register.A << 8) | value]
+    register.A = (register.A + value + carry) & 0xFF
     return 8
 
 
@@ -1901,13 +1740,10 @@ def code_d5(gb):
 
 def code_d6(gb):
     """ SUB A,d8 - A=A-d8 """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    result = (gb.cpu.register.A - d8) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((d8 & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(d8 > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.F = SUB_FLAGS[(register.A << 8) | value]
+    register.A = (register.A - value) & 0xFF
     return 8
 
 
@@ -1929,9 +1765,9 @@ def code_d8(gb):
 def code_d9(gb):
     """ RETI - Pop two bytes from stack and jump to that address then enable interrupts  - same as EI + RET """
     code_c9(gb)
-    # Interrupt update will execute next. EI enables interrupts after next instruction, but since the next instruction
-    # has already been executed (RET), interrupts must be enabled now. For the sake of keeping equal to EI and DI,
-    # interrupts will be enabled at the interrupt update step and not here (see: Interrupts.update()).
+    # EI enables interrupts after next instruction, but since the next instruction has already been executed (RET),
+    # interrupts must be enabled now.
+    gb.interrupts.enable()
     return 16
 
 
@@ -1973,14 +1809,11 @@ def code_dd(gb):
 
 def code_de(gb):
     """ SBC A,d8 - A=A-d8-carry_flag (yes, '-carry_flag' is just -1 or -0) """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    value = d8 + gb.cpu.register.get_c_flag()
-    result = (gb.cpu.register.A - value) & 0xFF  # '& 0xFF' is necessary to convert signed integer to unsigned
-    gb.cpu.register.set_z_flag((result & 0xFF) == 0)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((value & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(value > gb.cpu.register.A)
-    gb.cpu.register.set_a(result)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    carry = (register.F & FLAG_C) >> 4
+    register.F = SBC_FLAGS[(carry << 16) | (register.A << 8) | value]
+    register.A = (register.A - value - carry) & 0xFF
     return 8
 
 
@@ -2038,12 +1871,10 @@ def code_e5(gb):
 
 def code_e6(gb):
     """ AND d8 - A=Logical AND A with d8 """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    gb.cpu.register.set_a(gb.cpu.register.A & d8)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(True)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.A &= value
+    register.F = AND_FLAGS[register.A]
     return 8
 
 
@@ -2103,12 +1934,10 @@ def code_ed(gb):
 
 def code_ee(gb):
     """ XOR d8 - A=Logical XOR A with d8 """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    gb.cpu.register.set_a(gb.cpu.register.A ^ d8)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.A ^= value
+    register.F = XOR_FLAGS[register.A]
     return 8
 
 
@@ -2148,8 +1977,7 @@ def code_f2(gb):
 # noinspection PyUnusedLocal
 def code_f3(gb):
     """ DI - Disable interrupts AFTER THE NEXT INSTRUCTION IS EXECUTED """
-    # Interrupt update will execute next. Since the disable is only after the next instruction, the boolean
-    # "disable_IME_after_next_instruction" will be set to true during the interrupt step and not here.
+    gb.interrupts.disable_after_next_instruction()
     return 4
 
 
@@ -2168,12 +1996,10 @@ def code_f5(gb):
 
 def code_f6(gb):
     """ OR d8 - A=Logical OR A with d8 """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    gb.cpu.register.set_a(gb.cpu.register.A | d8)
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == 0)
-    gb.cpu.register.set_n_flag(False)
-    gb.cpu.register.set_h_flag(False)
-    gb.cpu.register.set_c_flag(False)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.A |= value
+    register.F = OR_FLAGS[register.A]
     return 8
 
 
@@ -2216,8 +2042,7 @@ def code_fa(gb):
 # noinspection PyUnusedLocal
 def code_fb(gb):
     """ EI - Enable interrupts AFTER THE NEXT INSTRUCTION IS EXECUTED """
-    # Interrupt update will execute next. Since the enable is only after the next instruction, the boolean
-    # "enable_IME_after_next_instruction" will be set to true during the interrupt step and not here.
+    gb.interrupts.enable_after_next_instruction()
     return 4
 
 
@@ -2235,11 +2060,9 @@ def code_fd(gb):
 
 def code_fe(gb):
     """ CP A,d8 - same as SUB A,d8 but throw the result away, only set flags """
-    d8 = gb.cpu.read_next_byte_from_cartridge()
-    gb.cpu.register.set_z_flag(gb.cpu.register.A == d8)
-    gb.cpu.register.set_n_flag(True)
-    gb.cpu.register.set_h_flag((d8 & 0x0F) > (gb.cpu.register.A & 0x0F))
-    gb.cpu.register.set_c_flag(d8 > gb.cpu.register.A)
+    register = gb.cpu.register
+    value = gb.cpu.read_next_byte_from_cartridge()
+    register.F = CP_FLAGS[(register.A << 8) | value]
     return 8
 
 
@@ -0,0 +1,109 @@
+"""
+Frame pacing
+
+Decides when the next frame must be emulated, so the emulator runs at the GameBoy speed (or faster, when asked to).
+
+Modes:
+    LOCKED - Frames are emulated at the GameBoy refresh rate, 59.73 Hz (CLOCK_HZ / cycles per frame).
+    TURBO - No limit, frames are emulated as fast as the host allows (e.g. to skip intros).
+    MULTIPLIER - Frames are emulated at a fixed multiple of the GameBoy refresh rate (e.g. 2.0 == double speed).
+
+Deadlines are absolute (each frame is due exactly one period after the previous one, not one period after it finished)
+and measured with a monotonic clock, so small scheduling delays are compensated by the next frames instead of
+accumulating as drift. If the emulator falls too far behind, the pacer gives up catching up and starts over from the
+current time.
+"""
+import time
+
+from cpu import CPU
+from gpu import GPU
+
+
+class FramePacer:
+    """ Frame rate limiter """
+
+    LOCKED = "locked"
+    TURBO = "turbo"
+    MULTIPLIER = "multiplier"
+
+    FRAME_RATE = CPU.CLOCK_HZ / GPU.UPDATE_HZ  # ~59.73 frames per second
+    MAX_CATCH_UP_FRAMES = 5  # Frames that can be emulated in a row to recover from a delay, before dropping the delay
+    METRICS_INTERVAL = 1.0  # Seconds between updates of speed_ratio and fps
+
+    def __init__(self, mode: str = LOCKED, multiplier: float = 1.0, clock=time.monotonic):
+        """
+        :param mode: LOCKED, TURBO or MULTIPLIER
+        :param multiplier: Speed multiplier used by MULTIPLIER mode
+        :param clock: Function returning the current time in seconds; must be monotonic
+        """
+        self.clock = clock
+
+        self.mode = None
+        self.multiplier = 1.0
+        self.frame_period = 1 / self.FRAME_RATE  # Wall clock seconds between the start of two frames
+        self.next_frame_time = 0.0  # When the next frame is due
+        self.set_mode(mode, multiplier)
+
+        # Metrics
+        self.speed_ratio = 0.0  # Emulated time / wall clock time (1.0 == GameBoy speed)
+        self.fps = 0.0  # Emulated frames per wall clock second
+        self._metrics_start = self.clock()
+        self._metrics_frames = 0
+
+    def set_mode(self, mode: str, multiplier: float = None):
+        """
+        Changes the pacing mode. Pacing restarts from the current time, so previous delays are not compensated.
+        :param mode: LOCKED, TURBO or MULTIPLIER
+        :param multiplier: Speed multiplier used by MULTIPLIER mode (keeps the current one if None)
+        """
+        if mode not in (self.LOCKED, self.TURBO, self.MULTIPLIER):
+            raise ValueError("Unknown pacing mode: {}".format(mode))
+        if multiplier is not None:
+            if multiplier <= 0:
+                raise ValueError("Speed multiplier must be positive: {}".format(multiplier))
+            self.multiplier = multiplier
+        self.mode = mode
+        if mode == self.MULTIPLIER:
+            self.frame_period = 1 / (self.FRAME_RATE * self.multiplier)
+        else:
+            self.frame_period = 1 / self.FRAME_RATE
+        self.next_frame_time = self.clock()
+
+    def frames_due(self):
+        """
+        :return: Number of frames that must be emulated now (0 if it is too early for the next one)
+        """
+        if self.mode == self.TURBO:
+            return 1
+        now = self.clock()
+        if now < self.next_frame_time:
+            return 0
+        frames = int((now - self.next_frame_time) / self.frame_period) + 1
+        if frames > self.MAX_CATCH_UP_FRAMES:
+            # Too far behind (e.g. the window was being dragged): drop the delay instead of running a burst of frames
+            self.next_frame_time = now
+            frames = 1
+        return frames
+
+    def frame_done(self):
+        """
+        Must be called after each emulated frame. Moves the deadline of the next frame and updates the metrics.
+        """
+        self.next_frame_time += self.frame_period
+        self._metrics_frames += 1
+
+        now = self.clock()
+        elapsed = now - self._metrics_start
+        if elapsed >= self.METRICS_INTERVAL:
+            self.fps = self._metrics_frames / elapsed
+            self.speed_ratio = self.fps / self.FRAME_RATE
+            self._metrics_start = now
+            self._metrics_frames = 0
+
+    def delay_until_next_frame(self):
+        """
+        :return: Seconds until the next frame is due (0 if it is already late, or in TURBO mode)
+        """
+        if self.mode == self.TURBO:
+            return 0.0
+        return max(0.0, self.next_frame_time - self.clock())
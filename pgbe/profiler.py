@@ -0,0 +1,131 @@
+"""
+Instruction profiler
+
+Records, for every instruction executed by the emulated program, how many times it ran, how many emulated cycles it
+took and how much host time was spent executing it. Data is aggregated both per opcode (CB-prefixed instructions are
+kept apart, as 0xCB00 | opcode) and per address, where addresses in the switchable cartridge area are told apart by
+the ROM bank mapped when they ran.
+
+Profiling is opt-in: while CPU.profiler is None the CPU main loop does not reference the profiler at all. Once a
+Profiler is attached, instructions are executed one at a time through Profiler.step() instead of in blocks, so the
+emulation runs noticeably slower and host times are only meaningful relative to each other.
+"""
+from time import perf_counter_ns
+
+import op
+
+
+class Profiler:
+    """ Per opcode and per address execution statistics """
+
+    CB_PREFIX = 0xCB00  # Keys of CB-prefixed instructions in opcodes
+
+    # Indexes of each statistic in the opcodes/addresses entries
+    COUNT = 0
+    CYCLES = 1
+    HOST_NS = 2
+
+    def __init__(self, gb):
+        """
+        :type gb: gb.GB
+        """
+        # Communication with other components
+        self.gb = gb
+
+        # State initialization
+        self.opcodes = {}  # opcode -> [count, cycles, host ns]
+        self.addresses = {}  # (ROM bank, address) -> [count, cycles, host ns]
+
+    def reset(self):
+        """ Discards all recorded statistics """
+        self.opcodes = {}
+        self.addresses = {}
+
+    def _bank_of(self, address: int):
+        """
+        :return: ROM bank the address belongs to, or None if it is not in the cartridge (e.g. code running from RAM)
+        """
+        if address < 0x4000:
+            return 0
+        if address < 0x8000:
+            return self.gb.memory.mbc.cartridge_bank
+        return None
+
+    def step(self):
+        """
+        Same as CPU.step(), but measuring the instruction executed. Only the instruction itself is timed: interrupts and
+        scheduled events (e.g. GPU mode changes) are not attributed to it.
+        :return: Number of cycles spent
+        """
+        gb = self.gb
+        cpu = gb.cpu
+        if cpu.halted or cpu.stopped:
+            return cpu.step()
+
+        address = cpu.register.PC
+        opcode = cpu.read_next_byte_from_cartridge()
+        key = opcode if opcode != 0xCB else self.CB_PREFIX | gb.memory.read_8bit(cpu.register.PC)
+
+        start = perf_counter_ns()
+        cycles_spent = op.execute(gb, opcode)
+        host_ns = perf_counter_ns() - start
+
+        for stats, stats_key in ((self.opcodes, key), (self.addresses, (self._bank_of(address), address))):
+            entry = stats.get(stats_key)
+            if entry is None:
+                stats[stats_key] = [1, cycles_spent, host_ns]
+            else:
+                entry[0] += 1
+                entry[1] += cycles_spent
+                entry[2] += host_ns
+
+        if gb.interrupts.attention:
+            cycles_spent += gb.metrics.time(gb.metrics.INTERRUPTS, gb.interrupts.update)
+        cpu.cycle_count += cycles_spent
+        if cpu.cycle_count >= gb.scheduler.next_event_cycle:
+            gb.scheduler.run_due(cpu.cycle_count)
+        return cycles_spent
+
+    def top_opcodes(self, n: int = 10, by: int = HOST_NS):
+        """
+        :param n: Number of opcodes to return
+        :param by: Statistic used to sort (COUNT, CYCLES or HOST_NS)
+        :return: List of (opcode, [count, cycles, host ns]), most expensive first
+        """
+        return sorted(self.opcodes.items(), key=lambda item: item[1][by], reverse=True)[:n]
+
+    def top_addresses(self, n: int = 10, by: int = HOST_NS):
+        """
+        :param n: Number of addresses to return
+        :param by: Statistic used to sort (COUNT, CYCLES or HOST_NS)
+        :return: List of ((ROM bank, address), [count, cycles, host ns]), most expensive first
+        """
+        return sorted(self.addresses.items(), key=lambda item: item[1][by], reverse=True)[:n]
+
+    @classmethod
+    def describe_opcode(cls, key: int):
+        """
+        :param key: Key of the opcodes dictionary
+        :return: Opcode and mnemonic, e.g. "CB 7C BIT 7,H"
+        """
+        if key >= cls.CB_PREFIX:
+            return "CB {:02X} {}".format(key & 0xFF, op.mnemonic(key & 0xFF, cb_prefixed=True))
+        return "{:02X}    {}".format(key, op.mnemonic(key))
+
+    def report(self, n: int = 10):
+        """
+        :param n: Number of opcodes and addresses listed
+        :return: Text with the most expensive opcodes and addresses (by host time)
+        """
+        total_ns = sum(entry[2] for entry in self.opcodes.values()) or 1
+        header = "{:<24} {:>10} {:>12} {:>10} {:>6}".format("", "count", "cycles", "host ms", "host%")
+        row = "{:<24} {:>10} {:>12} {:>10.2f} {:>6.1f}"
+
+        lines = ["Top opcodes", header]
+        for key, (count, cycles, host_ns) in self.top_opcodes(n):
+            lines.append(row.format(self.describe_opcode(key), count, cycles, host_ns / 1e6, 100 * host_ns / total_ns))
+        lines += ["", "Top addresses", header]
+        for (bank, address), (count, cycles, host_ns) in self.top_addresses(n):
+            location = "{:02X}:{:04X}".format(bank, address) if bank is not None else "--:{:04X}".format(address)
+            lines.append(row.format(location, count, cycles, host_ns / 1e6, 100 * host_ns / total_ns))
+        return "\n".join(lines)
@@ -62,14 +62,72 @@ See:
 """
 from log import Log
 
+# Flag bits in register F
+FLAG_Z = 0x80
+FLAG_N = 0x40
+FLAG_H = 0x20
+FLAG_C = 0x10
+
+
+def _build_flag_table(flags, *ranges):
+    """
+    Precompute the value of register F for every combination of operands.
+    :param flags: Function receiving the operands and returning the resulting F value
+    :param ranges: Range of each operand, the first one being the most significant part of the table index
+    :return: Table indexed by the operands packed as (... << 16) | (... << 8) | last_operand
+    """
+    if len(ranges) == 1:
+        return bytes(flags(a) for a in ranges[0])
+    if len(ranges) == 2:
+        return bytes(flags(a, b) for a in ranges[0] for b in ranges[1])
+    return bytes(flags(c, a, b) for c in ranges[0] for a in ranges[1] for b in ranges[2])
+
+
+# F values for 8-bit ALU operations. Tables that do not depend on the carry flag are indexed by the result (INC/DEC/
+# AND/OR/XOR) or by (A << 8) | operand (ADD/SUB/CP); ADC and SBC are indexed by (carry << 16) | (A << 8) | operand.
+# INC/DEC do not change the carry flag, so their tables leave it at zero and ops must keep the current C bit.
+INC_FLAGS = _build_flag_table(
+    lambda result: (FLAG_Z if result == 0 else 0) | (FLAG_H if (result & 0x0F) == 0 else 0),
+    range(0x100))
+DEC_FLAGS = _build_flag_table(
+    lambda result: (FLAG_Z if result == 0 else 0) | FLAG_N | (FLAG_H if (result & 0x0F) == 0x0F else 0),
+    range(0x100))
+ADD_FLAGS = _build_flag_table(
+    lambda a, b: ((FLAG_Z if ((a + b) & 0xFF) == 0 else 0) |
+                  (FLAG_H if ((a & 0x0F) + (b & 0x0F)) > 0x0F else 0) |
+                  (FLAG_C if (a + b) > 0xFF else 0)),
+    range(0x100), range(0x100))
+ADC_FLAGS = _build_flag_table(
+    lambda c, a, b: ((FLAG_Z if ((a + b + c) & 0xFF) == 0 else 0) |
+                     (FLAG_H if ((a & 0x0F) + (b & 0x0F) + c) > 0x0F else 0) |
+                     (FLAG_C if (a + b + c) > 0xFF else 0)),
+    range(2), range(0x100), range(0x100))
+SUB_FLAGS = _build_flag_table(
+    lambda a, b: ((FLAG_Z if a == b else 0) | FLAG_N |
+                  (FLAG_H if (b & 0x0F) > (a & 0x0F) else 0) |
+                  (FLAG_C if b > a else 0)),
+    range(0x100), range(0x100))
+SBC_FLAGS = _build_flag_table(
+    lambda c, a, b: ((FLAG_Z if ((a - b - c) & 0xFF) == 0 else 0) | FLAG_N |
+                     (FLAG_H if ((b + c) & 0x0F) > (a & 0x0F) else 0) |
+                     (FLAG_C if (b + c) > a else 0)),
+    range(2), range(0x100), range(0x100))
+CP_FLAGS = SUB_FLAGS  # CP is a SUB that throws the result away
+AND_FLAGS = _build_flag_table(lambda result: (FLAG_Z if result == 0 else 0) | FLAG_H, range(0x100))
+OR_FLAGS = _build_flag_table(lambda result: FLAG_Z if result == 0 else 0, range(0x100))
+XOR_FLAGS = OR_FLAGS
+
 
 class Register:
     """
     GB Registers
     """
-    def __init__(self):
+    def __init__(self, logger: Log = None):
+        """
+        :param logger: Logger to use, usually the one shared by all GB components (a new one is created if None)
+        """
         # Logger
-        self.logger = Log()
+        self.logger = logger if logger is not None else Log()
 
         # 8-bit registers (can be combined to read as 16-bit registers)
         self.A = 0x00  # Accumulator
@@ -198,7 +256,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.A = d8 & 0xFF
-        self.logger.debug("set register A = 0x{:02X}".format(self.A))
+        self.logger.debug("set register A = 0x%02X", self.A)
 
     def set_f(self, d8: int):
         """
@@ -206,7 +264,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.F = d8 & 0xFF
-        self.logger.debug("set register F = 0x{:02X}".format(self.F))
+        self.logger.debug("set register F = 0x%02X", self.F)
 
     # SET methods for 16-bit register combinations
     def set_af(self, d16: int):
@@ -223,7 +281,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.B = d8 & 0xFF
-        self.logger.debug("set register B = 0x{:02X}".format(self.B))
+        self.logger.debug("set register B = 0x%02X", self.B)
 
     def set_c(self, d8: int):
         """
@@ -231,7 +289,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.C = d8 & 0xFF
-        self.logger.debug("set register C = 0x{:02X}".format(self.C))
+        self.logger.debug("set register C = 0x%02X", self.C)
 
     def set_bc(self, d16: int):
         """
@@ -247,7 +305,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.D = d8 & 0xFF
-        self.logger.debug("set register D = 0x{:02X}".format(self.D))
+        self.logger.debug("set register D = 0x%02X", self.D)
 
     def set_e(self, d8: int):
         """
@@ -255,7 +313,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.E = d8 & 0xFF
-        self.logger.debug("set register E = 0x{:02X}".format(self.E))
+        self.logger.debug("set register E = 0x%02X", self.E)
 
     def set_de(self, d16: int):
         """
@@ -271,7 +329,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.H = d8 & 0xFF
-        self.logger.debug("set register H = 0x{:02X}".format(self.H))
+        self.logger.debug("set register H = 0x%02X", self.H)
 
     def set_l(self, d8: int):
         """
@@ -279,7 +337,7 @@ class Register:
         :param d8: Hex value to set
         """
         self.L = d8 & 0xFF
-        self.logger.debug("set register L = 0x{:02X}".format(self.L))
+        self.logger.debug("set register L = 0x%02X", self.L)
 
     def set_hl(self, d16: int):
         """
@@ -295,7 +353,7 @@ class Register:
         :param d16: Hex value to set (assumes it is in big endian format)
         """
         self.SP = d16 & 0xFFFF
-        self.logger.debug("set register SP = 0x{:04X}".format(self.SP))
+        self.logger.debug("set register SP = 0x%04X", self.SP)
 
     def set_pc(self, d16: int):
         """
@@ -303,7 +361,7 @@ class Register:
         :param d16: Hex value to set (assumes it is in big endian format)
         """
         self.PC = d16 & 0xFFFF
-        self.logger.debug("set register PC = 0x{:04X}".format(self.PC))
+        self.logger.debug("set register PC = 0x%04X", self.PC)
 
     def debug(self):
         """
@@ -0,0 +1,125 @@
+"""
+Rewind
+
+Keeps the save states (see state.py) of the last frames in a ring buffer, so the game can be taken back in time.
+
+States leave the framebuffer out: it is more than half of a full state, and it changes completely whenever the screen
+scrolls, so it would be most of the capture time (compressing its delta) and of the memory used. When a state is
+restored the frame is drawn again from VRAM and the GPU registers instead (see GPU.render_frame()).
+
+Storing every state as it is would still take ~50 KB per frame, but consecutive states are almost identical. So only
+one in every keyframe_interval states is stored in full (a keyframe); the ones in between are stored as the XOR with
+the previous state (a delta), which is all zeros except for the bytes that changed. Both are compressed with zlib, which
+turns those long runs of zeros into a few bytes.
+
+A keyframe and the deltas that follow it form a group, and a delta can only be restored by applying every delta before
+it to the keyframe of its group. When the memory budget is exceeded the oldest group is dropped as a whole.
+
+States are captured by the GPU at the start of V-Blank, through capture().
+"""
+try:
+    import numpy
+except ImportError:  # NumPy is optional, states are XORed as big integers instead
+    numpy = None
+import zlib
+from collections import deque
+
+
+class Rewinder:
+    """ Ring buffer of delta-compressed save states """
+
+    COMPRESSION_LEVEL = 1  # zlib level: deltas are mostly zeros, so higher levels barely reduce them but take longer
+
+    def __init__(self, gb, keyframe_interval: int = 60, memory_budget: int = 32 * 1024 * 1024):
+        """
+        :type gb: gb.GB
+        :param keyframe_interval: Number of states in each group (a keyframe followed by keyframe_interval-1 deltas)
+        :param memory_budget: Maximum size, in bytes, of the compressed states kept (the newest group is always kept)
+        """
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe interval must be at least 1: {}".format(keyframe_interval))
+
+        # Communication with other components
+        self.gb = gb
+
+        self.keyframe_interval = keyframe_interval
+        self.memory_budget = memory_budget
+
+        # State initialization
+        self._groups = deque()  # Each group is a list of compressed states: the keyframe, then its deltas
+        self._group_sizes = deque()  # Bytes used by each group
+        self._previous = None  # Last state captured/restored (uncompressed), which the next delta is based on
+        self.size = 0  # Bytes used by all the compressed states
+        self.frames = 0  # Number of states stored
+
+    def clear(self):
+        """ Discards every stored state """
+        self._groups.clear()
+        self._group_sizes.clear()
+        self._previous = None
+        self.size = 0
+        self.frames = 0
+
+    @staticmethod
+    def _xor(a: bytes, b: bytes):
+        """ :return: Byte-wise XOR of two states of the same length """
+        if numpy is not None:
+            return (numpy.frombuffer(a, dtype=numpy.uint8) ^ numpy.frombuffer(b, dtype=numpy.uint8)).tobytes()
+        return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+    def capture(self):
+        """ Stores the current state of the emulator. Called by the GPU once per frame. """
+        state = self.gb.save_state(framebuffer=False)
+        previous = self._previous
+        group = self._groups[-1] if self._groups else None
+        if group is None or len(group) >= self.keyframe_interval or len(previous) != len(state):
+            # Keyframe. The size of a state only changes with the number of scheduled events, in which case a delta
+            # cannot be calculated either.
+            data = zlib.compress(state, self.COMPRESSION_LEVEL)
+            self._groups.append([data])
+            self._group_sizes.append(0)
+        else:
+            data = zlib.compress(self._xor(previous, state), self.COMPRESSION_LEVEL)
+            group.append(data)
+        self._group_sizes[-1] += len(data)
+        self.size += len(data)
+        self.frames += 1
+        self._previous = state
+
+        while self.size > self.memory_budget and len(self._groups) > 1:
+            self.frames -= len(self._groups.popleft())
+            self.size -= self._group_sizes.popleft()
+
+    def rewind(self, frames: int = 1):
+        """
+        Restores the state captured the given number of frames before the last one. States newer than it are discarded,
+        so rewinding again goes further back, and capturing continues from the restored state.
+        :param frames: Number of frames to go back (0 restores the last state captured)
+        :return: Number of frames actually rewound, which is smaller than requested if not enough states are stored
+        """
+        if self.frames == 0:
+            return 0
+        frames = min(frames, self.frames - 1)
+        index = self.frames - 1 - frames  # Position of the state to restore, counting from the oldest one stored
+
+        # Discard the groups after the one containing the state
+        while self.frames - len(self._groups[-1]) > index:
+            self.frames -= len(self._groups.pop())
+            self.size -= self._group_sizes.pop()
+        group = self._groups[-1]
+        position = index - (self.frames - len(group))
+
+        state = zlib.decompress(group[0])
+        for delta in group[1:position + 1]:
+            state = self._xor(state, zlib.decompress(delta))
+        discarded = group[position + 1:]
+        del group[position + 1:]
+        discarded_size = sum(len(data) for data in discarded)
+        self._group_sizes[-1] -= discarded_size
+        self.size -= discarded_size
+        self.frames -= len(discarded)
+
+        self.gb.load_state(state, framebuffer=False)
+        self.gb.gpu.render_frame()
+        self._previous = state
+        return frames
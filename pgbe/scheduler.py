@@ -0,0 +1,95 @@
+"""
+Event scheduler
+
+Components that do something at a known point in time (e.g. the GPU changing modes every 80/172/204/456 cycles) schedule
+an event for that absolute CPU cycle, instead of being polled after every instruction. The CPU only has to compare its
+cycle counter with the earliest deadline (next_event_cycle), and call run_due() once it is reached.
+
+Events are kept in a min-heap ordered by (cycle, insertion order). Each event has a name, and scheduling an event with a
+name that is already pending replaces it; the replaced entry is only marked as cancelled and skipped once it reaches the
+top of the heap (lazy cancellation), so both operations are O(log n).
+"""
+import heapq
+from time import perf_counter_ns
+
+
+class Scheduler:
+    """ Min-heap of (cycle, sequence, name, callback) entries """
+
+    NEVER = 1 << 62  # next_event_cycle when there is nothing scheduled
+
+    def __init__(self):
+        self.next_event_cycle = self.NEVER  # Cycle of the earliest pending event (may belong to a cancelled entry)
+        self._queue = []
+        self._events = {}  # name -> pending entry
+        self._sequence = 0  # Events scheduled for the same cycle run in the order they were scheduled
+        self.metrics = None  # If set to a metrics.Metrics, the host time of each event is accounted under its name
+
+    def schedule(self, name: str, cycle: int, callback):
+        """
+        Schedules an event, replacing the pending event with the same name (if any).
+        :param name: Event identifier
+        :param cycle: Absolute CPU cycle when the event must run
+        :param callback: Called with the cycle the event was scheduled for (not the current one, which may be a few
+                         cycles later), so periodic events can schedule their next run without accumulating delays
+        """
+        previous = self._events.get(name)
+        if previous is not None:
+            previous[3] = None
+        entry = [cycle, self._sequence, name, callback]
+        self._sequence += 1
+        self._events[name] = entry
+        heapq.heappush(self._queue, entry)
+        if cycle < self.next_event_cycle:
+            self.next_event_cycle = cycle
+
+    def cancel(self, name: str):
+        """
+        Cancels a pending event. Nothing happens if there is no event with the given name.
+        :param name: Event identifier
+        """
+        entry = self._events.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    def is_scheduled(self, name: str):
+        """ :return: If there is a pending event with the given name """
+        return name in self._events
+
+    def cycle_of(self, name: str):
+        """ :return: Cycle of the pending event with the given name, or None """
+        entry = self._events.get(name)
+        return entry[0] if entry is not None else None
+
+    def events(self):
+        """ :return: List of (name, cycle, callback) of every pending event, in the order they will run """
+        return [(entry[2], entry[0], entry[3]) for entry in sorted(self._events.values())]
+
+    def run_due(self, cycle: int):
+        """
+        Runs, in order, every event scheduled up to the given cycle (including events scheduled by those callbacks).
+        :param cycle: Current CPU cycle
+        """
+        queue = self._queue
+        metrics = self.metrics
+        while queue and queue[0][0] <= cycle:
+            entry = heapq.heappop(queue)
+            callback = entry[3]
+            if callback is None:
+                continue  # Cancelled
+            del self._events[entry[2]]
+            if metrics is None:
+                callback(entry[0])
+            else:
+                start = perf_counter_ns()
+                callback(entry[0])
+                metrics.add(entry[2], perf_counter_ns() - start)
+        while queue and queue[0][3] is None:
+            heapq.heappop(queue)
+        self.next_event_cycle = queue[0][0] if queue else self.NEVER
+
+    def clear(self):
+        """ Removes all events """
+        self._queue = []
+        self._events = {}
+        self.next_event_cycle = self.NEVER
@@ -1,8 +1,14 @@
 """
 Emulator UI using Pyglet
 """
+import ctypes
+
 import pyglet
-from datetime import datetime
+from pyglet import gl
+from pyglet.window import key
+
+from pacing import FramePacer
+from joypad import Joypad
 
 
 # noinspection PyAbstractClass
@@ -11,41 +17,130 @@ class Screen(pyglet.window.Window):
 
     RGB = "RGB"
 
-    def __init__(self, gb):
+    TURBO_KEY = key.TAB  # While pressed, the emulator runs uncapped
+    REWIND_KEY = key.R  # While pressed, the game goes back in time (if gb.rewinder is set)
+    JOYPAD_KEYS = {key.RIGHT: Joypad.RIGHT, key.LEFT: Joypad.LEFT, key.UP: Joypad.UP, key.DOWN: Joypad.DOWN,
+                   key.X: Joypad.A, key.Z: Joypad.B, key.BACKSPACE: Joypad.SELECT, key.ENTER: Joypad.START}
+
+    def __init__(self, gb, scale: int = 1, pacer: FramePacer = None):
         """
         :type gb: gb.GB
+        :param scale: Initial integer scaling of the GameBoy display (1 == 160x144 window)
+        :param pacer: Decides when frames are emulated (locked to the GameBoy refresh rate if None)
         """
-        super(Screen, self).__init__(1, 1)
+        super(Screen, self).__init__(1, 1, resizable=True)
         self.set_visible(False)
 
         self.gb = gb
-        self.vertex_list = None
+        self.pacer = pacer if pacer is not None else FramePacer()
+        self._mode_before_turbo = None
+        self._rewinding = False
+        self.display_scale = max(1, int(scale))
+        self.offset_x = 0  # Where the display is drawn, so it stays centered when the window has extra space
+        self.offset_y = 0
+        self.image = None  # Framebuffer wrapped as an image, see run()
+        self.texture = None
 
     def run(self):
-        self.set_size(self.gb.gpu.SCREEN_WIDTH-1, self.gb.gpu.SCREEN_HEIGHT-1)
+        gpu = self.gb.gpu
+        self.set_minimum_size(gpu.SCREEN_WIDTH, gpu.SCREEN_HEIGHT)
+        self.set_size(gpu.SCREEN_WIDTH * self.display_scale, gpu.SCREEN_HEIGHT * self.display_scale)
         self.set_visible(True)
 
-        self.vertex_list = pyglet.graphics.vertex_list(self.gb.gpu.SCREEN_WIDTH * self.gb.gpu.SCREEN_HEIGHT,
-                                                       'v2i/stream',  # each vertice is 2D int
-                                                       'c3B/stream')  # each color is RGB byte
-        pos = 0
-        for y in range(143,-1,-1):  # By default (0,0) is bottom left; by inverting the range() we make (0,0) top left
-            for x in range(self.gb.gpu.SCREEN_WIDTH):
-                self.vertex_list.vertices[pos:pos + 2] = [x, y]
-                pos += 2
+        # The image reads straight from the GPU framebuffer memory (ctypes array sharing the bytearray buffer), so each
+        # frame is uploaded to the texture as a whole, without converting or copying it in Python first
+        framebuffer_data = (ctypes.c_ubyte * len(gpu.framebuffer)).from_buffer(gpu.framebuffer)
+        self.image = pyglet.image.ImageData(gpu.SCREEN_WIDTH, gpu.SCREEN_HEIGHT, self.RGB, framebuffer_data,
+                                            pitch=gpu.SCREEN_WIDTH * gpu.RGB_SIZE)
+        texture = pyglet.image.Texture.create(gpu.SCREEN_WIDTH, gpu.SCREEN_HEIGHT)
+        # Nearest neighbour filtering, so scaled pixels stay sharp squares instead of being blurred
+        gl.glBindTexture(texture.target, texture.id)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        self.texture = self.flip_vertically(texture)
 
-        pyglet.clock.schedule_interval(self.execute_cycle, 1 / (self.gb.cpu.CLOCK_HZ / self.gb.gpu.UPDATE_HZ))
+        self.pacer.set_mode(self.pacer.mode)  # Start pacing now, not from when the pacer was created
+        pyglet.clock.schedule_once(self.execute_cycle, 0)
         pyglet.app.run()
 
+    @staticmethod
+    def flip_vertically(texture):
+        """
+        By default (0,0) is bottom left, while the framebuffer starts at the top left, so the texture is drawn flipped.
+        get_transform() also moves the anchor to the top (y = height), and blit() draws from y - anchor_y, so the anchor
+        is moved back to the bottom left: otherwise the frame would be drawn below the position given to blit().
+        :param texture: pyglet Texture
+        :return: TextureRegion that draws the texture upside down, anchored at its bottom left corner
+        """
+        flipped = texture.get_transform(flip_y=True)
+        flipped.anchor_y = 0
+        return flipped
+
     def execute_cycle(self, _):
-        start = datetime.now()
-        self.gb.cpu.execute()
-        end = datetime.now()
-        delta = self.delta(start, end)
-        self.set_caption(str(1000.0 / delta))
+        """
+        Emulates the frames that are due according to the pacer, then schedules itself again for the next deadline.
+        """
+        for _ in range(self.pacer.frames_due()):
+            if self._rewinding and self.gb.rewinder is not None:
+                self.gb.rewinder.rewind(1)
+                self.update(self.gb.gpu.frame)  # Show the restored framebuffer
+            else:
+                self.gb.cpu.execute()
+            self.pacer.frame_done()
+        self.set_caption("pgbe - {:.0%} ({:.1f} fps)".format(self.pacer.speed_ratio, self.pacer.fps))
+        pyglet.clock.schedule_once(self.execute_cycle, self.pacer.delay_until_next_frame())
 
-    def update(self, new_color_list):
-        self.vertex_list.colors = new_color_list
+    def on_key_press(self, symbol, modifiers):
+        """
+        Pyglet method called when a key is pressed
+        """
+        if symbol == self.TURBO_KEY and self.pacer.mode != FramePacer.TURBO:
+            self._mode_before_turbo = self.pacer.mode
+            self.pacer.set_mode(FramePacer.TURBO)
+        elif symbol == self.REWIND_KEY:
+            self._rewinding = True
+        elif symbol in self.JOYPAD_KEYS:
+            self.gb.joypad.press(self.JOYPAD_KEYS[symbol])
+        else:
+            super(Screen, self).on_key_press(symbol, modifiers)
+
+    def on_key_release(self, symbol, modifiers):
+        """
+        Pyglet method called when a key is released
+        """
+        if symbol == self.TURBO_KEY and self._mode_before_turbo is not None:
+            self.pacer.set_mode(self._mode_before_turbo)
+            self._mode_before_turbo = None
+        elif symbol == self.REWIND_KEY:
+            self._rewinding = False
+        elif symbol in self.JOYPAD_KEYS:
+            self.gb.joypad.release(self.JOYPAD_KEYS[symbol])
+
+    def update(self, _):
+        """
+        Uploads the framebuffer to the texture. The frame received is a view of the GPU framebuffer, which the image
+        already points to.
+        """
+        self.texture.blit_into(self.image, 0, 0, 0)
+
+    def on_resize(self, width, height):
+        """
+        Pyglet method called when the window size changes. Uses the largest integer scale that fits the window, so every
+        GameBoy pixel has the same size.
+        """
+        super(Screen, self).on_resize(width, height)
+        if self.texture is None:
+            return  # Not running yet, run() sets the initial size
+        self.update_layout(width, height)
+
+    def update_layout(self, width: int, height: int):
+        """
+        Calculates the display scale and the offset that centers the display in a window of the given size.
+        """
+        gpu = self.gb.gpu
+        self.display_scale = max(1, min(width // gpu.SCREEN_WIDTH, height // gpu.SCREEN_HEIGHT))
+        self.offset_x = (width - gpu.SCREEN_WIDTH * self.display_scale) // 2
+        self.offset_y = (height - gpu.SCREEN_HEIGHT * self.display_scale) // 2
 
     # noinspection PyMethodOverriding
     def on_draw(self):
@@ -53,8 +148,6 @@ class Screen(pyglet.window.Window):
         Pyglet method to redraw the screen
         """
         self.clear()
-        self.vertex_list.draw(pyglet.gl.GL_POINTS)
-
-    def delta(self, a, b):
-        diff = b-a
-        return (diff.seconds * 1000.0) + (diff.microseconds / 1000.0)
+        gpu = self.gb.gpu
+        self.texture.blit(self.offset_x, self.offset_y,
+                          width=gpu.SCREEN_WIDTH * self.display_scale, height=gpu.SCREEN_HEIGHT * self.display_scale)
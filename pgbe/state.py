@@ -0,0 +1,173 @@
+"""
+Save states
+
+Serializes the whole machine state into a single binary blob, and restores it. The blob is made of:
+    - Header: magic, format version and the cartridge header checksums, so a state is only loaded into the same game
+    - Scalars: CPU registers and flags, interrupts, timer, joypad, MBC and GPU counters, packed with struct
+    - Pending scheduler events: event name, cycle and the name of the component method that handles it
+    - Buffers: VRAM, external RAM, internal RAM, OAM, I/O + HRAM + IE and the framebuffer, copied as they are. The
+      framebuffer can be left out (e.g. by the Rewinder, since it is most of the state and can be drawn again).
+
+Everything else (page table, decoded tiles, decoded GPU registers, cached IF/IE, ...) is derived from the data above and
+rebuilt after loading. The cartridge itself is not part of the state: it must already be loaded in the instance.
+"""
+import struct
+
+
+MAGIC = b"PGBE"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sH3s")  # Magic, version, cartridge header checksum + global checksum (0x014D - 0x014F)
+_SCALARS = struct.Struct(
+    "<8B2H"  # CPU registers: A, F, B, C, D, E, H, L, SP, PC
+    "??Q"    # CPU: halted, stopped, cycle_count
+    "?BB"    # Interrupts: IME, enable_IME_countdown, disable_IME_countdown
+    "qBqB?B"  # Timer: counter_reset_cycle, tima, tima_cycle, tma, enabled, counter_bit
+    "B"      # Joypad: pressed
+    "BB??"   # MBC: external_ram_bank, cartridge_bank, in_rom_banking_mode, external_ram_is_enabled
+    "?"      # Memory: boot_rom_loaded
+    "Q"      # GPU: frame_count
+    "B")     # Number of pending scheduler events
+_EVENT = struct.Struct("<QB")  # Cycle, length of the "event name:method name" string that follows
+
+
+def _cartridge_checksum(gb):
+    """ :return: Cartridge header checksum and global checksum bytes """
+    cartridge = gb.memory.cartridge
+    if cartridge is None:
+        raise ValueError("A cartridge must be loaded before saving or loading a state")
+    return bytes(cartridge[0x014D:0x0150])
+
+
+# noinspection PyProtectedMember
+def _buffers(gb, framebuffer: bool = True):
+    """ :return: Every buffer that is part of the state, in the order they are stored """
+    memory = gb.memory
+    buffers = (memory.vram, memory.external_ram, memory.internal_ram, memory._oam_page, memory._high_page)
+    return buffers + (gb.gpu.framebuffer,) if framebuffer else buffers
+
+
+def _event_components(gb):
+    """ :return: Dictionary of scheduler event name -> component that schedules it """
+    return {gb.gpu.EVENT: gb.gpu, gb.timer.EVENT: gb.timer}
+
+
+def save_state(gb, framebuffer: bool = True):
+    """
+    :type gb: gb.GB
+    :param framebuffer: If the framebuffer is included
+    :return: State of the emulator, as bytes
+    """
+    register = gb.cpu.register
+    interrupts = gb.interrupts
+    timer = gb.timer
+    mbc = gb.memory.mbc
+    events = gb.scheduler.events()
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, _cartridge_checksum(gb)),
+        _SCALARS.pack(register.A, register.F, register.B, register.C, register.D, register.E, register.H, register.L,
+                      register.SP, register.PC,
+                      gb.cpu.halted, gb.cpu.stopped, gb.cpu.cycle_count,
+                      interrupts.IME, interrupts.enable_IME_countdown, interrupts.disable_IME_countdown,
+                      timer.counter_reset_cycle, timer.tima, timer.tima_cycle, timer.tma, timer.enabled,
+                      timer.counter_bit,
+                      gb.joypad.pressed,
+                      mbc.external_ram_bank, mbc.cartridge_bank, mbc.in_rom_banking_mode, mbc.external_ram_is_enabled,
+                      gb.memory.boot_rom_loaded,
+                      gb.gpu.frame_count,
+                      len(events))]
+    for name, cycle, callback in events:
+        handler = "{}:{}".format(name, callback.__name__).encode("ascii")
+        parts.append(_EVENT.pack(cycle, len(handler)))
+        parts.append(handler)
+    parts.extend(_buffers(gb, framebuffer))
+    return b"".join(parts)
+
+
+# noinspection PyProtectedMember
+def load_state(gb, data: bytes, framebuffer: bool = True):
+    """
+    Restores a state created by save_state(). The same cartridge must already be loaded in the instance.
+    :type gb: gb.GB
+    :param data: State of the emulator, as returned by save_state()
+    :param framebuffer: If the state includes the framebuffer (as given to save_state()). If not, the framebuffer keeps
+                        its contents, see GPU.render_frame().
+    """
+    data = memoryview(data)
+    magic, version, checksum = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a pgbe save state")
+    if version != VERSION:
+        raise ValueError("Unsupported save state version: {} (expected {})".format(version, VERSION))
+    if checksum != _cartridge_checksum(gb):
+        raise ValueError("Save state belongs to a different cartridge")
+
+    offset = _HEADER.size
+    (a, f, b, c, d, e, h, l, sp, pc,
+     halted, stopped, cycle_count,
+     ime, enable_ime_countdown, disable_ime_countdown,
+     counter_reset_cycle, tima, tima_cycle, tma, timer_enabled, counter_bit,
+     pressed,
+     external_ram_bank, cartridge_bank, in_rom_banking_mode, external_ram_is_enabled,
+     boot_rom_loaded,
+     frame_count,
+     event_count) = _SCALARS.unpack_from(data, offset)
+    offset += _SCALARS.size
+
+    events = []
+    for _ in range(event_count):
+        cycle, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size
+        name, method = bytes(data[offset:offset + length]).decode("ascii").split(":")
+        offset += length
+        events.append((name, cycle, method))
+
+    buffers = _buffers(gb, framebuffer)
+    if len(data) - offset != sum(len(buffer) for buffer in buffers):
+        raise ValueError("Save state is truncated or corrupted")
+    if boot_rom_loaded and gb.memory.boot_rom is None:
+        raise ValueError("Save state was created while the boot ROM was mapped, but no boot ROM is loaded")
+
+    # Buffers are overwritten in place, since other components keep views of them
+    for buffer in buffers:
+        memoryview(buffer)[:] = data[offset:offset + len(buffer)]
+        offset += len(buffer)
+
+    cpu = gb.cpu
+    register = cpu.register
+    register.A, register.F, register.B, register.C = a, f, b, c
+    register.D, register.E, register.H, register.L = d, e, h, l
+    register.SP, register.PC = sp, pc
+    cpu.halted, cpu.stopped, cpu.cycle_count = halted, stopped, cycle_count
+
+    memory = gb.memory
+    mbc = memory.mbc
+    mbc.external_ram_bank, mbc.cartridge_bank = external_ram_bank, cartridge_bank
+    mbc.in_rom_banking_mode, mbc.external_ram_is_enabled = in_rom_banking_mode, external_ram_is_enabled
+    memory.boot_rom_loaded = boot_rom_loaded  # Maps cartridge/boot ROM and the selected bank again
+    memory._map_external_ram()
+    memory._generate_tile_cache()  # VRAM changed without going through writes
+    if cpu.block_cache is not None:
+        cpu.block_cache.clear_ram()
+
+    gb.gpu.load_registers()
+    gb.gpu.frame_count = frame_count
+
+    interrupts = gb.interrupts
+    interrupts.IME = ime
+    interrupts.enable_IME_countdown, interrupts.disable_IME_countdown = enable_ime_countdown, disable_ime_countdown
+    interrupts.write_enabled(memory._high_page[0xFF])
+    interrupts.write_requests(memory._high_page[0x0F])  # Also updates the attention flag
+
+    timer = gb.timer
+    timer.counter_reset_cycle, timer.tima, timer.tima_cycle, timer.tma = counter_reset_cycle, tima, tima_cycle, tma
+    timer.enabled, timer.counter_bit = timer_enabled, counter_bit
+
+    gb.joypad.pressed = pressed
+
+    scheduler = gb.scheduler
+    scheduler.clear()
+    components = _event_components(gb)
+    for name, cycle, method in events:
+        scheduler.schedule(name, cycle, getattr(components[name], method))
@@ -0,0 +1,116 @@
+"""
+Timer and Divider Registers
+
+    FF04 - DIV - Divider Register
+        Incremented at 16384 Hz (every 256 CPU cycles). Writing any value to it resets it to 00h.
+    FF05 - TIMA - Timer Counter
+        Incremented at the frequency selected by TAC. When it overflows it is reloaded with TMA and a Timer interrupt is
+        requested.
+    FF06 - TMA - Timer Modulo
+        Value loaded into TIMA when it overflows.
+    FF07 - TAC - Timer Control
+        Bit 2 - Timer Enable (0=Stop, 1=Start)
+        Bits 1-0 - Input Clock Select (00: 4096 Hz, 01: 262144 Hz, 10: 65536 Hz, 11: 16384 Hz)
+
+Both counters are derived from the same internal 16-bit counter, which is incremented every CPU cycle (DIV is its upper
+byte). Instead of incrementing anything after each instruction, the timer stores the CPU cycle when the internal counter
+was reset, and DIV/TIMA are calculated from the current cycle only when they are read. The only thing that must happen
+at a specific time, TIMA overflowing, is scheduled as a single event (see Scheduler), and scheduled again whenever a
+register write changes when it will happen.
+
+See:
+- http://gbdev.gg8.se/wiki/articles/Timer_and_Divider_Registers
+- http://gbdev.gg8.se/files/docs/mirrors/pandocs.html#timeranddividerregisters
+"""
+
+
+class Timer:
+    """ GB Timer """
+
+    DIV_ADDRESS = 0xFF04
+    TIMA_ADDRESS = 0xFF05
+    TMA_ADDRESS = 0xFF06
+    TAC_ADDRESS = 0xFF07
+
+    # TAC input clock select -> TIMA is incremented every time this bit of the internal counter goes from 1 to 0, i.e.
+    # every 2^bit cycles: 1024 (4096 Hz), 16 (262144 Hz), 64 (65536 Hz) and 256 (16384 Hz)
+    TIMA_COUNTER_BIT = (10, 4, 6, 8)
+    DIV_COUNTER_BIT = 8  # DIV is the upper byte of the internal counter
+
+    EVENT = "timer"  # Name of the scheduler event for TIMA overflow
+
+    def __init__(self, gb):
+        """
+        :type gb: gb.GB
+        """
+        # Communication with other components
+        self.gb = gb
+
+        # State initialization
+        self.counter_reset_cycle = 0  # CPU cycle when the internal counter (and DIV) was last reset
+        self.tima = 0  # TIMA value at tima_cycle
+        self.tima_cycle = 0  # CPU cycle when TIMA was last set (by a write, an overflow or a TAC change)
+        self.tma = 0
+        self.enabled = False  # TAC bit 2
+        self.counter_bit = self.TIMA_COUNTER_BIT[0]  # TAC bits 1-0
+
+    def _ticks(self, start_cycle: int, end_cycle: int):
+        """
+        :return: Number of times TIMA is incremented between two CPU cycles, with the current TAC settings
+        """
+        bit = self.counter_bit
+        return ((end_cycle - self.counter_reset_cycle) >> bit) - ((start_cycle - self.counter_reset_cycle) >> bit)
+
+    def _sync_tima(self):
+        """ Stores the current TIMA value, so settings can be changed from now on without changing past increments """
+        now = self.gb.cpu.cycle_count
+        if self.enabled:
+            self.tima = (self.tima + self._ticks(self.tima_cycle, now)) & 0xFF  # Overflow event ran, so no wrapping
+        self.tima_cycle = now
+
+    def _schedule_overflow(self):
+        """ Schedules (or cancels, if the timer is stopped) the event for the next TIMA overflow """
+        if not self.enabled:
+            self.gb.scheduler.cancel(self.EVENT)
+            return
+        # Cycle when the internal counter reaches the tick that takes TIMA from FF to 100
+        bit = self.counter_bit
+        ticks = (self.tima_cycle - self.counter_reset_cycle) >> bit
+        overflow_cycle = self.counter_reset_cycle + ((ticks + 0x100 - self.tima) << bit)
+        self.gb.scheduler.schedule(self.EVENT, overflow_cycle, self._overflow)
+
+    def _overflow(self, cycle: int):
+        """ TIMA overflowed: reload it with TMA and request the Timer interrupt """
+        self.tima = self.tma
+        self.tima_cycle = cycle
+        self.gb.interrupts.set_timer_requested_flag(True)
+        self._schedule_overflow()
+
+    def read_div(self):
+        """ :return: Current DIV value """
+        return ((self.gb.cpu.cycle_count - self.counter_reset_cycle) >> self.DIV_COUNTER_BIT) & 0xFF
+
+    def read_tima(self):
+        """ :return: Current TIMA value """
+        if not self.enabled:
+            return self.tima
+        return (self.tima + self._ticks(self.tima_cycle, self.gb.cpu.cycle_count)) & 0xFF
+
+    def write(self, address: int, value: int):
+        """
+        Called by Memory when FF04-FF07 are written.
+        :param address: Register address
+        :param value: Value written
+        """
+        self._sync_tima()
+        if address == self.DIV_ADDRESS:
+            self.counter_reset_cycle = self.gb.cpu.cycle_count  # Any write resets the counter
+        elif address == self.TIMA_ADDRESS:
+            self.tima = value
+        elif address == self.TMA_ADDRESS:
+            self.tma = value
+            return  # Only used on the next overflow, which does not change
+        elif address == self.TAC_ADDRESS:
+            self.enabled = (value & 0b100) != 0
+            self.counter_bit = self.TIMA_COUNTER_BIT[value & 0b11]
+        self._schedule_overflow()
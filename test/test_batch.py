@@ -0,0 +1,87 @@
+"""
+Tests for batch.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def cartridge():
+    """
+    Cartridge that keeps copying the state of the joypad buttons to C000:
+        0100: LD A,10 / 0102: LDH (00),A / 0104: LDH A,(00) / 0106: LD (C000),A / 0109: JR 0104
+    :return: cartridge data
+    """
+    cartridge = bytearray(0x8000)
+    cartridge[0x0100:0x010B] = bytes.fromhex("3E 10 E0 00 F0 00 EA 00 C0 18 F9")
+    return bytes(cartridge)
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_run_job(cartridge):
+    from batch import Job, run_job, FRAME, RAM, METRICS
+    result = run_job(Job(cartridge, frames=3, inputs=[(1, "start", True)], outputs=(FRAME, RAM, METRICS), name="x"))
+    assert result["name"] == "x"
+    assert len(result[FRAME]) == 160*144*3
+    assert len(result[RAM]) == 0x2000
+    assert result[RAM][0] == 0xD7
+    assert result[METRICS]["frames"] == 3
+    assert result[METRICS]["cycles"] >= 3*70224
+
+
+# noinspection PyShadowingNames
+def test_input_script(cartridge):
+    from batch import Job, run_job, RAM
+    inputs = [(2, "a", False), (0, "a", True), (1, "b", True)]  # Applied in frame order
+    assert run_job(Job(cartridge, frames=2, inputs=inputs, outputs=(RAM,)))[RAM][0] == 0xDC
+    assert run_job(Job(cartridge, frames=3, inputs=inputs, outputs=(RAM,)))[RAM][0] == 0xDD
+
+
+# noinspection PyShadowingNames
+def test_run_batch(cartridge, tmp_path):
+    from batch import Job, run_batch, run_job, RAM
+    rom = tmp_path / "test.gb"
+    rom.write_bytes(cartridge)
+    jobs = [Job(str(rom), frames=2, inputs=[(0, key, True)], outputs=(RAM,)) for key in ("a", "b", "select", "start")]
+    results = run_batch(jobs, processes=2)
+    assert [result["name"] for result in results] == [str(rom)] * 4
+    assert [result[RAM][0] for result in results] == [0xDE, 0xDD, 0xDB, 0xD7]
+    assert results == run_batch(jobs, processes=1)
+    assert results[0] == run_job(jobs[0])
+
+
+def test_unknown_output(cartridge):
+    from batch import Job, run_job
+    with pytest.raises(ValueError):
+        run_job(Job(cartridge, frames=1, outputs=("screenshot",)))
+
+
+def rollout(gb, index: int):
+    """ Presses a different key in each rollout, returning the value stored by the cartridge fixture program """
+    gb.joypad.press(("a", "b", "select", "start")[index % 4])
+    gb.run_frames(1)
+    return index, gb.memory.read_8bit(0xC000)
+
+
+# noinspection PyShadowingNames
+def test_run_rollouts(cartridge):
+    from gb import GB
+    from batch import run_rollouts
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge)
+    gb.run_frames(1)
+    state = gb.save_state()
+    expected = [(index, (0xDE, 0xDD, 0xDB, 0xD7)[index % 4]) for index in range(10)]
+    assert run_rollouts(gb, rollout, 10, processes=2, chunksize=3) == expected
+    assert run_rollouts(gb, rollout, 10, processes=1) == expected
+    assert gb.save_state() == state  # Not changed by its branches
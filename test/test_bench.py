@@ -0,0 +1,52 @@
+"""
+Tests for the benchmark suite (bench/)
+"""
+
+import pytest
+
+"""
+Tests
+"""
+
+
+def test_roms_are_up_to_date():
+    from bench import roms
+    for name in roms.PROGRAMS:
+        assert roms.load(name) == roms.assemble(name), "Run 'python -m bench.roms' to regenerate " + name
+
+
+def test_programs():
+    from bench import roms
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(roms.load("memory_copy"))
+    gb.run_frames(2)
+    assert gb.memory.read_8bit(0xC123) == roms.assemble("memory_copy")[0x1123]
+
+    gb = GB(headless=True)
+    gb.load_cartridge(roms.load("background_render"))
+    gb.run_frames(5)  # Tile data and map are uploaded in the first 3 frames
+    assert gb.memory.read_8bit(0x9801) == 0x01
+    assert gb.memory.read_8bit(0xFF43) > 0  # Scrolled once per frame
+    assert gb.cpu.halted
+
+    gb = GB(headless=True)
+    gb.load_cartridge(roms.load("interrupts"))
+    gb.run_frames(1)
+    assert gb.memory.read_8bit(0xC000) > 0  # Incremented by the timer interrupt handler
+
+
+def test_run_suite():
+    from bench import suite
+    results = suite.run_suite(["alu", "interrupts"], frames=2, repeat=1)
+    assert list(results["workloads"]) == ["alu", "interrupts"]
+    alu = results["workloads"]["alu"]
+    assert alu["frames"] == 2
+    assert alu["instructions"] > 0
+    assert alu["frames_per_second"] > 0
+    assert alu["cycles_per_second"] > alu["instructions_per_second"] > 0
+    assert {"cpu", "gpu", "render"} <= set(alu["subsystems"])
+    assert {"interrupts", "timer"} <= set(results["workloads"]["interrupts"]["subsystems"])
+
+    with pytest.raises(ValueError):
+        suite.run_suite(["unknown"])
@@ -0,0 +1,238 @@
+"""
+Tests for cpu.py and block_cache.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+def create_gb(program: str, routines: dict = None):
+    """
+    Create headless GB instance, with a cartridge that executes the given program after boot.
+    :param program: Hex string with the instructions to place at address 0x0100
+    :param routines: Other code to place in the cartridge (e.g. interrupt handlers), as {address: hex string}
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    cartridge = bytearray(0x8000)
+    for address, code in {**(routines or {}), 0x0100: program}.items():
+        code_bytes = bytes.fromhex(code)
+        cartridge[address:address + len(code_bytes)] = code_bytes
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+    return gb
+
+
+# Counts from 0 in register A, storing each value at C000, while incrementing B at every 256 iterations
+COUNTER_PROGRAM = ("3E 00"     # 0100: LD A,00
+                   "06 00"     # 0102: LD B,00
+                   "3C"        # 0104: INC A
+                   "EA 00 C0"  # 0105: LD (C000),A
+                   "20 FA"     # 0108: JR NZ,0104
+                   "04"        # 010A: INC B
+                   "18 F7")    # 010B: JR 0104
+
+
+@pytest.fixture
+def gb():
+    return create_gb(COUNTER_PROGRAM)
+
+
+"""
+Tests
+"""
+
+
+def assert_same_state(gb_a, gb_b):
+    """ Helper function to assert that two GB instances have the same registers and RAM """
+    for name in ("A", "F", "B", "C", "D", "E", "H", "L", "SP", "PC"):
+        assert getattr(gb_a.cpu.register, name) == getattr(gb_b.cpu.register, name)
+    assert gb_a.memory.internal_ram == gb_b.memory.internal_ram
+    assert gb_a.cpu.cycle_count == gb_b.cpu.cycle_count
+
+
+# noinspection PyShadowingNames
+def test_block_cache_same_result_as_step(gb):
+    gb_step = create_gb(COUNTER_PROGRAM)
+    gb_step.cpu.block_cache = None
+
+    for _ in range(2000):
+        gb.cpu.step_block()
+    while gb_step.cpu.cycle_count < gb.cpu.cycle_count:
+        gb_step.cpu.step()
+    assert_same_state(gb, gb_step)
+
+
+# noinspection PyShadowingNames
+def test_block_cache_ends_at_branch(gb):
+    block = gb.cpu.block_cache.get(0x0104)
+    assert block.start == 0x0104
+    assert block.end == 0x010A
+    assert block.last_opcode == 0x20
+    assert block.instructions == 3
+
+
+def test_block_cache_ram_invalidation():
+    gb = create_gb("21 00 C0"   # 0100: LD HL,C000
+                   "36 3C"      # 0103: LD (HL),3C  (INC A)
+                   "23"         # 0105: INC HL
+                   "36 C9"      # 0106: LD (HL),C9  (RET)
+                   "CD 00 C0"   # 0108: CALL C000
+                   "47"         # 010B: LD B,A
+                   "21 00 C0"   # 010C: LD HL,C000
+                   "36 3D"      # 010F: LD (HL),3D  (DEC A)
+                   "CD 00 C0"   # 0111: CALL C000
+                   "4F"         # 0114: LD C,A
+                   "18 FE")     # 0115: JR 0115
+    gb.run_frames(1)
+    assert gb.cpu.register.B == 0x02  # A starts as 0x01 after boot
+    assert gb.cpu.register.C == 0x01
+    assert gb.cpu.register.PC == 0x0115
+
+
+def test_block_cache_cartridge_bank():
+    from gb import GB
+    gb = GB(headless=True)
+    cartridge = bytearray(0x4000 * 4)
+    cartridge[0x0100:0x0103] = bytes.fromhex("C3 00 40")  # 0100: JP 4000
+    for bank in range(1, 4):
+        cartridge[0x4000 * bank:(0x4000 * bank) + 3] = bytes.fromhex("3E {:02X} 76".format(bank))  # LD A,bank / HALT
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+
+    assert gb.cpu.block_cache.get(0x4000).function(gb) > 0
+    assert gb.cpu.register.A == 0x01
+    gb.memory.write_8bit(0x2000, 0x03)
+    assert gb.cpu.block_cache.get(0x4000).function(gb) > 0
+    assert gb.cpu.register.A == 0x03
+
+
+# Opcodes not compared by test_block_cache_every_instruction: unused, CB prefix (compared separately), STOP, HALT and
+# the ones changing the interrupt state
+SKIPPED_OPCODES = {0xD3, 0xDB, 0xDD, 0xE3, 0xE4, 0xEB, 0xEC, 0xED, 0xF4, 0xFC, 0xFD, 0xCB, 0x10, 0x76, 0xF3, 0xFB, 0xD9}
+
+
+def random_instruction_state(gb, rng, code: bytes):
+    """
+    Helper function to place an instruction, followed by JR to itself, at C000 and randomize the registers. Register
+    pairs (and 16-bit operands) point to D000 - DFFF and C/8-bit operands to HRAM, so memory accesses stay in RAM.
+    """
+    import array
+    register = gb.cpu.register
+    register.A, register.F = rng.randrange(0x100), rng.randrange(0x100)  # Lower bits of F can be set by POP AF
+    register.B, register.D, register.H = (rng.randrange(0xD0, 0xE0) for _ in range(3))
+    register.C, register.E, register.L = rng.randrange(0x80, 0xFF), rng.randrange(0x100), rng.randrange(0x100)
+    register.SP = rng.randrange(0xD002, 0xDFFE)
+    register.PC = 0xC000
+    gb.memory.internal_ram[0x1000:0x2000] = array.array("B", rng.randbytes(0x1000))  # Never code, written directly
+    for offset, value in enumerate(code + bytes.fromhex("18 FE")):
+        gb.memory.write_8bit(0xC000 + offset, value)
+
+
+@pytest.mark.parametrize("cb_prefixed", [False, True])
+def test_block_cache_every_instruction(cb_prefixed):
+    import random
+    from block_cache import BlockCache
+    rng = random.Random(0)
+    gb_block = create_gb("18 FE")
+    gb_step = create_gb("18 FE")
+    gb_step.cpu.block_cache = None
+    for opcode in range(0x100):
+        if not cb_prefixed and opcode in SKIPPED_OPCODES:
+            continue
+        for _ in range(4):
+            if cb_prefixed:
+                code = bytes([0xCB, opcode])
+            else:
+                operands = [rng.randrange(0x80, 0xFF), rng.randrange(0xD0, 0xE0)]
+                code = bytes([opcode] + operands[:BlockCache.INSTRUCTION_LENGTH[opcode] - 1])
+            seed = rng.random()
+            for gb in (gb_block, gb_step):
+                random_instruction_state(gb, random.Random(seed), code)
+            gb_block.cpu.step_block()
+            while gb_step.cpu.cycle_count < gb_block.cpu.cycle_count:
+                gb_step.cpu.step()
+            assert_same_state(gb_block, gb_step)
+            assert gb_block.memory.hram == gb_step.memory.hram
+
+
+def test_block_cache_instruction_sequences():
+    # Mixes inlined instructions with the ones calling their opcode function, which must see the current registers
+    import random
+    from block_cache import BlockCache
+    rng = random.Random(0)
+    gb_block = create_gb("18 FE")
+    gb_step = create_gb("18 FE")
+    gb_step.cpu.block_cache = None
+    # Instructions that could move B, D or H (the address registers) out of RAM are left out
+    moving_pointers = {0x06, 0x16, 0x26, 0x09, 0x19, 0x29, 0x39, 0xC1, 0xD1, 0xE1, *range(0x40, 0x48),
+                       *range(0x50, 0x58), *range(0x60, 0x68)}
+    opcodes = [opcode for opcode in range(0x100) if opcode not in SKIPPED_OPCODES and
+               opcode not in BlockCache.BLOCK_END_OPCODES and opcode not in moving_pointers]
+    for _ in range(200):
+        code = b""
+        for _ in range(rng.randrange(2, 12)):
+            opcode = rng.choice(opcodes)
+            operands = [rng.randrange(0x80, 0xFF), rng.randrange(0xD0, 0xE0)]
+            code += bytes([opcode] + operands[:BlockCache.INSTRUCTION_LENGTH[opcode] - 1])
+        code += bytes([rng.choice([0x20, 0x28, 0x30, 0x38, 0xC2, 0xCA]), 0x02, 0xC0])  # Conditional JR/JP
+        seed = rng.random()
+        for gb in (gb_block, gb_step):
+            random_instruction_state(gb, random.Random(seed), code)
+        gb_block.cpu.step_block()
+        while gb_step.cpu.cycle_count < gb_block.cpu.cycle_count:
+            gb_step.cpu.step()
+        assert_same_state(gb_block, gb_step)
+        assert gb_block.memory.hram == gb_step.memory.hram
+
+
+# Waits for V-blank with HALT, counting frames in register B
+HALT_PROGRAM = ("3E 01"  # 0100: LD A,01
+                "E0 FF"  # 0102: LDH (FF),A - Enable V-blank interrupt
+                "FB"     # 0104: EI
+                "76"     # 0105: HALT
+                "04"     # 0106: INC B
+                "18 FC")  # 0107: JR 0105
+V_BLANK_HANDLER = {0x0040: "D9"}  # RETI
+
+
+def test_halt_fast_forwards_to_next_event():
+    gb = create_gb(HALT_PROGRAM, V_BLANK_HANDLER)
+    steps = []
+    step = gb.cpu.step
+    gb.cpu.step = lambda: steps.append(1) or step()
+    gb.run_frames(3)
+    assert gb.cpu.register.B == 3
+    # One step per GPU mode change (~450 per frame); without fast-forwarding, a halted CPU would spend ~17k steps per
+    # frame waiting 4 cycles at a time
+    assert len(steps) < 3 * 500
+
+
+def test_halt_wakes_without_ime():
+    gb = create_gb("3E 01"   # 0100: LD A,01
+                   "E0 FF"   # 0102: LDH (FF),A - Enable V-blank interrupt, but IME stays off
+                   "76"      # 0104: HALT
+                   "04"      # 0105: INC B
+                   "18 FD")  # 0106: JR 0105
+    gb.run_frames(1)
+    assert not gb.cpu.halted
+    assert gb.cpu.register.B > 0
+    assert gb.cpu.register.SP == 0xFFFE  # Interrupt was not serviced
+
+
+def test_halt_until_timer_interrupt():
+    gb = create_gb("3E 04"   # 0100: LD A,04
+                   "E0 FF"   # 0102: LDH (FF),A - Enable Timer interrupt only
+                   "3E 05"   # 0104: LD A,05
+                   "E0 07"   # 0106: LDH (07),A - Start timer, every 16 cycles
+                   "FB"      # 0108: EI
+                   "76"      # 0109: HALT
+                   "04"      # 010A: INC B
+                   "18 FC",  # 010B: JR 0109
+                   {0x0050: "D9"})  # RETI
+    gb.run_frames(1)
+    # TIMA overflows every 256 * 16 cycles
+    assert gb.cpu.register.B == pytest.approx(gb.gpu.UPDATE_HZ / (256 * 16), abs=2)
@@ -0,0 +1,117 @@
+"""
+Tests for env.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def cartridge():
+    """
+    Cartridge that keeps copying the state of the joypad buttons to C000 and counting the loops in C001:
+        0100: LD A,10 / 0102: LDH (00),A / 0104: LDH A,(00) / 0106: LD (C000),A / 0109: LD HL,C001 / 010C: INC (HL)
+        010D: JR 0104
+    :return: cartridge data
+    """
+    cartridge = bytearray(0x8000)
+    cartridge[0x0100:0x010F] = bytes.fromhex("3E 10 E0 00 F0 00 EA 00 C0 21 01 C0 34 18 F5")
+    return bytes(cartridge)
+
+
+def buttons(gb):
+    """ :return: Reward: number of buttons read as pressed by the cartridge fixture program """
+    return bin(~gb.memory.read_8bit(0xC000) & 0x0F).count("1")
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_step(cartridge):
+    from env import Env
+    env = Env(cartridge, frame_skip=2, observation=[0xC000], actions=((), ("a",), ("a", "b")), reward_function=buttons)
+    assert env.action_count == 3
+    observation, info = env.reset()
+    assert observation.shape == (1,)
+
+    observation, reward, terminated, truncated, info = env.step(1)
+    assert observation[0] == 0xDE
+    assert reward == 1
+    assert not terminated and not truncated
+    assert info["steps"] == 1
+    assert env.gb.gpu.frame_count == 2
+
+    assert env.step(2)[1] == 2
+    assert env.step(0)[0][0] == 0xDF  # Keys of the previous action are released
+
+
+# noinspection PyShadowingNames
+def test_reset(cartridge):
+    from env import Env
+    env = Env(cartridge, frame_skip=3, observation="ram", max_steps=2, done_function=lambda gb: False)
+    initial = env.reset()[0].copy()
+    assert initial.shape == (0x2000,)
+    assert not env.step(1)[3]
+    observation, reward, terminated, truncated, info = env.step(1)
+    assert truncated and not terminated
+    assert reward == 0.0
+    assert observation[0] == 0xDE
+    assert (env.reset()[0] == initial).all()
+    assert env.steps == 0
+    assert env.gb.gpu.frame_count == 0
+
+
+# noinspection PyShadowingNames
+def test_screen_observation(cartridge):
+    from env import Env
+    env = Env(cartridge, frame_skip=2)
+    observation, _ = env.reset()
+    assert observation.shape == (144, 160, 3)
+
+    env.gb.gpu.framebuffer[:] = bytes(len(env.gb.gpu.framebuffer))
+    assert env.step(0)[0] is observation  # View of the framebuffer, updated in place
+    assert observation.any()  # The last frame of the step was drawn
+
+    observation[:] = 0
+    env.gb.gpu.render_enabled = False
+    env.gb.run_frames(1)
+    assert not observation.any()  # Skipped frames are not drawn
+
+
+def test_invalid_arguments(cartridge):
+    from env import Env
+    with pytest.raises(ValueError):
+        Env(cartridge, frame_skip=0)
+    with pytest.raises(ValueError):
+        Env(cartridge, observation="vram")
+    with pytest.raises(ValueError):
+        Env(cartridge, actions=(("x",),))
+
+
+# noinspection PyShadowingNames
+def test_vector_env(cartridge):
+    from env import Env, VectorEnv, steps_per_second
+    with VectorEnv(3, cartridge, frame_skip=2, observation=[0xC000], actions=((), ("a",), ("b",)),
+                   reward_function=buttons, max_steps=2) as vector_env:
+        assert vector_env.count == 3
+        observations, infos = vector_env.reset()
+        assert observations.shape == (3, 1)
+
+        observations, rewards, terminated, truncated, infos = vector_env.step([0, 1, 2])
+        assert observations[:, 0].tolist() == [0xDF, 0xDE, 0xDD]
+        assert rewards.tolist() == [0, 1, 1]
+        assert not truncated.any()
+
+        observations, rewards, terminated, truncated, infos = vector_env.step([1, 1, 1])
+        assert truncated.all()  # Then reset automatically
+        assert [info["steps"] for info in infos] == [2, 2, 2]
+
+        assert steps_per_second(vector_env, steps=2) > 0
+    assert steps_per_second(Env(cartridge, frame_skip=1), steps=2) > 0
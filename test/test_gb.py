@@ -0,0 +1,169 @@
+"""
+Tests for gb.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with a cartridge filled with NOPs, for testing.
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_headless_has_no_screen(gb):
+    assert gb.screen is None
+
+
+def test_no_window_until_executed():
+    import subprocess
+    import sys
+    code = "from gb import GB; GB(); import sys; assert 'pyglet' not in sys.modules"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+class FakeScreen:
+    """ Front end that runs a few frames instead of a window main loop """
+
+    def __init__(self, gb):
+        self.gb = gb
+        self.frames = []
+
+    def run(self):
+        for _ in range(3):
+            self.gb.cpu.execute()
+
+    def update(self, frame):
+        self.frames.append(bytes(frame))
+
+
+def test_screen_injection():
+    from gb import GB
+    gb = GB(screen=FakeScreen)
+    assert gb.screen is None
+    gb.execute(bytes(0x8000))
+    assert isinstance(gb.screen, FakeScreen)
+    assert len(gb.screen.frames) == 3
+    assert gb.gpu.frame_count == 3
+
+
+def test_renderer_injection():
+    from functools import partial
+    from gb import GB
+    from gpu import GPU
+    gb = GB(renderer=partial(GPU, use_numpy=False))
+    assert not gb.gpu.use_numpy
+    assert gb.gpu.gb is gb
+
+
+def test_headless_cannot_execute():
+    from gb import GB
+    with pytest.raises(ValueError):
+        GB(headless=True, screen=FakeScreen).execute(bytes(0x8000))
+
+
+# noinspection PyShadowingNames
+def test_run_frames(gb):
+    frames = []
+    gb.run_frames(2, frame_sink=frames.append)
+    assert len(frames) == 2
+    assert len(bytes(frames[0])) == gb.gpu.SCREEN_WIDTH * gb.gpu.SCREEN_HEIGHT * gb.gpu.RGB_SIZE
+
+
+# noinspection PyShadowingNames
+def test_frame_shares_framebuffer_memory(gb):
+    frames = []
+    gb.run_frames(1, frame_sink=frames.append)
+    assert frames[0].readonly
+    assert frames[0].obj is gb.gpu.framebuffer
+    gb.gpu.framebuffer[0] = 0x12
+    assert frames[0][0] == 0x12
+
+
+# noinspection PyShadowingNames
+def test_run_frames_without_sink(gb):
+    gb.run_frames(1)
+    assert gb.cpu.cycle_count >= gb.gpu.UPDATE_HZ
+
+
+# noinspection PyShadowingNames
+def test_run_cycles(gb):
+    cycles = gb.run_cycles(1000)
+    assert cycles >= 1000
+    assert gb.cpu.cycle_count == cycles
+
+
+# noinspection PyShadowingNames
+def test_fork(gb):
+    gb.memory.write_8bit(0x8000, 0xFF)  # A tile, so there is something decoded to share
+    gb.run_frames(2)
+    gb.run_cycles(1000)
+    tile = gb.memory.get_tile(1, 0)
+    clone = gb.fork()
+    assert clone.screen is None
+    assert clone.save_state() == gb.save_state()
+    assert clone.memory.cartridge is gb.memory.cartridge
+    assert clone.memory.get_tile(1, 0) is tile
+    assert clone.cpu.block_cache.get(0x0150) is gb.cpu.block_cache.get(0x0150)
+
+    clone.run_frames(2)
+    gb.run_frames(2)
+    assert clone.save_state() == gb.save_state()
+    clone.memory.write_8bit(0xC000, 0x12)
+    assert gb.memory.read_8bit(0xC000) == 0x00
+    clone.memory.write_8bit(0x8000, 0x00)
+    assert gb.memory.get_tile(1, 0)[0] == [1] * 8
+
+
+def test_fork_keeps_settings(tmp_path):
+    import functools
+    from gb import GB
+    from gpu import GPU
+    from profiler import Profiler
+    gb = GB(headless=True, renderer=functools.partial(GPU, use_numpy=False), log_file=str(tmp_path / "gb.log"))
+    gb.load_cartridge(bytes(0x8000))
+    gb.cpu.block_cache = None
+    gb.cpu.profiler = Profiler(gb)
+    gb.run_frames(1)
+    clone = gb.fork()
+    assert not clone.gpu.use_numpy
+    assert clone.logger.path == gb.logger.path
+    assert clone.cpu.block_cache is None
+    assert isinstance(clone.cpu.profiler, Profiler) and clone.cpu.profiler is not gb.cpu.profiler
+    assert clone.cpu.profiler.gb is clone and clone.cpu.profiler.opcodes == {}
+    clone.run_frames(1)
+    gb.run_frames(1)
+    assert clone.save_state() == gb.save_state()
+
+
+# noinspection PyShadowingNames
+def test_run_cycles_steps_one_instruction_at_a_time_in_debug_mode(gb, monkeypatch):
+    from profiler import Profiler
+    assert gb.cpu.step_function() == gb.cpu.step_block
+    gb.debug_mode = True
+    assert gb.cpu.step_function() == gb.cpu.step
+    steps = []
+    step = gb.cpu.step
+    monkeypatch.setattr(gb.cpu, "step", lambda: steps.append(None) or step())
+    monkeypatch.setattr(gb.cpu, "step_block", lambda: pytest.fail("Blocks skip the debug output"))
+    gb.run_cycles(40)
+    assert len(steps) == 10  # NOPs
+    gb.cpu.profiler = Profiler(gb)
+    assert gb.cpu.step_function() == gb.cpu.profiler.step
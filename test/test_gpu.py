@@ -0,0 +1,130 @@
+"""
+Tests for gpu.py
+"""
+
+import random
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with random VRAM contents, for testing.
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    rng = random.Random(0)
+    for address in range(0x8000, 0xA000):
+        gb.memory.write_8bit(address, rng.randrange(0x100))
+    return gb
+
+
+"""
+Tests
+"""
+
+
+def render_frame(gb, use_numpy):
+    """
+    Helper function to draw every display line with the selected renderer.
+    :return: Framebuffer as bytes
+    """
+    from gpu import GPU
+    gpu = GPU(gb, use_numpy=use_numpy)
+    gpu.load_registers()
+    for line in range(gpu.SCREEN_HEIGHT):
+        gpu.lcd_y_coordinate.update(line)
+        gpu.copy_current_display_line_to_framebuffer()
+    return bytes(gpu.framebuffer)
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize("lcd_control,scroll_y,scroll_x,palette", [
+    (0x91, 0x00, 0x00, 0xE4),  # Tile set 1, tile map 0
+    (0x81, 0x37, 0xC5, 0x1B),  # Tile set 0 (signed tile numbers), wrapping around both axes
+    (0x89, 0xF0, 0x03, 0x93),  # Tile map 1
+    (0x90, 0x00, 0x00, 0xE4),  # Background disabled
+    (0x11, 0x00, 0x00, 0xE4),  # LCD disabled
+])
+def test_numpy_renderer_matches_python_renderer(gb, lcd_control, scroll_y, scroll_x, palette):
+    pytest.importorskip("numpy")
+    gb.memory.write_8bit(0xFF40, lcd_control)
+    gb.memory.write_8bit(0xFF42, scroll_y)
+    gb.memory.write_8bit(0xFF43, scroll_x)
+    gb.memory.write_8bit(0xFF47, palette)
+    assert render_frame(gb, use_numpy=True) == render_frame(gb, use_numpy=False)
+
+
+# noinspection PyShadowingNames
+def test_numpy_renderer_decodes_tiles_again_after_write(gb):
+    pytest.importorskip("numpy")
+    from gpu import GPU
+    gb.memory.write_8bit(0xFF40, 0x91)
+    gb.memory.write_8bit(0xFF42, 0x00)
+    gb.memory.write_8bit(0xFF43, 0x00)
+    gb.memory.write_8bit(0xFF47, 0xE4)
+    for address in range(0x9800, 0x9820):
+        gb.memory.write_8bit(address, 0x00)  # First background line only uses tile 0
+    gpu = GPU(gb, use_numpy=True)
+    gpu.load_registers()
+    gpu.lcd_y_coordinate.update(0)
+    gb.memory.write_8bit(0x8000, 0x00)
+    gb.memory.write_8bit(0x8001, 0x00)
+    gpu.copy_current_display_line_to_framebuffer()
+    assert gpu.framebuffer_array[0, 0].tolist() == [255, 255, 255]
+    gb.memory.write_8bit(0x8000, 0xFF)
+    gb.memory.write_8bit(0x8001, 0xFF)
+    gpu.copy_current_display_line_to_framebuffer()
+    assert gpu.framebuffer_array[0, 0].tolist() == [0, 0, 0]
+
+
+# noinspection PyShadowingNames
+def test_mode_timing(gb):
+    gpu = gb.gpu
+    start = gb.cpu.cycle_count
+    gb.run_cycles(gpu.MODE_2_CYCLES)
+    assert gpu.lcd_status.lcd_controller_mode == 3
+    gb.run_cycles(start + gpu.MODE_2_CYCLES + gpu.MODE_3_CYCLES - gb.cpu.cycle_count)
+    assert gpu.lcd_status.lcd_controller_mode == 0
+    gb.run_cycles(start + 456 * 10 - gb.cpu.cycle_count)
+    assert gpu.lcd_y_coordinate.value == 10
+    assert gpu.lcd_status.lcd_controller_mode == 2
+    gb.run_cycles(start + gpu.UPDATE_HZ - gb.cpu.cycle_count)
+    assert gpu.frame_count == 1
+    assert gpu.lcd_y_coordinate.value == 0
+
+
+# noinspection PyShadowingNames
+def test_instances_have_independent_registers(gb):
+    from gb import GB
+    other = GB(headless=True)
+    other.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    gb.memory.write_8bit(0xFF42, 0x12)
+    gb.run_cycles(456 * 5)
+    assert gb.gpu.scroll_y.value == 0x12 and gb.gpu.lcd_y_coordinate.value == 5
+    assert other.gpu.scroll_y.value == 0 and other.gpu.lcd_y_coordinate.value == 0
+    assert other.memory.read_8bit(0xFF42) == 0
+
+
+# noinspection PyShadowingNames
+def test_numpy_renderer_palette_written_between_lines(gb):
+    pytest.importorskip("numpy")
+    gpu = gb.gpu  # Receives the register writes
+    assert gpu.use_numpy
+    gb.memory.write_8bit(0xFF40, 0x91)
+    gpu.lcd_y_coordinate.update(0)
+    gb.memory.write_8bit(0xFF47, 0x00)  # Every color is white
+    assert gpu.background_palette.color_array.tolist() == [[255, 255, 255]] * 4
+    gpu.copy_current_display_line_to_framebuffer()
+    assert gpu.framebuffer_array[0].tolist() == [[255, 255, 255]] * gpu.SCREEN_WIDTH
+    gb.memory.write_8bit(0xFF47, 0xFF)  # Every color is black
+    gpu.copy_current_display_line_to_framebuffer()
+    assert gpu.framebuffer_array[0].tolist() == [[0, 0, 0]] * gpu.SCREEN_WIDTH
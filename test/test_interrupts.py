@@ -0,0 +1,97 @@
+"""
+Tests for interrupts.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with a cartridge filled with NOPs, for testing.
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    gb.cpu.register.SP = 0xD000
+    gb.cpu.register.PC = 0x1234
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_registers_kept_in_sync(gb):
+    gb.memory.write_8bit(0xFF0F, 0b10110)
+    gb.memory.write_8bit(0xFFFF, 0b00111)
+    assert gb.interrupts.IF == 0b10110
+    assert gb.interrupts.IE == 0b00111
+    assert gb.interrupts.pending == 0b00110
+    assert gb.interrupts.timer_requested() == 1
+    assert gb.interrupts.v_blank_requested() == 0
+    gb.interrupts.set_timer_requested_flag(False)
+    assert gb.memory.read_8bit(0xFF0F) == 0b10010
+    assert gb.interrupts.pending == 0b00010
+    gb.memory.ie = 0
+    assert gb.interrupts.pending == 0
+
+
+# noinspection PyShadowingNames
+def test_nothing_to_do_without_ime(gb):
+    gb.memory.write_8bit(0xFF0F, 0x1F)
+    gb.memory.write_8bit(0xFFFF, 0x1F)
+    assert not gb.interrupts.attention
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize("requested,handler,remaining", [
+    (0b00001, 0x0040, 0b00000),
+    (0b00010, 0x0048, 0b00000),
+    (0b00100, 0x0050, 0b00000),
+    (0b01000, 0x0058, 0b00000),
+    (0b10000, 0x0060, 0b00000),
+    (0b10110, 0x0048, 0b10100),  # Highest priority first
+])
+def test_dispatch(gb, requested, handler, remaining):
+    gb.memory.write_8bit(0xFFFF, 0x1F)
+    gb.memory.write_8bit(0xFF0F, requested)
+    gb.interrupts.enable()
+    assert gb.interrupts.attention
+    assert gb.interrupts.update() == 5
+    assert gb.cpu.register.PC == handler
+    assert gb.cpu.register.SP == 0xCFFE
+    assert gb.memory.read_16bit(0xCFFE) == 0x1234
+    assert gb.memory.read_8bit(0xFF0F) == remaining
+    assert not gb.interrupts.IME
+    assert not gb.interrupts.attention
+
+
+# noinspection PyShadowingNames
+def test_ei_delay(gb):
+    gb.memory.write_8bit(0xFFFF, 0x01)
+    gb.memory.write_8bit(0xFF0F, 0x01)
+    gb.interrupts.enable_after_next_instruction()
+    assert gb.interrupts.update() == 0  # Right after EI
+    assert not gb.interrupts.IME
+    assert gb.interrupts.update() == 5  # After the next instruction
+    assert gb.cpu.register.PC == 0x0040
+
+
+# noinspection PyShadowingNames
+def test_di_delay(gb):
+    gb.interrupts.enable()
+    gb.interrupts.disable_after_next_instruction()
+    gb.interrupts.update()  # Right after DI
+    assert gb.interrupts.IME
+    gb.interrupts.update()  # After the next instruction
+    assert not gb.interrupts.IME
+    assert not gb.interrupts.attention
@@ -0,0 +1,67 @@
+"""
+Tests for joypad.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with a cartridge filled with NOPs, for testing.
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_nothing_pressed(gb):
+    gb.memory.write_8bit(0xFF00, 0x00)
+    assert gb.memory.read_8bit(0xFF00) == 0xCF
+    gb.memory.write_8bit(0xFF00, 0x30)
+    assert gb.memory.read_8bit(0xFF00) == 0xFF
+
+
+# noinspection PyShadowingNames
+def test_key_groups(gb):
+    gb.joypad.press("start")
+    gb.joypad.press(gb.joypad.LEFT)
+    gb.memory.write_8bit(0xFF00, 0x10)  # Buttons
+    assert gb.memory.read_8bit(0xFF00) == 0xD7
+    gb.memory.write_8bit(0xFF00, 0x20)  # Directions
+    assert gb.memory.read_8bit(0xFF00) == 0xED
+    gb.memory.write_8bit(0xFF00, 0x30)  # None
+    assert gb.memory.read_8bit(0xFF00) == 0xFF
+    gb.joypad.release("START")
+    gb.memory.write_8bit(0xFF00, 0x10)
+    assert gb.memory.read_8bit(0xFF00) == 0xDF
+
+
+# noinspection PyShadowingNames
+def test_press_requests_interrupt(gb):
+    gb.cpu.stopped = True
+    gb.joypad.press("a")
+    assert gb.interrupts.joypad_requested() == 1
+    assert not gb.cpu.stopped
+    gb.interrupts.set_joypad_requested_flag(False)
+    gb.joypad.press("a")  # Already pressed
+    assert gb.interrupts.joypad_requested() == 0
+
+
+def test_unknown_key():
+    from joypad import Joypad
+    with pytest.raises(ValueError):
+        Joypad.key_bit("turbo")
@@ -0,0 +1,62 @@
+"""
+Tests for log.py
+"""
+
+import os
+
+"""
+Tests
+"""
+
+
+def test_no_log_file_when_debug_disabled(tmp_path, monkeypatch):
+    from log import Log
+    monkeypatch.chdir(tmp_path)
+    log = Log()
+    log.debug("value %02X", 0x12)
+    log.info("value %02X", 0x12)
+    assert not os.path.exists(tmp_path / Log.LOG_FILE)
+
+
+def test_disabled_calls_are_no_op():
+    from log import Log
+    log = Log()
+    assert log.debug is Log._disabled
+    assert log.info is Log._disabled
+
+
+def test_set_debug_mode_swaps_methods():
+    from log import Log
+    log = Log()
+    log.setDebugMode(True)
+    assert log.debug == log.logger.debug
+    assert log.info == log.logger.info
+    log.setDebugMode(False)
+    assert log.debug is Log._disabled
+
+
+def test_instances_have_their_own_logger():
+    from log import Log
+    log, other = Log(True), Log(True)
+    assert log.logger is not other.logger
+    assert log.logger is log.logger
+
+
+def test_log_file_per_instance(tmp_path):
+    from log import Log
+    log, other = Log(True, path=str(tmp_path / "a.log")), Log(True, path=str(tmp_path / "b.log"))
+    log.debug("first %d", 1)
+    other.debug("second %d", 2)
+    Log(True, path=str(tmp_path / "a.log")).debug("third %d", 3)  # Same file: not truncated again
+    log.debug("fourth %d", 4)
+    assert [line.split()[-1] for line in (tmp_path / "a.log").read_text().splitlines()] == ["1", "3", "4"]
+    assert (tmp_path / "b.log").read_text().split()[-1] == "2"
+
+
+def test_gb_log_file(tmp_path):
+    from gb import GB
+    gb = GB(headless=True, log_file=str(tmp_path / "gb.log"))
+    assert gb.logger.path == str(tmp_path / "gb.log")
+    gb.logger.setDebugMode(True)
+    gb.logger.info("Title: %s", "TEST")
+    assert (tmp_path / "gb.log").read_text().endswith("INFO Title: TEST\n")
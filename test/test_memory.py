@@ -37,55 +37,53 @@ def assert_memory(memory, custom_address=None):
     :param memory:          Memory instance to access memory
     :param custom_address:  dict with format address:value
     """
-    if custom_address is None:
-        custom_address = {}
-
+    expected = bytearray(0x10000)
     if memory.boot_rom_loaded:
-        for i in range(0x0000,len(memory.boot_rom)+1):
-            custom_address.setdefault(i, memory.boot_rom[i])
+        expected[0x0000:len(memory.boot_rom)] = memory.boot_rom
     else:
-        custom_address.setdefault(0xFF05, 0x00)  # TIMA
-        custom_address.setdefault(0xFF06, 0x00)  # TMA
-        custom_address.setdefault(0xFF07, 0x00)  # TAC
-        custom_address.setdefault(0xFF10, 0x80)  # NR10
-        custom_address.setdefault(0xFF11, 0xBF)  # NR11
-        custom_address.setdefault(0xFF12, 0xF3)  # NR12
-        custom_address.setdefault(0xFF14, 0xBF)  # NR14
-        custom_address.setdefault(0xFF16, 0x3F)  # NR21
-        custom_address.setdefault(0xFF17, 0x00)  # NR22
-        custom_address.setdefault(0xFF19, 0xBF)  # NR24
-        custom_address.setdefault(0xFF1A, 0x7F)  # NR30
-        custom_address.setdefault(0xFF1B, 0xFF)  # NR31
-        custom_address.setdefault(0xFF1C, 0x9F)  # NR32
-        custom_address.setdefault(0xFF1E, 0xBF)  # NR33
-        custom_address.setdefault(0xFF20, 0xFF)  # NR41
-        custom_address.setdefault(0xFF21, 0x00)  # NR42
-        custom_address.setdefault(0xFF22, 0x00)  # NR43
-        custom_address.setdefault(0xFF23, 0xBF)  # NR30
-        custom_address.setdefault(0xFF24, 0x77)  # NR50
-        custom_address.setdefault(0xFF25, 0xF3)  # NR51
-        custom_address.setdefault(0xFF26, 0xF1)  # NR52
-        custom_address.setdefault(0xFF40, 0x91)  # LCDC
-        custom_address.setdefault(0xFF42, 0x00)  # SCY
-        custom_address.setdefault(0xFF43, 0x00)  # SCX
-        custom_address.setdefault(0xFF45, 0x00)  # LYC
-        custom_address.setdefault(0xFF47, 0xFC)  # BGP
-        custom_address.setdefault(0xFF48, 0xFF)  # 0BP0
-        custom_address.setdefault(0xFF49, 0xFF)  # 0BP1
-        custom_address.setdefault(0xFF50, 0x01)  # Boot ROM unmap
-        custom_address.setdefault(0xFF4A, 0x00)  # WY
-        custom_address.setdefault(0xFF4B, 0x00)  # WX
-        custom_address.setdefault(0xFFFF, 0x00)  # IE
-
-    for address in range(0x0000,0xFFFF + 1):
-        value = memory._read(address)
-        expected_value = 0
-        if address in custom_address:
-            expected_value = custom_address[address]
-
-        if value != expected_value:
-            print("Memory address", hex(address), "contains", hex(value), "instead of", hex(expected_value))
-        assert value == expected_value
+        expected[0xFF00] = 0xCF  # P1 (no keys pressed)
+        expected[0xFF05] = 0x00  # TIMA
+        expected[0xFF06] = 0x00  # TMA
+        expected[0xFF07] = 0x00  # TAC
+        expected[0xFF10] = 0x80  # NR10
+        expected[0xFF11] = 0xBF  # NR11
+        expected[0xFF12] = 0xF3  # NR12
+        expected[0xFF14] = 0xBF  # NR14
+        expected[0xFF16] = 0x3F  # NR21
+        expected[0xFF17] = 0x00  # NR22
+        expected[0xFF19] = 0xBF  # NR24
+        expected[0xFF1A] = 0x7F  # NR30
+        expected[0xFF1B] = 0xFF  # NR31
+        expected[0xFF1C] = 0x9F  # NR32
+        expected[0xFF1E] = 0xBF  # NR33
+        expected[0xFF20] = 0xFF  # NR41
+        expected[0xFF21] = 0x00  # NR42
+        expected[0xFF22] = 0x00  # NR43
+        expected[0xFF23] = 0xBF  # NR30
+        expected[0xFF24] = 0x77  # NR50
+        expected[0xFF25] = 0xF3  # NR51
+        expected[0xFF26] = 0xF1  # NR52
+        expected[0xFF40] = 0x91  # LCDC
+        expected[0xFF42] = 0x00  # SCY
+        expected[0xFF43] = 0x00  # SCX
+        expected[0xFF45] = 0x00  # LYC
+        expected[0xFF47] = 0xFC  # BGP
+        expected[0xFF48] = 0xFF  # 0BP0
+        expected[0xFF49] = 0xFF  # 0BP1
+        expected[0xFF50] = 0x01  # Boot ROM unmap
+        expected[0xFF4A] = 0x00  # WY
+        expected[0xFF4B] = 0x00  # WX
+        expected[0xFFFF] = 0x00  # IE
+
+    for address, value in (custom_address or {}).items():
+        expected[address] = value
+
+    actual = memory.snapshot()  # Compared as a whole, addresses are only checked one by one to report differences
+    differences = [] if actual == expected else [address for address in range(0x0000, 0xFFFF + 1)
+                                                 if actual[address] != expected[address]]
+    for address in differences:
+        print("Memory address", hex(address), "contains", hex(actual[address]), "instead of", hex(expected[address]))
+    assert not differences
 
 
 # noinspection PyShadowingNames
@@ -122,3 +120,80 @@ def test_read_16bit(memory):
 def test_tile_set_shared(memory):
     memory.write_8bit(0x8800, 0x55)
     assert memory.read_8bit(0x8800) == 0x55
+
+
+# noinspection PyShadowingNames
+def test_internal_ram_echo(memory):
+    memory.write_8bit(0xE010, 0x55)
+    assert memory.read_8bit(0xC010) == 0x55
+    memory.write_8bit(0xC020, 0x66)
+    assert memory.read_8bit(0xE020) == 0x66
+
+
+# noinspection PyShadowingNames
+def test_snapshot(memory):
+    memory.cartridge = bytes(range(0x100)) * 0x80
+    memory.write_8bit(0xC0FF, 0x11)
+    memory.write_8bit(0xC100, 0x22)
+    memory.write_8bit(0x9FFF, 0x33)
+    snapshot = memory.snapshot()
+    assert len(snapshot) == 0x10000
+    assert snapshot[0x0000:0x8000] == memory.cartridge
+    assert snapshot[0xE0FF:0xE101] == b"\x11\x22"  # Echo
+    assert snapshot[0xA000:0xC000] == bytes(0x2000)  # External RAM disabled
+    assert snapshot[0xFF00] == 0xCF  # Calculated when read
+    assert snapshot == bytes(memory.read_8bit(address) for address in range(0x10000))
+
+    assert memory.snapshot(0xC0FF, 0xC101) == b"\x11\x22"
+    assert memory.snapshot(0x9FFF, 0xA002) == b"\x33\x00\x00"
+    assert memory.snapshot(0xFFFF) == b"\x00"
+
+
+# noinspection PyShadowingNames
+def test_cartridge_bank_switch(memory):
+    memory.cartridge = b"".join(bytes([bank]) * 0x4000 for bank in range(4))
+    assert memory.read_8bit(0x4000) == 0x01
+    memory.write_8bit(0x2000, 0x03)
+    assert memory.read_8bit(0x4000) == 0x03
+    assert memory.read_8bit(0x7FFF) == 0x03
+    assert memory.read_8bit(0x3FFF) == 0x00
+
+
+# noinspection PyShadowingNames
+def test_external_ram_enable(memory):
+    memory.write_8bit(0xA010, 0x55)
+    assert memory.read_8bit(0xA010) == 0x00
+    memory.write_8bit(0x0000, 0x0A)
+    memory.write_8bit(0xA010, 0x55)
+    assert memory.read_8bit(0xA010) == 0x55
+    memory.write_8bit(0x0000, 0x00)
+    assert memory.read_8bit(0xA010) == 0x00
+
+
+# noinspection PyShadowingNames
+def test_get_tile(memory):
+    memory.write_8bit(0x8010, 0b01010101)  # Tile 1, line 0, bit 0 of each pixel
+    memory.write_8bit(0x8011, 0b00110011)  # Tile 1, line 0, bit 1 of each pixel
+    assert memory.get_tile(1, 1)[0] == [0, 1, 2, 3, 0, 1, 2, 3]
+    assert memory.get_tile(1, 1)[1] == [0] * 8
+
+    memory.write_8bit(0x8011, 0b11111111)  # Writing must invalidate the decoded tile
+    assert memory.get_tile(1, 1)[0] == [2, 3, 2, 3, 2, 3, 2, 3]
+
+
+# noinspection PyShadowingNames
+def test_get_tile_sets(memory):
+    memory.write_8bit(0x9000, 0xFF)  # Tile 0 of tile set 0
+    memory.write_8bit(0x8800, 0xFF)  # Tile 128 of both tile sets
+    assert memory.get_tile(0, 0)[0] == [1] * 8
+    assert memory.get_tile(1, 0)[0] == [0] * 8
+    assert memory.get_tile(0, 128)[0] == [1] * 8
+    assert memory.get_tile(1, 128)[0] == [1] * 8
+
+
+# noinspection PyShadowingNames
+def test_get_map(memory):
+    memory.write_8bit(0x9821, 0x55)  # Tile map 0, line 1, column 1
+    memory.write_8bit(0x9C00, 0x66)  # Tile map 1, line 0, column 0
+    assert memory.get_map(0)[1][1] == 0x55
+    assert memory.get_map(1)[0][0] == 0x66
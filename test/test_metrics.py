@@ -0,0 +1,86 @@
+"""
+Tests for metrics.py
+"""
+
+import json
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance running a timer interrupt every 64 cycles, while the main loop spins:
+        0050: INC (HL) / 0051: RETI
+        0100: LD HL,C000 / 0103: LD A,FC / 0105: LDH (06),A / 0107: LDH (05),A / 0109: LD A,05 / 010B: LDH (07),A
+        010D: LD A,04 / 010F: LDH (FF),A / 0111: EI / 0112: INC B / 0113: JR 0112
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    cartridge = bytearray(0x8000)
+    cartridge[0x0050:0x0052] = bytes.fromhex("34 D9")
+    cartridge[0x0100:0x0115] = bytes.fromhex("21 00 C0 3E FC E0 06 E0 05 3E 05 E0 07 3E 04 E0 FF FB 04 18 FD")
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_stats(gb):
+    gb.run_frames(2, frame_sink=lambda frame: None)
+    stats = gb.stats()
+    assert stats["frames"] == 2
+    assert stats["cycles"] == gb.cpu.cycle_count
+    assert stats["seconds"] > 0
+    assert stats["fps"] > 0
+
+    subsystems = stats["subsystems"]
+    assert set(subsystems) == {"cpu", "gpu", "timer", "interrupts", "render", "present"}
+    assert subsystems["cpu"]["calls"] == 2  # Main loop calls
+    assert subsystems["render"]["calls"] == 2 * 144
+    assert subsystems["present"]["calls"] == 2
+    assert subsystems["timer"]["calls"] > 1000
+    assert subsystems["interrupts"]["calls"] >= subsystems["timer"]["calls"]
+    assert sum(subsystem["seconds"] for subsystem in subsystems.values()) == pytest.approx(stats["seconds"])
+    assert sum(subsystem["fraction"] for subsystem in subsystems.values()) == pytest.approx(1.0)
+
+
+# noinspection PyShadowingNames
+def test_reset(gb):
+    gb.run_frames(1)
+    gb.metrics.reset()
+    stats = gb.stats()
+    assert stats["frames"] == 0
+    assert stats["cycles"] == 0
+    assert stats["seconds"] == 0
+    assert stats["subsystems"] == {"cpu": {"seconds": 0.0, "calls": 0, "fraction": 0.0}}
+
+    cycles = gb.run_cycles(1000)
+    stats = gb.stats()
+    assert stats["cycles"] == cycles
+    assert stats["subsystems"]["cpu"]["calls"] == 1
+
+
+# noinspection PyShadowingNames
+def test_write_every(gb, tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    gb.metrics.write_every(str(path), 2)
+    gb.run_frames(5)
+    snapshots = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [snapshot["frames"] for snapshot in snapshots] == [2, 4]
+
+    gb.metrics.write_every(None, 0)
+    gb.run_frames(2)
+    assert len(path.read_text().splitlines()) == 2
+    with pytest.raises(ValueError):
+        gb.metrics.write_every(str(path), 0)
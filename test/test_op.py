@@ -48,7 +48,6 @@ def assert_registers(gb, A=0x00, F=0x00, B=0x00, C=0x00, D=0x00, E=0x00, H=0x00,
     assert gb.cpu.register.PC == PC
 
 
-# noinspection PyProtectedMember
 def assert_memory(gb, custom_address=None):
     """
     Helper function to assert memory values.
@@ -56,59 +55,56 @@ def assert_memory(gb, custom_address=None):
     :param gb:              CPU instance to access memory
     :param custom_address:  dict with format address:value
     """
-    if custom_address is None:
-        custom_address = {}
-
-    for i in range(0x0000, len(gb.memory.cartridge)):
-        if gb.memory.cartridge[i] != 0:
-            custom_address.setdefault(i, gb.memory.cartridge[i])
+    expected = bytearray(0x10000)
+    cartridge = gb.memory.cartridge[0x0000:0x8000]
+    expected[0x0000:len(cartridge)] = cartridge
 
     if gb.memory.boot_rom_loaded:
-        for i in range(0x0000, len(gb.memory.boot_rom)):
-            custom_address.setdefault(i, gb.memory.boot_rom[i])
+        expected[0x0000:len(gb.memory.boot_rom)] = gb.memory.boot_rom
     else:
-        custom_address.setdefault(0xFF05, 0x00)  # TIMA
-        custom_address.setdefault(0xFF06, 0x00)  # TMA
-        custom_address.setdefault(0xFF07, 0x00)  # TAC
-        custom_address.setdefault(0xFF10, 0x80)  # NR10
-        custom_address.setdefault(0xFF11, 0xBF)  # NR11
-        custom_address.setdefault(0xFF12, 0xF3)  # NR12
-        custom_address.setdefault(0xFF14, 0xBF)  # NR14
-        custom_address.setdefault(0xFF16, 0x3F)  # NR21
-        custom_address.setdefault(0xFF17, 0x00)  # NR22
-        custom_address.setdefault(0xFF19, 0xBF)  # NR24
-        custom_address.setdefault(0xFF1A, 0x7F)  # NR30
-        custom_address.setdefault(0xFF1B, 0xFF)  # NR31
-        custom_address.setdefault(0xFF1C, 0x9F)  # NR32
-        custom_address.setdefault(0xFF1E, 0xBF)  # NR33
-        custom_address.setdefault(0xFF20, 0xFF)  # NR41
-        custom_address.setdefault(0xFF21, 0x00)  # NR42
-        custom_address.setdefault(0xFF22, 0x00)  # NR43
-        custom_address.setdefault(0xFF23, 0xBF)  # NR30
-        custom_address.setdefault(0xFF24, 0x77)  # NR50
-        custom_address.setdefault(0xFF25, 0xF3)  # NR51
-        custom_address.setdefault(0xFF26, 0xF1)  # NR52
-        custom_address.setdefault(0xFF40, 0x91)  # LCDC
-        custom_address.setdefault(0xFF42, 0x00)  # SCY
-        custom_address.setdefault(0xFF43, 0x00)  # SCX
-        custom_address.setdefault(0xFF45, 0x00)  # LYC
-        custom_address.setdefault(0xFF47, 0xFC)  # BGP
-        custom_address.setdefault(0xFF48, 0xFF)  # 0BP0
-        custom_address.setdefault(0xFF49, 0xFF)  # 0BP1
-        custom_address.setdefault(0xFF50, 0x01)  # Boot ROM unmap
-        custom_address.setdefault(0xFF4A, 0x00)  # WY
-        custom_address.setdefault(0xFF4B, 0x00)  # WX
-        custom_address.setdefault(0xFFFF, 0x00)  # IE
-
-    for address in range(0x0000, 0xFFFF + 1):
-        value = gb.memory._read(address)
-        expected_value = 0
-        if address in custom_address:
-            expected_value = custom_address[address]
-
-        if value != expected_value:
-            print("Memory address", hex(address), "contains", hex(value), "instead of", hex(expected_value))
-        assert value == expected_value
+        expected[0xFF00] = 0xCF  # P1 (no keys pressed)
+        expected[0xFF05] = 0x00  # TIMA
+        expected[0xFF06] = 0x00  # TMA
+        expected[0xFF07] = 0x00  # TAC
+        expected[0xFF10] = 0x80  # NR10
+        expected[0xFF11] = 0xBF  # NR11
+        expected[0xFF12] = 0xF3  # NR12
+        expected[0xFF14] = 0xBF  # NR14
+        expected[0xFF16] = 0x3F  # NR21
+        expected[0xFF17] = 0x00  # NR22
+        expected[0xFF19] = 0xBF  # NR24
+        expected[0xFF1A] = 0x7F  # NR30
+        expected[0xFF1B] = 0xFF  # NR31
+        expected[0xFF1C] = 0x9F  # NR32
+        expected[0xFF1E] = 0xBF  # NR33
+        expected[0xFF20] = 0xFF  # NR41
+        expected[0xFF21] = 0x00  # NR42
+        expected[0xFF22] = 0x00  # NR43
+        expected[0xFF23] = 0xBF  # NR30
+        expected[0xFF24] = 0x77  # NR50
+        expected[0xFF25] = 0xF3  # NR51
+        expected[0xFF26] = 0xF1  # NR52
+        expected[0xFF40] = 0x91  # LCDC
+        expected[0xFF42] = 0x00  # SCY
+        expected[0xFF43] = 0x00  # SCX
+        expected[0xFF45] = 0x00  # LYC
+        expected[0xFF47] = 0xFC  # BGP
+        expected[0xFF48] = 0xFF  # 0BP0
+        expected[0xFF49] = 0xFF  # 0BP1
+        expected[0xFF50] = 0x01  # Boot ROM unmap
+        expected[0xFF4A] = 0x00  # WY
+        expected[0xFF4B] = 0x00  # WX
+        expected[0xFFFF] = 0x00  # IE
+
+    for address, value in (custom_address or {}).items():
+        expected[address] = value
+
+    actual = gb.memory.snapshot()  # Compared as a whole, addresses are only checked one by one to report differences
+    differences = [] if actual == expected else [address for address in range(0x0000, 0xFFFF + 1)
+                                                 if actual[address] != expected[address]]
+    for address in differences:
+        print("Memory address", hex(address), "contains", hex(actual[address]), "instead of", hex(expected[address]))
+    assert not differences
 
 
 fake_cartridge = bytes.fromhex("00")*0x8000
@@ -0,0 +1,107 @@
+"""
+Tests for pacing.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+class FakeClock:
+    """ Monotonic clock controlled by the test """
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """
+    Create fake clock for testing.
+    :return: new FakeClock instance
+    """
+    return FakeClock()
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_locked_frame_rate(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(clock=clock)
+    assert pacer.frames_due() == 1
+    pacer.frame_done()
+    assert pacer.frames_due() == 0
+    assert pacer.delay_until_next_frame() == pytest.approx(1 / 59.7275, rel=1e-4)
+    clock.now += pacer.delay_until_next_frame()
+    assert pacer.frames_due() == 1
+
+
+# noinspection PyShadowingNames
+def test_locked_drift_correction(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(clock=clock)
+    start = clock.now
+    for frame in range(600):
+        clock.now = max(clock.now, pacer.next_frame_time) + 0.002  # Every frame is scheduled 2ms late
+        for _ in range(pacer.frames_due()):
+            pacer.frame_done()
+    # Delays are not accumulated: deadlines stay on the ideal grid
+    assert pacer.next_frame_time == pytest.approx(start + 600 / FramePacer.FRAME_RATE)
+
+
+# noinspection PyShadowingNames
+def test_locked_catch_up_limit(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(clock=clock)
+    clock.now += 3 / FramePacer.FRAME_RATE + 0.001
+    assert pacer.frames_due() == 4
+    clock.now += 10.0
+    assert pacer.frames_due() == 1
+    assert pacer.next_frame_time == clock.now
+
+
+# noinspection PyShadowingNames
+def test_turbo(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(mode=FramePacer.TURBO, clock=clock)
+    for _ in range(10):
+        assert pacer.frames_due() == 1
+        pacer.frame_done()
+    assert pacer.delay_until_next_frame() == 0.0
+
+
+# noinspection PyShadowingNames
+def test_multiplier(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(mode=FramePacer.MULTIPLIER, multiplier=2.0, clock=clock)
+    pacer.frame_done()
+    assert pacer.delay_until_next_frame() == pytest.approx(1 / (2 * FramePacer.FRAME_RATE))
+
+
+# noinspection PyShadowingNames
+def test_invalid_mode(clock):
+    from pacing import FramePacer
+    with pytest.raises(ValueError):
+        FramePacer(mode="slow", clock=clock)
+    with pytest.raises(ValueError):
+        FramePacer(mode=FramePacer.MULTIPLIER, multiplier=0, clock=clock)
+
+
+# noinspection PyShadowingNames
+def test_speed_ratio(clock):
+    from pacing import FramePacer
+    pacer = FramePacer(mode=FramePacer.TURBO, clock=clock)
+    for _ in range(121):  # One extra frame, in case rounding leaves the 120th just short of the metrics interval
+        clock.now += 1 / 120
+        pacer.frame_done()
+    assert pacer.fps == pytest.approx(120)
+    assert pacer.speed_ratio == pytest.approx(120 / FramePacer.FRAME_RATE)
@@ -0,0 +1,76 @@
+"""
+Tests for profiler.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with a profiler attached, running a small loop:
+        0100: LD A,00 / 0102: INC A / 0103: SWAP A / 0105: JR 0102
+    :return: new GB instance
+    """
+    from gb import GB
+    from profiler import Profiler
+    gb = GB(headless=True)
+    cartridge = bytearray(0x8000)
+    cartridge[0x0100:0x0107] = bytes.fromhex("3E 00 3C CB 37 18 FB")
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+    gb.cpu.profiler = Profiler(gb)
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_opcode_statistics(gb):
+    for _ in range(1 + 3*100):
+        gb.cpu.profiler.step()
+    opcodes = gb.cpu.profiler.opcodes
+    assert opcodes[0x3E][:2] == [1, 8]
+    assert opcodes[0x3C][:2] == [100, 400]
+    assert opcodes[0xCB37][:2] == [100, 1200]  # CB prefix included
+    assert opcodes[0x18][:2] == [100, 1200]
+    assert 0xCB not in opcodes
+    assert all(entry[2] >= 0 for entry in opcodes.values())
+
+
+# noinspection PyShadowingNames
+def test_address_statistics(gb):
+    for _ in range(1 + 3*100):
+        gb.cpu.profiler.step()
+    addresses = gb.cpu.profiler.addresses
+    assert sorted(addresses) == [(0, 0x0100), (0, 0x0102), (0, 0x0103), (0, 0x0105)]
+    assert addresses[(0, 0x0103)][:2] == [100, 1200]
+    assert [key for key, _ in gb.cpu.profiler.top_addresses(1, by=gb.cpu.profiler.COUNT)] != [(0, 0x0100)]
+
+
+# noinspection PyShadowingNames
+def test_bank_of(gb):
+    profiler = gb.cpu.profiler
+    assert profiler._bank_of(0x0150) == 0
+    assert profiler._bank_of(0x4000) == 1
+    gb.memory.mbc.cartridge_bank = 5
+    assert profiler._bank_of(0x7FFF) == 5
+    assert profiler._bank_of(0xC000) is None
+
+
+# noinspection PyShadowingNames
+def test_runs_with_main_loop(gb):
+    gb.run_frames(1)
+    assert gb.cpu.profiler.opcodes[0x3C][0] > 1000
+    report = gb.cpu.profiler.report(n=3)
+    assert "INC A" in report
+    assert "CB 37 SWAP A" in report
+    assert "00:0102" in report
+
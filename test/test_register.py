@@ -317,3 +317,23 @@ def test_set_hl(register):
     register.L = 0x01
     register.set_hl(0xFE15)
     assert_registers(register, H=0xFE, L=0x15)
+
+
+def test_flag_tables_size():
+    from register import INC_FLAGS, DEC_FLAGS, ADD_FLAGS, ADC_FLAGS, SUB_FLAGS, SBC_FLAGS, AND_FLAGS, OR_FLAGS
+    assert len(INC_FLAGS) == len(DEC_FLAGS) == len(AND_FLAGS) == len(OR_FLAGS) == 0x100
+    assert len(ADD_FLAGS) == len(SUB_FLAGS) == 0x10000
+    assert len(ADC_FLAGS) == len(SBC_FLAGS) == 0x20000
+
+
+def test_flag_tables_values():
+    from register import INC_FLAGS, DEC_FLAGS, ADD_FLAGS, ADC_FLAGS, SUB_FLAGS, SBC_FLAGS, AND_FLAGS, OR_FLAGS
+    assert INC_FLAGS[0x00] == 0xA0  # Z,H
+    assert INC_FLAGS[0x11] == 0x00
+    assert DEC_FLAGS[0x0F] == 0x60  # N,H
+    assert ADD_FLAGS[(0xFF << 8) | 0x01] == 0xB0  # Z,H,C
+    assert ADC_FLAGS[(1 << 16) | (0x0E << 8) | 0x01] == 0x20  # H
+    assert SUB_FLAGS[(0x10 << 8) | 0x20] == 0x50  # N,C
+    assert SBC_FLAGS[(1 << 16) | (0x10 << 8) | 0x0F] == 0xC0  # Z,N
+    assert AND_FLAGS[0x00] == 0xA0  # Z,H
+    assert OR_FLAGS[0x01] == 0x00
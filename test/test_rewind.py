@@ -0,0 +1,136 @@
+"""
+Tests for rewind.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance running a program that keeps changing VRAM, RAM and registers, with a rewinder that
+    makes a keyframe every 4 frames:
+        0100: LD A,05 / 0102: LDH (07),A / 0104: LDH (FF),A / 0106: EI
+        0107: INC A / 0108: LD (8000),A / 010B: LD (C000),A / 010E: JR 0107
+        Interrupt handlers: 0040: INC C / RETI, 0050: INC B / RETI
+    :return: new GB instance
+    """
+    from gb import GB
+    from rewind import Rewinder
+    gb = GB(headless=True)
+    cartridge = bytearray(0x8000)
+    cartridge[0x0040:0x0042] = bytes.fromhex("0C D9")
+    cartridge[0x0050:0x0052] = bytes.fromhex("04 D9")
+    cartridge[0x0100:0x0110] = bytes.fromhex("3E 05 E0 07 E0 FF FB 3C EA 00 80 EA 00 C0 18 F7")
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+    gb.run_frames(2)
+    gb.rewinder = Rewinder(gb, keyframe_interval=4)
+    return gb
+
+
+def run_and_save(gb, frames: int):
+    """
+    Runs the given number of frames, saving the state right after each capture.
+    :return: List of states, oldest first
+    """
+    states = []
+    for _ in range(frames):
+        gb.run_frames(1)
+        states.append(gb.rewinder._previous)
+    return states
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_captured_by_gpu(gb):
+    states = run_and_save(gb, 10)
+    assert gb.rewinder.frames == 10
+    assert [len(group) for group in gb.rewinder._groups] == [4, 4, 2]
+    assert gb.rewinder.size == sum(gb.rewinder._group_sizes)
+    assert gb.rewinder.size < 10 * len(states[0]) // 4  # Compressed
+
+
+# noinspection PyShadowingNames
+def test_rewind(gb):
+    states = run_and_save(gb, 10)
+    assert gb.rewinder.rewind(0) == 0
+    assert gb.save_state(framebuffer=False) == states[9]
+    assert gb.rewinder.rewind(3) == 3
+    assert gb.save_state(framebuffer=False) == states[6]
+    assert gb.rewinder.frames == 7
+    assert gb.rewinder.rewind(1) == 1
+    assert gb.save_state(framebuffer=False) == states[5]
+    assert [len(group) for group in gb.rewinder._groups] == [4, 2]
+    assert gb.rewinder.size == sum(gb.rewinder._group_sizes)
+
+
+# noinspection PyShadowingNames
+def test_rewind_too_far(gb):
+    states = run_and_save(gb, 5)
+    assert gb.rewinder.rewind(100) == 4
+    assert gb.save_state(framebuffer=False) == states[0]
+    assert gb.rewinder.rewind(1) == 0
+    gb.rewinder.clear()
+    assert gb.rewinder.rewind(1) == 0
+
+
+# noinspection PyShadowingNames
+def test_capture_after_rewind(gb):
+    states = run_and_save(gb, 6)
+    gb.rewinder.rewind(3)  # To the start of V-Blank in the 3rd frame
+    gb.run_frames(1)  # Rest of the 3rd frame
+    assert run_and_save(gb, 3) == states[3:]  # Emulation is deterministic
+    assert gb.rewinder.rewind(5) == 5
+    assert gb.save_state(framebuffer=False) == states[0]
+
+
+# noinspection PyShadowingNames
+def test_frame_is_drawn_again(gb):
+    frames = []
+    capture = gb.rewinder.capture
+
+    def capture_and_draw():
+        capture()
+        gb.gpu.render_frame()  # What the rewinder will draw when this state is restored
+        frames.append(bytes(gb.gpu.framebuffer))
+
+    gb.rewinder.capture = capture_and_draw
+    gb.run_frames(6)
+    assert len(set(frames)) > 1
+    gb.rewinder.rewind(3)
+    assert bytes(gb.gpu.framebuffer) == frames[2]
+    gb.rewinder.rewind(2)
+    assert bytes(gb.gpu.framebuffer) == frames[0]
+
+
+# noinspection PyShadowingNames
+def test_memory_budget(gb):
+    run_and_save(gb, 4)
+    gb.rewinder.memory_budget = 2 * gb.rewinder.size
+    states = run_and_save(gb, 20)
+    rewinder = gb.rewinder
+    assert rewinder.size <= rewinder.memory_budget
+    assert 4 <= rewinder.frames < 24
+    assert rewinder.frames == sum(len(group) for group in rewinder._groups)
+    assert len(rewinder._groups[0]) == 4  # Oldest groups are dropped as a whole
+    frames = rewinder.frames
+    assert rewinder.rewind(100) == frames - 1
+    assert gb.save_state(framebuffer=False) == states[-frames]
+
+
+# noinspection PyShadowingNames
+def test_xor_without_numpy(gb, monkeypatch):
+    import rewind
+    states = run_and_save(gb, 2)
+    expected = rewind.Rewinder._xor(states[0], states[1])
+    monkeypatch.setattr(rewind, "numpy", None)
+    assert rewind.Rewinder._xor(states[0], states[1]) == expected
@@ -0,0 +1,101 @@
+"""
+Tests for scheduler.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def scheduler():
+    """
+    Create Scheduler instance for testing.
+    :return: new scheduler instance
+    """
+    from scheduler import Scheduler
+    return Scheduler()
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_empty(scheduler):
+    assert scheduler.next_event_cycle == scheduler.NEVER
+    scheduler.run_due(1000)
+
+
+# noinspection PyShadowingNames
+def test_run_in_order(scheduler):
+    calls = []
+    scheduler.schedule("b", 200, lambda cycle: calls.append(("b", cycle)))
+    scheduler.schedule("a", 100, lambda cycle: calls.append(("a", cycle)))
+    scheduler.schedule("c", 100, lambda cycle: calls.append(("c", cycle)))
+    assert scheduler.next_event_cycle == 100
+    scheduler.run_due(99)
+    assert calls == []
+    scheduler.run_due(150)
+    assert calls == [("a", 100), ("c", 100)]
+    assert scheduler.next_event_cycle == 200
+    scheduler.run_due(250)
+    assert calls == [("a", 100), ("c", 100), ("b", 200)]
+    assert scheduler.next_event_cycle == scheduler.NEVER
+
+
+# noinspection PyShadowingNames
+def test_reschedule_replaces_event(scheduler):
+    calls = []
+    scheduler.schedule("a", 100, lambda cycle: calls.append(("old", cycle)))
+    scheduler.schedule("a", 300, lambda cycle: calls.append(("new", cycle)))
+    assert scheduler.cycle_of("a") == 300
+    scheduler.run_due(200)
+    assert calls == []
+    assert scheduler.next_event_cycle == 300
+    scheduler.run_due(300)
+    assert calls == [("new", 300)]
+    assert not scheduler.is_scheduled("a")
+
+
+# noinspection PyShadowingNames
+def test_cancel(scheduler):
+    calls = []
+    scheduler.schedule("a", 100, lambda cycle: calls.append(cycle))
+    scheduler.cancel("a")
+    scheduler.cancel("unknown")
+    assert not scheduler.is_scheduled("a")
+    scheduler.run_due(1000)
+    assert calls == []
+    assert scheduler.next_event_cycle == scheduler.NEVER
+
+
+# noinspection PyShadowingNames
+def test_periodic_event(scheduler):
+    calls = []
+
+    def tick(cycle):
+        calls.append(cycle)
+        scheduler.schedule("tick", cycle + 10, tick)
+
+    scheduler.schedule("tick", 10, tick)
+    scheduler.run_due(35)  # Events scheduled by callbacks also run if they are due
+    assert calls == [10, 20, 30]
+    assert scheduler.next_event_cycle == 40
+
+
+# noinspection PyShadowingNames
+def test_events(scheduler):
+    def callback(cycle):
+        pass
+    scheduler.schedule("b", 200, callback)
+    scheduler.schedule("a", 100, callback)
+    scheduler.schedule("c", 100, callback)
+    scheduler.schedule("d", 50, callback)
+    scheduler.cancel("d")
+    scheduler.schedule("b", 100, callback)
+    assert scheduler.events() == [("a", 100, callback), ("c", 100, callback), ("b", 100, callback)]
@@ -0,0 +1,57 @@
+"""
+Tests for screen.py
+"""
+
+"""
+Tests
+"""
+
+
+def import_screen():
+    """
+    Helper function to import the screen module without a display: pyglet creates a hidden window when pyglet.window
+    is imported, unless the shadow window is disabled.
+    """
+    import pyglet
+    pyglet.options["shadow_window"] = False
+    import screen
+    return screen
+
+
+def test_flipped_texture_is_anchored_at_bottom_left():
+    from pyglet import gl, image
+    screen = import_screen()
+    texture = image.Texture(160, 144, gl.GL_TEXTURE_2D, 0)  # No GL texture behind it, only its coordinates are used
+    flipped = screen.Screen.flip_vertically(texture)
+    assert (flipped.anchor_x, flipped.anchor_y) == (0, 0)
+    assert (flipped.width, flipped.height) == (160, 144)
+    assert flipped.tex_coords[1] == texture.tex_coords[7]  # Bottom left vertex shows the top of the texture
+    assert flipped.tex_coords[7] == texture.tex_coords[1]
+
+
+def drawn_rectangle(window_width: int, window_height: int):
+    """
+    Helper function to run the layout and drawing code of Screen, without a window, for a window of the given size.
+    :return: (x, y, width, height) covered by the display, as pyglet's blit() places it
+    """
+    from types import SimpleNamespace
+    from pyglet import gl, image
+    from gb import GB
+    screen = import_screen()
+    texture = screen.Screen.flip_vertically(image.Texture(160, 144, gl.GL_TEXTURE_2D, 0))
+    blits = []
+    texture.blit = lambda x, y, z=0, width=None, height=None: blits.append((x, y, width, height))
+    window = SimpleNamespace(gb=GB(headless=True), texture=texture, clear=lambda: None)
+    screen.Screen.update_layout(window, window_width, window_height)
+    screen.Screen.on_draw(window)
+    x, y, width, height = blits[0]
+    return x - texture.anchor_x, y - texture.anchor_y, width, height
+
+
+def test_display_fills_window_at_scale_1():
+    assert drawn_rectangle(160, 144) == (0, 0, 160, 144)
+
+
+def test_display_is_scaled_and_centered():
+    assert drawn_rectangle(500, 400) == (90, 56, 320, 288)  # Scale 2, the largest that fits
+    assert drawn_rectangle(480, 600) == (0, 84, 480, 432)  # Scale 3, extra height
@@ -0,0 +1,166 @@
+"""
+Tests for state.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+# Keeps writing an increasing value to VRAM and RAM, while counting timer (in B) and V-Blank (in C) interrupts
+PROGRAM = ("3E 05"     # 0100: LD A,05
+           "E0 07"     # 0102: LDH (07),A - Timer enabled, 262144 Hz
+           "E0 FF"     # 0104: LDH (FF),A - V-Blank and timer interrupts enabled
+           "FB"        # 0106: EI
+           "3C"        # 0107: INC A
+           "EA 00 80"  # 0108: LD (8000),A
+           "EA 00 C0"  # 010B: LD (C000),A
+           "18 F7")    # 010E: JR 0107
+ROUTINES = {0x0040: "0C D9",  # INC C / RETI
+            0x0050: "04 D9"}  # INC B / RETI
+
+
+def create_gb(program: str = PROGRAM, routines: dict = None, title: bytes = b""):
+    """
+    Create headless GB instance, with a cartridge that executes the given program after boot.
+    :param program: Hex string with the instructions to place at address 0x0100
+    :param routines: Other code to place in the cartridge, as {address: hex string}
+    :param title: Cartridge title, which is also added to the header checksum
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    cartridge = bytearray(0x8000)
+    for address, code in {**(ROUTINES if routines is None else routines), 0x0100: program}.items():
+        code_bytes = bytes.fromhex(code)
+        cartridge[address:address + len(code_bytes)] = code_bytes
+    cartridge[0x0134:0x0134 + len(title)] = title
+    cartridge[0x014D] = -sum(cartridge[0x0134:0x014D]) & 0xFF
+    gb.load_cartridge(cartridge_data=bytes(cartridge))
+    return gb
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance running PROGRAM, a few frames after boot.
+    :return: new GB instance
+    """
+    gb = create_gb()
+    gb.run_frames(3)
+    gb.run_cycles(1234)  # In the middle of a frame
+    return gb
+
+
+"""
+Tests
+"""
+
+
+# noinspection PyShadowingNames
+def test_restore_is_deterministic(gb):
+    state = gb.save_state()
+    gb.run_frames(5)
+    expected = gb.save_state()
+    assert expected != state
+
+    gb.load_state(state)
+    assert gb.save_state() == state
+    gb.run_frames(5)
+    assert gb.save_state() == expected
+
+
+# noinspection PyShadowingNames
+def test_restore_into_another_instance(gb):
+    state = gb.save_state()
+    gb.run_frames(5)
+
+    other = create_gb()
+    other.load_state(state)
+    other.run_frames(5)
+    assert other.save_state() == gb.save_state()
+    assert other.cpu.register.B > 0 and other.cpu.register.C > 0
+    assert bytes(other.gpu.framebuffer) == bytes(gb.gpu.framebuffer)
+    assert other.memory.read_8bit(0xC000) == gb.memory.read_8bit(0xC000)
+
+
+# noinspection PyShadowingNames
+def test_restored_components(gb):
+    gb.joypad.press("start")
+    gb.memory.write_8bit(0xFF42, 0x12)  # SCY
+    state = gb.save_state()
+    registers = (gb.cpu.register.A, gb.cpu.register.PC, gb.cpu.register.SP, gb.cpu.cycle_count)
+    div, tima = gb.timer.read_div(), gb.timer.read_tima()
+    events = [(name, cycle) for name, cycle, _ in gb.scheduler.events()]
+
+    other = create_gb()
+    other.load_state(state)
+    assert (other.cpu.register.A, other.cpu.register.PC, other.cpu.register.SP, other.cpu.cycle_count) == registers
+    assert (other.timer.read_div(), other.timer.read_tima()) == (div, tima)
+    assert [(name, cycle) for name, cycle, _ in other.scheduler.events()] == events
+    assert other.interrupts.IME and other.interrupts.IE == 0x05
+    assert other.joypad.pressed == gb.joypad.pressed
+    assert gb.gpu.scroll_y.value == 0x12
+
+
+def test_code_in_ram_is_restored():
+    # Copies "INC A / RET" to C100 and calls it, then replaces INC A with DEC A and calls it again
+    gb = create_gb("21 00 C1"  # 0100: LD HL,C100
+                   "36 3C"     # 0103: LD (HL),3C
+                   "23"        # 0105: INC HL
+                   "36 C9"     # 0106: LD (HL),C9
+                   "AF"        # 0108: XOR A
+                   "CD 00 C1"  # 0109: CALL C100
+                   "76"        # 010C: HALT
+                   "00"        # 010D: NOP
+                   "3E 3D"     # 010E: LD A,3D
+                   "EA 00 C1"  # 0110: LD (C100),A
+                   "AF"        # 0113: XOR A
+                   "CD 00 C1"  # 0114: CALL C100
+                   "76",       # 0117: HALT
+                   routines={})
+    gb.run_frames(1)
+    assert gb.cpu.register.A == 0x01
+    state = gb.save_state()
+    gb.cpu.register.PC = 0x010E
+    gb.cpu.halted = False
+    gb.run_frames(1)
+    assert gb.cpu.register.A == 0xFF
+    gb.load_state(state)
+    gb.cpu.register.PC = 0x0108  # Call the restored code again, instead of the one cached before loading
+    gb.cpu.halted = False
+    gb.run_frames(1)
+    assert gb.cpu.register.A == 0x01
+
+
+# noinspection PyShadowingNames
+def test_state_without_framebuffer(gb):
+    state = gb.save_state(framebuffer=False)
+    assert len(gb.save_state()) - len(state) == len(gb.gpu.framebuffer)
+    gb.run_frames(5)
+    gb.gpu.framebuffer[:3] = b"\x01\x02\x03"
+    framebuffer = bytes(gb.gpu.framebuffer)
+
+    gb.load_state(state, framebuffer=False)
+    assert gb.save_state(framebuffer=False) == state
+    assert bytes(gb.gpu.framebuffer) == framebuffer  # Kept as it was
+    with pytest.raises(ValueError):
+        gb.load_state(state)  # The framebuffer is missing
+
+
+# noinspection PyShadowingNames
+def test_invalid_states(gb):
+    state = gb.save_state()
+    with pytest.raises(ValueError):
+        gb.load_state(b"XXXX" + state[4:])
+    with pytest.raises(ValueError):
+        gb.load_state(state[:4] + b"\xFF\xFF" + state[6:])
+    with pytest.raises(ValueError):
+        gb.load_state(state[:-1])
+    with pytest.raises(ValueError):
+        create_gb(title=b"OTHER GAME").load_state(state)
+    gb.load_state(state)  # Nothing was changed by the failed attempts
+    assert gb.save_state() == state
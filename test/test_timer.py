@@ -0,0 +1,98 @@
+"""
+Tests for timer.py
+"""
+
+import pytest
+
+"""
+Fixtures act as test setup/teardown in py.test.
+For each test method with a parameter, the parameter name is the setup method that will be called.
+"""
+
+
+@pytest.fixture
+def gb():
+    """
+    Create headless GB instance, with a cartridge filled with NOPs, for testing.
+    :return: new GB instance
+    """
+    from gb import GB
+    gb = GB(headless=True)
+    gb.load_cartridge(cartridge_data=bytes.fromhex("00")*0x8000)
+    return gb
+
+
+"""
+Tests
+"""
+
+
+def run_until(gb, cycle: int):
+    """ Helper function to execute NOPs, one at a time, until the given CPU cycle """
+    while gb.cpu.cycle_count < cycle:
+        gb.cpu.step()
+    assert gb.cpu.cycle_count == cycle
+
+
+# noinspection PyShadowingNames
+def test_div(gb):
+    start = gb.cpu.cycle_count
+    gb.memory.write_8bit(0xFF04, 0x12)  # Any write resets DIV
+    assert gb.memory.read_8bit(0xFF04) == 0x00
+    run_until(gb, start + 256 * 3)
+    assert gb.memory.read_8bit(0xFF04) == 0x03
+    run_until(gb, start + 256 * 258)
+    assert gb.memory.read_8bit(0xFF04) == 0x02  # Wraps around
+
+
+# noinspection PyShadowingNames
+def test_tima_disabled(gb):
+    gb.memory.write_8bit(0xFF05, 0x10)
+    gb.memory.write_8bit(0xFF07, 0b001)
+    gb.run_cycles(1000)
+    assert gb.memory.read_8bit(0xFF05) == 0x10
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize("clock_select,cycles_per_tick", [(0b00, 1024), (0b01, 16), (0b10, 64), (0b11, 256)])
+def test_tima_frequency(gb, clock_select, cycles_per_tick):
+    gb.memory.write_8bit(0xFF04, 0x00)
+    start = gb.cpu.cycle_count
+    gb.memory.write_8bit(0xFF05, 0x00)
+    gb.memory.write_8bit(0xFF07, 0b100 | clock_select)
+    run_until(gb, start + cycles_per_tick * 5)
+    assert gb.memory.read_8bit(0xFF05) == 5
+
+
+# noinspection PyShadowingNames
+def test_tima_overflow(gb):
+    gb.memory.write_8bit(0xFF0F, 0x00)
+    gb.memory.write_8bit(0xFF04, 0x00)
+    start = gb.cpu.cycle_count
+    gb.memory.write_8bit(0xFF06, 0xF0)  # TMA
+    gb.memory.write_8bit(0xFF05, 0xFE)
+    gb.memory.write_8bit(0xFF07, 0b101)  # Enabled, every 16 cycles
+    run_until(gb, start + 16)
+    assert gb.memory.read_8bit(0xFF05) == 0xFF
+    assert gb.memory.read_8bit(0xFF0F) & 0b100 == 0
+    run_until(gb, start + 32)
+    assert gb.memory.read_8bit(0xFF05) == 0xF0  # Reloaded with TMA
+    assert gb.memory.read_8bit(0xFF0F) & 0b100 != 0  # Timer interrupt requested
+    run_until(gb, start + 32 + 16 * 3)
+    assert gb.memory.read_8bit(0xFF05) == 0xF3
+
+
+# noinspection PyShadowingNames
+def test_tac_change_keeps_past_ticks(gb):
+    gb.memory.write_8bit(0xFF04, 0x00)
+    start = gb.cpu.cycle_count
+    gb.memory.write_8bit(0xFF05, 0x00)
+    gb.memory.write_8bit(0xFF07, 0b101)  # Every 16 cycles
+    run_until(gb, start + 16 * 4)
+    gb.memory.write_8bit(0xFF07, 0b110)  # Every 64 cycles
+    run_until(gb, start + 16 * 4 + 64 * 2)
+    assert gb.memory.read_8bit(0xFF05) == 6
+    gb.memory.write_8bit(0xFF07, 0b010)  # Stopped
+    gb.run_cycles(1000)
+    assert gb.memory.read_8bit(0xFF05) == 6
+